@@ -0,0 +1,119 @@
+"""
+Automatic bed allocation for pending bookings.
+Packs every pending booking into the free beds of the room inventory in one
+pass with best-fit-decreasing: requests are placed largest first, each into
+the room whose free beds fit it most tightly, so partly filled rooms are
+topped up before empty ones are opened. With groups on, participants who
+requested the same room are kept together and only split when no room has
+enough free beds for all of them.
+
+plan_allocation() is pure and works on plain tuples; load_allocation_plan()
+reads the requests and free beds and transitions.apply_allocation()
+commits a plan as a single batch. The admin page posts back the fingerprint
+of the plan it previewed, so a plan that changed in between (new requests,
+rooms filled or edited) is shown again instead of being applied unseen.
+"""
+
+import bisect
+import hashlib
+from collections import defaultdict
+from sqlalchemy import func
+from models import db, Room, Booking, OccupancyVersion
+
+class AllocationPlan:
+    """The outcome of a planning pass: which booking goes to which room"""
+
+    def __init__(self, assignments, unassigned, free_before, version=None):
+        self.assignments = assignments  # {booking_id: room_id}
+        self.unassigned = unassigned  # booking ids left pending for lack of beds
+        self.free_before = free_before  # {room_id: free beds before the plan}
+        self.version = version  # OccupancyVersion the inventory was read at
+
+    def fingerprint(self):
+        """Digest of the bookings placed, where, and the occupancy version they were planned against"""
+        state = (self.version, sorted(self.assignments.items()), sorted(self.unassigned))
+        return hashlib.sha256(repr(state).encode()).hexdigest()[:32]
+
+    def beds_by_room(self):
+        """{room_id: beds this plan allocates in the room}"""
+        counts = defaultdict(int)
+        for room_id in self.assignments.values():
+            counts[room_id] += 1
+        return dict(counts)
+
+    def summary(self):
+        """Counts for previews and reports"""
+        beds = self.beds_by_room()
+        filled = sum(1 for room_id, count in beds.items() if count == self.free_before[room_id])
+        return {
+            'assigned': len(self.assignments),
+            'unassigned': len(self.unassigned),
+            'rooms_used': len(beds),
+            'rooms_filled': filled,
+            'free_beds_before': sum(self.free_before.values()),
+            'free_beds_after': sum(self.free_before.values()) - len(self.assignments),
+        }
+
+def plan_allocation(bookings, rooms, keep_groups=True):
+    """
+    Assign bookings to rooms with best-fit-decreasing.
+    bookings: (booking_id, requested_room_id) in priority order (earliest first)
+    rooms: (room_id, free_beds)
+    """
+    # Requests to place: a group per requested room, or one request per booking
+    if keep_groups:
+        groups = defaultdict(list)
+        for booking_id, requested_room_id in bookings:
+            groups[requested_room_id].append(booking_id)
+        requests = list(groups.values())
+    else:
+        requests = [[booking_id] for booking_id, _ in bookings]
+    # Largest first; a stable sort keeps earlier requests ahead among equals
+    requests.sort(key=len, reverse=True)
+
+    # Rooms with free beds, sorted by (free beds, room id) for best-fit lookups
+    free_before = {room_id: free for room_id, free in rooms if free > 0}
+    available = sorted((free, room_id) for room_id, free in free_before.items())
+
+    assignments = {}
+    unassigned = []
+    for members in requests:
+        while members and available:
+            # The tightest room that takes the whole request, else the roomiest one
+            index = bisect.bisect_left(available, (len(members), -1))
+            if index == len(available):
+                index -= 1
+            free, room_id = available.pop(index)
+            placed, members = members[:free], members[free:]
+            for booking_id in placed:
+                assignments[booking_id] = room_id
+            if free > len(placed):
+                bisect.insort(available, (free - len(placed), room_id))
+        unassigned.extend(members)
+
+    return AllocationPlan(assignments, unassigned, free_before)
+
+def load_allocation_plan(keep_groups=True):
+    """Plan the allocation of every pending booking against the current inventory"""
+    version = OccupancyVersion.current()  # Read first, in the same transaction as the inventory
+    bookings = db.session.query(Booking.id, Booking.room_id).filter(
+        Booking.status == 'pending'
+    ).order_by(Booking.created_at, Booking.id).all()
+    rooms = db.session.query(Room.id, Room.capacity - Room.allocated_beds).filter(
+        Room.allocated_beds < Room.capacity
+    ).all()
+    plan = plan_allocation(bookings, rooms, keep_groups)
+    plan.version = version
+    return plan
+
+def room_numbers(room_ids):
+    """{room_id: room_no} for showing a plan"""
+    if not room_ids:
+        return {}
+    return dict(db.session.query(Room.id, Room.room_no).filter(Room.id.in_(room_ids)).all())
+
+def fragmented_rooms():
+    """Rooms that are partly allocated: some beds taken, some free"""
+    return db.session.query(func.count(Room.id)).filter(
+        Room.allocated_beds > 0, Room.allocated_beds < Room.capacity
+    ).scalar()
@@ -1,8 +1,27 @@
+"""
+The Flask application factory.
+create_app() only builds the app: it never touches the database, so any
+number of pre-forked workers can start at once. The schema and the default
+admin are set up once per deployment with `flask init-db` and `flask seed`
+(or init_database() in scripts and the development server).
+Run with: flask --app app run, or gunicorn -w 4 -k gthread --threads 250 'app:create_app()'
+Threaded workers are required: every open live dashboard holds a request
+thread (see live_feed.py), so --threads must exceed LIVE_FEED_MAX_STREAMS
+(200 by default) with room left for ordinary requests.
+"""
+
+import os
+import weakref
 from flask import Flask, render_template, redirect, url_for, flash, session, request
-from models import db, User, Room, Booking, Log, get_ist_now
+from models import db, User
 from config import Config
 from email_service import init_email
-import os
+from migrations import init_db
+from sqlite_tuning import init_sqlite_tuning
+from commands import register_commands
+from transitions import TransitionError, register_user, record_login, record_logout
+from principal import init_principal, current_principal
+from seed import create_default_admin
 import pytz
 
 # Try to load dotenv if available
@@ -12,15 +31,8 @@ try:
 except ImportError:
     pass  # dotenv not installed, skip
 
-app = Flask(__name__)
-app.config.from_object(Config)
-
-# Initialize email service
-init_email(app)
-
 # Add template filter for IST timezone
 IST = pytz.timezone('Asia/Kolkata')
-@app.template_filter('ist')
 def ist_filter(dt):
     if dt is None:
         return None
@@ -28,49 +40,19 @@ def ist_filter(dt):
         dt = pytz.utc.localize(dt)
     return dt.astimezone(IST).strftime('%Y-%m-%d %H:%M IST')
 
-# Initialize database
-db.init_app(app)
-
-# Create tables
-with app.app_context():
-    db.create_all()
-    
-    # Create default admin user if it doesn't exist
-    admin = User.query.filter_by(email='admin@ignitron.com').first()
-    if not admin:
-        admin = User(
-            name='Admin',
-            email='admin@ignitron.com',
-            phone='0000000000',
-            role='admin'
-        )
-        admin.set_password('admin123')
-        admin.created_at = get_ist_now()
-        db.session.add(admin)
-        db.session.commit()
-
-# Import routes (must be after app and db initialization)
-from routes.admin import admin_bp
-from routes.user import user_bp
-
-app.register_blueprint(admin_bp, url_prefix='/admin')
-app.register_blueprint(user_bp, url_prefix='/user')
-
-@app.route('/')
 def index():
-    if 'user_id' in session:
-        user = User.query.get(session['user_id'])
-        if user.is_admin():
+    principal = current_principal()
+    if principal:
+        if principal.is_admin():
             return redirect(url_for('admin.dashboard'))
         else:
             return redirect(url_for('user.dashboard'))
     return redirect(url_for('login'))
 
-@app.route('/login', methods=['GET', 'POST'])
 def login():
-    if 'user_id' in session:
-        user = User.query.get(session['user_id'])
-        if user.is_admin():
+    principal = current_principal()
+    if principal:
+        if principal.is_admin():
             return redirect(url_for('admin.dashboard'))
         else:
             return redirect(url_for('user.dashboard'))
@@ -92,9 +74,7 @@ def login():
             session.permanent = True
             
             # Log login action
-            log = Log(user_id=user.id, action='login', details=f'User logged in')
-            db.session.add(log)
-            db.session.commit()
+            record_login(user, password)
             
             flash(f'Welcome back, {user.name}!', 'success')
             if user.is_admin():
@@ -106,7 +86,6 @@ def login():
     
     return render_template('login.html')
 
-@app.route('/register', methods=['GET', 'POST'])
 def register():
     if 'user_id' in session:
         return redirect(url_for('index'))
@@ -131,44 +110,100 @@ def register():
             flash('Password must be at least 6 characters long.', 'danger')
             return render_template('register.html')
         
-        if User.query.filter_by(email=email).first():
-            flash('Email already registered. Please login.', 'danger')
-            return redirect(url_for('login'))
-        
-        # Create new user
-        user = User(name=name, email=email, phone=phone, role='user')
-        user.set_password(password)
-        
+        # Create new user and log the registration
         try:
-            db.session.add(user)
-            db.session.commit()
-            
-            # Log registration
-            log = Log(user_id=user.id, action='registration', details=f'New user registered: {user.name}')
-            db.session.add(log)
-            db.session.commit()
+            register_user(name, email, phone, password)
             
             flash('Registration successful! Please login.', 'success')
             return redirect(url_for('login'))
+        except TransitionError as e:
+            flash(e.message, e.category)
+            return redirect(url_for('login'))
         except Exception as e:
             db.session.rollback()
             flash('An error occurred during registration. Please try again.', 'danger')
     
     return render_template('register.html')
 
-@app.route('/logout')
 def logout():
     if 'user_id' in session:
-        user_id = session['user_id']
         # Log logout action
-        log = Log(user_id=user_id, action='logout', details='User logged out')
-        db.session.add(log)
-        db.session.commit()
+        record_logout(session['user_id'])
     
     session.clear()
     flash('You have been logged out successfully.', 'info')
     return redirect(url_for('login'))
 
+# Per-process resources that a forked worker must not share with its parent
+PROCESS_EXTENSIONS = ('password_pool', 'smtp_pool', 'live_feed')
+
+def reset_after_fork(app):
+    """
+    Pre-forking servers copy the parent's pooled database connections, thread
+    pools and open streams into every worker. Drop them in the child so each
+    worker opens its own on first use.
+    """
+    app_ref = weakref.ref(app)
+
+    def reset():
+        app = app_ref()
+        if app is None:
+            return
+        with app.app_context():
+            for engine in db.engines.values():
+                engine.dispose(close=False)  # Leave the parent's connections open for the parent
+        for name in PROCESS_EXTENSIONS:
+            app.extensions.pop(name, None)
+
+    os.register_at_fork(after_in_child=reset)
+
+def create_app(config=Config):
+    """Build the app from a config object (or mapping); no database work happens here"""
+    app = Flask(__name__)
+    if isinstance(config, dict):
+        app.config.from_object(Config)
+        app.config.update(config)
+    else:
+        app.config.from_object(config)
+    
+    # Initialize email service
+    init_email(app)
+    
+    # Load the logged-in user once per request
+    init_principal(app)
+    
+    app.add_template_filter(ist_filter, 'ist')
+    
+    db.init_app(app)
+    init_sqlite_tuning(app)
+    register_commands(app)
+    reset_after_fork(app)
+    
+    from routes.admin import admin_bp
+    from routes.user import user_bp
+    from routes.api import api_bp
+    
+    app.register_blueprint(admin_bp, url_prefix='/admin')
+    app.register_blueprint(user_bp, url_prefix='/user')
+    app.register_blueprint(api_bp, url_prefix='/api')
+    
+    app.add_url_rule('/', 'index', index)
+    app.add_url_rule('/login', 'login', login, methods=['GET', 'POST'])
+    app.add_url_rule('/register', 'register', register, methods=['GET', 'POST'])
+    app.add_url_rule('/logout', 'logout', logout)
+    return app
+
+def init_database(app):
+    """Create the schema and the default admin: `flask init-db` and `flask seed` in one call, for one process"""
+    with app.app_context():
+        init_db()
+        create_default_admin()
+
 if __name__ == '__main__':
+    # The development server is a single process, so it can set up the database itself
+    app = create_app()
+    init_database(app)
+    # Send queued emails from this process; in production run `flask outbox-worker` instead
+    from outbox import OutboxWorker
+    OutboxWorker(app).start()
     app.run(host='0.0.0.0', port=5000, debug=True)
-
@@ -0,0 +1,119 @@
+"""
+Benchmark and check for the room allocation engine.
+Seeds participants with pending bookings and a room inventory (some beds
+already allocated) on a scratch SQLite file, then times planning the
+allocation with and without groups, and applying it through
+`flask allocate-rooms`-equivalent code as one batch. Checks that no room is
+overallocated, that room counters grew by exactly the planned beds, that every planned
+booking was approved and the rest left pending, and compares how many rooms
+are left partly filled against approving each booking in the room it asked for.
+Run with: python -m benchmarks.bench_allocation [participants] [rooms] [seed]
+"""
+
+import random
+import sys
+import time
+
+from sqlalchemy import func
+from models import db, Room, Booking, get_ist_now
+import allocation
+import transitions
+from benchmarks.common import scratch_app, admin_id, add_participants
+
+app = scratch_app('bench_allocation')
+
+def seed(participants, rooms, rng):
+    """Rooms of 4-20 beds, a few partly allocated, and one pending booking per participant"""
+    now = get_ist_now()
+    capacities = [rng.randint(4, 20) for _ in range(rooms)]
+    db.session.execute(db.insert(Room), [
+        {'room_no': f'A{n:04d}', 'capacity': capacity, 'available_beds': capacity, 'occupied_beds': 0,
+         'allocated_beds': rng.randint(0, capacity // 2) if rng.random() < 0.2 else 0, 'created_at': now}
+        for n, capacity in enumerate(capacities)
+    ])
+    user_ids = add_participants(participants)
+    room_ids = [room_id for room_id, in db.session.query(Room.id)]
+    # Popular rooms get most requests, as they do when participants pick for themselves
+    popular = room_ids[:max(1, len(room_ids) // 10)]
+    db.session.execute(db.insert(Booking), [
+        {'user_id': user_id, 'room_id': rng.choice(popular) if rng.random() < 0.6 else rng.choice(room_ids),
+         'status': 'pending', 'created_at': now, 'updated_at': now}
+        for user_id in user_ids
+    ])
+    db.session.commit()
+
+def requested_room_fragmentation():
+    """Rooms left partly filled if each booking were approved in the room it requested, first come first served"""
+    free = dict(db.session.query(Room.id, Room.capacity - Room.allocated_beds))
+    allocated = dict(db.session.query(Room.id, Room.allocated_beds))
+    for room_id, in db.session.query(Booking.room_id).filter(Booking.status == 'pending').order_by(Booking.created_at, Booking.id):
+        if free[room_id] > 0:
+            free[room_id] -= 1
+            allocated[room_id] += 1
+    return sum(1 for room_id in free if free[room_id] > 0 and allocated[room_id] > 0)
+
+def check_rooms(before, plan):
+    """Every room's allocated_beds grew by exactly the beds the plan gave it, within capacity"""
+    beds = plan.beds_by_room()
+    problems = []
+    for room in Room.query:
+        if room.allocated_beds > room.capacity:
+            problems.append(f'room {room.room_no} overallocated: {room.allocated_beds}/{room.capacity}')
+        if room.allocated_beds != before[room.id] + beds.get(room.id, 0):
+            problems.append(f'room {room.room_no}: allocated_beds {room.allocated_beds}, '
+                            f'expected {before[room.id] + beds.get(room.id, 0)}')
+    return problems
+
+def main():
+    participants = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    rooms = int(sys.argv[2]) if len(sys.argv) > 2 else 1000
+    rng = random.Random(int(sys.argv[3]) if len(sys.argv) > 3 else 2025)
+    problems = []
+
+    admin = admin_id(app)
+    with app.app_context():
+        seed(participants, rooms, rng)
+        print(f'{participants} pending bookings, {rooms} rooms, '
+              f'{db.session.query(func.sum(Room.capacity - Room.allocated_beds)).scalar()} free beds')
+        naive = requested_room_fragmentation()
+
+        for keep_groups in (False, True):
+            started = time.perf_counter()
+            plan = allocation.load_allocation_plan(keep_groups)
+            elapsed = time.perf_counter() - started
+            summary = plan.summary()
+            print(f'plan ({"groups" if keep_groups else "individual"}): {elapsed * 1000:6.0f} ms  '
+                  f'{summary["assigned"]} assigned into {summary["rooms_used"]} rooms, '
+                  f'{summary["unassigned"]} left pending')
+            if elapsed >= 1:
+                problems.append(f'planning took {elapsed:.2f}s')
+
+        # Planning alone, without the two inventory queries
+        bookings = db.session.query(Booking.id, Booking.room_id).filter(Booking.status == 'pending').all()
+        inventory = db.session.query(Room.id, Room.capacity - Room.allocated_beds).all()
+        started = time.perf_counter()
+        allocation.plan_allocation(bookings, inventory)
+        print(f'plan_allocation() alone: {(time.perf_counter() - started) * 1000:.0f} ms')
+
+        before = dict(db.session.query(Room.id, Room.allocated_beds))
+        started = time.perf_counter()
+        approved = transitions.apply_allocation(plan, admin)
+        print(f'apply: {time.perf_counter() - started:.2f}s for {approved} bookings in one transaction')
+
+        db.session.expire_all()
+        problems += check_rooms(before, plan)
+        statuses = dict(db.session.query(Booking.status, func.count(Booking.id)).group_by(Booking.status))
+        if statuses.get('approved', 0) != summary['assigned'] or statuses.get('pending', 0) != summary['unassigned']:
+            problems.append(f'expected {summary["assigned"]} approved and {summary["unassigned"]} pending, got {statuses}')
+        print(f'partly filled rooms: {allocation.fragmented_rooms()} after allocation, '
+              f'{naive} if each booking got the room it requested')
+
+    if problems:
+        for problem in problems:
+            print(f'❌ {problem}')
+        return 1
+    print('✅ Allocation planned in under a second and applied without overallocating any room')
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
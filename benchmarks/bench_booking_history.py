@@ -0,0 +1,176 @@
+"""
+Benchmark and check for the booking history table.
+Seeds a past fest edition's worth of finished bookings plus the current
+active ones on a scratch SQLite file, times the hot admin pages and the
+allocation plan, runs `flask move-booking-history`, and times them again.
+Checks that every booking is still in exactly one of the two tables, that
+room counters are unchanged, that a new booking's id never collides with a
+moved one, and that the admin bookings page (walked
+forwards and back) and the user profile list every booking once when the
+history is asked for.
+Run with: python -m benchmarks.bench_booking_history [finished bookings] [active bookings]
+"""
+
+import random
+import re
+import sys
+import time
+from datetime import timedelta
+
+from sqlalchemy import func
+from models import db, User, Room, Booking, BookingHistory, get_ist_now
+from migrations import recount_room_occupancy
+import allocation
+import transitions
+from benchmarks.common import scratch_app, admin_id, logged_in_client, add_participants
+
+app = scratch_app('bench_booking_history')
+
+PAGES = ['/admin/dashboard', '/admin/bookings', '/admin/bookings?status=pending', '/admin/users']
+
+def seed(finished, active, rng):
+    """Finished bookings from 10-400 days ago, then one active booking per current participant"""
+    now = get_ist_now()
+    db.session.execute(db.insert(Room), [
+        {'room_no': f'R{n:04d}', 'capacity': 12, 'available_beds': 12, 'occupied_beds': 0,
+         'allocated_beds': 0, 'created_at': now} for n in range(max(1, active // 8))
+    ])
+    user_ids = add_participants(active * 2)
+    room_ids = [room_id for room_id, in db.session.query(Room.id)]
+    for start in range(0, finished, 10000):
+        rows = []
+        for _ in range(start, min(finished, start + 10000)):
+            created = now - timedelta(days=rng.uniform(10, 400))
+            status = rng.choice(['rejected', 'checked_out'])
+            rows.append({'user_id': rng.choice(user_ids), 'room_id': rng.choice(room_ids), 'status': status,
+                         'checkin_time': created + timedelta(days=1) if status == 'checked_out' else None,
+                         'checkout_time': created + timedelta(days=3) if status == 'checked_out' else None,
+                         'created_at': created, 'updated_at': created + timedelta(days=3)})
+        db.session.execute(db.insert(Booking), rows)
+    db.session.execute(db.insert(Booking), [
+        {'user_id': user_id, 'room_id': rng.choice(room_ids), 'status': rng.choice(['pending', 'approved', 'checked_in']),
+         'created_at': now - timedelta(hours=rng.uniform(0, 48)), 'updated_at': now}
+        for user_id in user_ids[:active]
+    ])
+    # One booking finished just now stays in the live table
+    db.session.execute(db.insert(Booking), [{'user_id': user_ids[-1], 'room_id': room_ids[0], 'status': 'rejected',
+                                             'created_at': now, 'updated_at': now}])
+    recount_room_occupancy()
+    db.session.commit()
+
+def time_pages(client, label):
+    timings = []
+    for path in PAGES:
+        client.get(path)
+        started = time.perf_counter()
+        for _ in range(5):
+            client.get(path)
+        timings.append(f'{path} {(time.perf_counter() - started) / 5 * 1000:.1f} ms')
+    with app.app_context():
+        started = time.perf_counter()
+        allocation.load_allocation_plan(True)
+        timings.append(f'allocation plan {(time.perf_counter() - started) * 1000:.1f} ms')
+    print(f'{label}: ' + ', '.join(timings))
+
+def walk_pages(client, query):
+    """Every booking id on the admin bookings pages, following Older links, then back with Newer links"""
+    forward, url, last = [], f'/admin/bookings?{query}', None
+    while url:
+        html = client.get(url).get_data(as_text=True)
+        last = url
+        forward += [int(found) for found in re.findall(r'<td>#(\d+)</td>', html)]
+        older = re.search(r'href="([^"#]+)">\s*Older', html)
+        url = older.group(1).replace('&amp;', '&') if older else None
+    backward, url = [], last
+    while url:
+        html = client.get(url).get_data(as_text=True)
+        backward = [int(found) for found in re.findall(r'<td>#(\d+)</td>', html)] + backward
+        newer = re.search(r'href="([^"#]+)">\s*<i class="bi bi-chevron-left"></i> Newer', html)
+        url = newer.group(1).replace('&amp;', '&') if newer else None
+    return forward, backward
+
+def main():
+    finished = int(sys.argv[1]) if len(sys.argv) > 1 else 60000
+    active = int(sys.argv[2]) if len(sys.argv) > 2 else 4000
+    rng = random.Random(2025)
+    problems = []
+
+    with app.app_context():
+        seed(finished, active, rng)
+        total = Booking.query.count()
+        rejected = Booking.query.filter_by(status='rejected').count()
+        counters = sorted(db.session.query(Room.id, Room.occupied_beds, Room.allocated_beds, Room.available_beds))
+        profile_user = db.session.query(Booking.user_id).group_by(Booking.user_id).order_by(
+            func.count(Booking.id).desc()).first()[0]
+        profile_total = Booking.query.filter_by(user_id=profile_user).count()
+
+    client = logged_in_client(app, admin_id(app), 'admin')
+    time_pages(client, f'{total} live bookings')
+
+    started = time.perf_counter()
+    result = app.test_cli_runner().invoke(args=['move-booking-history'])
+    print(result.output.rstrip(), f'({finished / (time.perf_counter() - started):.0f} bookings/s)')
+
+    with app.app_context():
+        live, moved = Booking.query.count(), BookingHistory.query.count()
+        print(f'{live} live bookings, {moved} in the history')
+        if live + moved != total or moved != finished:
+            problems.append(f'expected {finished} moved of {total}, got {moved} moved and {live} live')
+        if sorted(db.session.query(Room.id, Room.occupied_beds, Room.allocated_beds, Room.available_beds)) != counters:
+            problems.append('room counters changed')
+    time_pages(client, f'{live} live bookings')
+
+    # Every rejected booking once, across both tables, forwards and back
+    started = time.perf_counter()
+    forward, backward = walk_pages(client, 'status=rejected&history=1&per_page=500')
+    print(f'walked {len(forward)} rejected bookings with history in {time.perf_counter() - started:.2f}s')
+    if len(forward) != rejected or len(set(forward)) != rejected:
+        problems.append(f'paging found {len(forward)} rejected bookings ({len(set(forward))} distinct), expected {rejected}')
+    if backward != forward:
+        problems.append('paging back with Newer did not retrace the Older pages')
+
+    # The users page counts moved bookings only when asked
+    counts = client.get('/admin/users?history=1&per_page=500').get_data(as_text=True)
+    counted = sum(int(n) for n in re.findall(r'<span class="badge bg-info">(\d+)</span>', counts))
+    with app.app_context():
+        expected = db.session.query(func.count(Booking.id)).join(User).filter(
+            User.id.in_(db.session.query(User.id).filter(User.role == 'user').order_by(
+                User.created_at.desc(), User.id.desc()).limit(500))).scalar()
+        expected += db.session.query(func.count(BookingHistory.id)).filter(
+            BookingHistory.user_id.in_(db.session.query(User.id).filter(User.role == 'user').order_by(
+                User.created_at.desc(), User.id.desc()).limit(500))).scalar()
+    if counted != expected:
+        problems.append(f'the users page with history counted {counted} bookings, expected {expected}')
+
+    # A participant's profile lists their moved bookings only when asked
+    participant = logged_in_client(app, profile_user)
+    html = participant.get('/user/profile').get_data(as_text=True)
+    with_history = participant.get('/user/profile?history=1').get_data(as_text=True)
+    shown = len(re.findall(r'<td>#(\d+)</td>', with_history))
+    total_card = re.search(r'Total Bookings</h6>\s*<h3 class="text-primary">(\d+)', html)
+    if shown != profile_total or not total_card or int(total_card.group(1)) != profile_total:
+        problems.append(f'profile showed {shown} bookings with history and a total of '
+                        f'{total_card and total_card.group(1)}, expected {profile_total}')
+
+    # New bookings never reuse a moved id, even once the newest booking has moved too
+    with app.app_context():
+        user = User.query.filter_by(role='user').order_by(User.id.desc()).first()
+        rejected_booking = Booking(user_id=user.id, room_id=Room.query.first().id, status='rejected')
+        db.session.add(rejected_booking)
+        db.session.commit()
+        transitions.move_to_history([rejected_booking.id])
+        booking = Booking(user_id=user.id, room_id=Room.query.first().id, status='pending')
+        db.session.add(booking)
+        db.session.commit()
+        if db.session.get(BookingHistory, booking.id):
+            problems.append(f'new booking #{booking.id} reused a moved id')
+
+    if problems:
+        for problem in problems:
+            print(f'❌ {problem}')
+        return 1
+    print('✅ Finished bookings moved to the history and stayed reachable when asked for')
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
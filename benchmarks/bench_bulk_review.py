@@ -0,0 +1,122 @@
+"""
+Benchmark and check for bulk booking review.
+Seeds thousands of pending bookings across many rooms on a scratch SQLite
+file, times approving a sample one POST at a time, then approves the rest
+with a single bulk POST. Checks that the bulk approval ran in one commit,
+kept every room counter in step with the bookings table, wrote one audit log
+and one queued email per booking, and that a batch that would overfill a room
+is refused as a whole.
+Run with: python -m benchmarks.bench_bulk_review [bookings] [rooms]
+"""
+
+import sys
+import time
+
+from sqlalchemy import event, func
+from models import db, User, Room, Booking, Log, EmailOutbox
+from benchmarks.common import scratch_app, admin_id, logged_in_client
+
+app = scratch_app('bench_bulk_review')
+
+SAMPLE = 50  # Bookings approved one at a time for comparison
+
+def seed(bookings, rooms):
+    capacity = bookings // rooms + 1
+    room_rows = [Room(room_no=f'B{n:04d}', capacity=capacity, available_beds=capacity,
+                      occupied_beds=0, allocated_beds=0) for n in range(rooms)]
+    db.session.add_all(room_rows)
+    users = [User(name=f'Bulk {n}', email=f'bulk{n}@example.com', phone='0000000000',
+                  password_hash='unused') for n in range(bookings)]
+    db.session.add_all(users)
+    db.session.flush()
+    db.session.add_all([Booking(user_id=user.id, room_id=room_rows[n % rooms].id, status='pending')
+                        for n, user in enumerate(users)])
+    # One small room that a bulk approval would overfill
+    full = Room(room_no='TINY', capacity=1, available_beds=1, occupied_beds=0, allocated_beds=0)
+    db.session.add(full)
+    db.session.flush()
+    db.session.add_all([Booking(user_id=users[n].id, room_id=full.id, status='pending') for n in range(3)])
+    db.session.commit()
+    return full.id
+
+def count_commits():
+    commits = []
+    event.listen(db.engine, 'commit', lambda connection: commits.append(1))
+    return commits
+
+def room_problems():
+    """Rooms whose allocated_beds disagree with their approved and checked-in bookings"""
+    allocated = dict(db.session.query(Booking.room_id, func.count(Booking.id)).filter(
+        Booking.status.in_(['approved', 'checked_in'])).group_by(Booking.room_id).all())
+    return [f'room {room.room_no}: allocated_beds {room.allocated_beds}, bookings say {allocated.get(room.id, 0)}'
+            for room in Room.query.all() if room.allocated_beds != allocated.get(room.id, 0)
+            or room.allocated_beds > room.capacity]
+
+def main():
+    bookings = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    rooms = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    problems = []
+
+    with app.app_context():
+        tiny_room_id = seed(bookings, rooms)
+        sample = [booking.id for booking in Booking.query.filter(Booking.room_id != tiny_room_id)
+                  .order_by(Booking.id).limit(SAMPLE)]
+        commits = count_commits()
+
+    client = logged_in_client(app, admin_id(app), 'admin')
+
+    # One POST per booking
+    started = time.perf_counter()
+    for booking_id in sample:
+        client.post(f'/admin/bookings/approve/{booking_id}')
+    single = (time.perf_counter() - started) / SAMPLE
+    print(f'one at a time     {SAMPLE:>6} approvals in {single * SAMPLE:6.2f}s  {single * 1000:7.2f} ms each')
+
+    # A batch that would overfill a room is refused and changes nothing
+    response = client.post('/admin/bookings/bulk', data={'action': 'approve', 'scope': 'room', 'room_id': tiny_room_id},
+                           follow_redirects=True)
+    with app.app_context():
+        if Booking.query.filter_by(room_id=tiny_room_id, status='approved').count() or b'Not enough free beds' not in response.data:
+            problems.append('a bulk approval that overfills a room was not refused as a whole')
+        remaining = Booking.query.filter(Booking.status == 'pending', Booking.room_id != tiny_room_id).count()
+
+    # Everything else in one POST: pick each of the other rooms' pending bookings by id
+    with app.app_context():
+        ids = [booking_id for booking_id, in db.session.query(Booking.id).filter(
+            Booking.status == 'pending', Booking.room_id != tiny_room_id)]
+    commits.clear()
+    started = time.perf_counter()
+    response = client.post('/admin/bookings/bulk', data={'action': 'approve', 'booking_ids': ids})
+    bulk = time.perf_counter() - started
+    bulk_commits = len(commits)
+    print(f'bulk              {remaining:>6} approvals in {bulk:6.2f}s  {bulk / remaining * 1000:7.2f} ms each, '
+          f'{bulk_commits} commit(s)')
+    print(f'estimated one-at-a-time time for the same batch: {single * remaining:.1f}s '
+          f'({single * remaining / bulk:.0f}x slower)')
+
+    # Reject what is left in the small room
+    client.post('/admin/bookings/bulk', data={'action': 'reject', 'scope': 'all'})
+
+    with app.app_context():
+        approved = Booking.query.filter_by(status='approved').count()
+        if approved != bookings:
+            problems.append(f'expected {bookings} approved bookings, got {approved}')
+        if Booking.query.filter_by(status='pending').count():
+            problems.append('pending bookings are left after rejecting all')
+        if bulk_commits != 1 or response.status_code != 302:
+            problems.append(f'the bulk approval used {bulk_commits} commits')
+        logs = Log.query.filter_by(action='booking_approved').count()
+        emails = EmailOutbox.query.filter_by(kind='booking_approved').count()
+        if logs != bookings or emails != bookings:
+            problems.append(f'expected {bookings} approval logs and emails, got {logs} and {emails}')
+        problems += room_problems()
+
+    if problems:
+        for problem in problems:
+            print(f'❌ {problem}')
+        return 1
+    print('✅ Bulk review applied every booking, log and email in one transaction without overbooking')
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
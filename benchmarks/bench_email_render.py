@@ -0,0 +1,90 @@
+"""
+Micro-benchmark for rendering notification emails.
+Renders the booking approval email for thousands of recipients four ways and
+reports the cost per message:
+  - compiling the templates on every call (no template cache)
+  - compiled templates, wrapped in email.mime objects and flattened for
+    sending (what send_message did for every email)
+  - compiled templates with the pre-built MIME skeleton (render_email)
+  - the two template renders alone, as a floor
+then renders every other kind of email with its pre-built skeleton.
+Run with: python -m benchmarks.bench_email_render [emails]
+"""
+
+import sys
+import time
+from email.mime.multipart import MIMEMultipart
+from email.mime.text import MIMEText
+
+from email_templates import EMAIL_SUBJECTS, TEMPLATE_DIR, create_environment, render_email
+from benchmarks.common import scratch_app
+
+app = scratch_app('bench_email_render')
+
+def context_for(n):
+    return {
+        'user_name': f'Participant {n}',
+        'room_no': f'R{n % 500:03d}',
+        'room_description': 'Boys hostel, block A, second floor',
+        'app_url': 'http://127.0.0.1:5000',
+    }
+
+def uncached(n):
+    """Load and compile both templates from disk for every email"""
+    env = create_environment()
+    context = context_for(n)
+    return (env.get_template('booking_approved.txt').render(context),
+            env.get_template('booking_approved.html').render(context))
+
+def mime_objects(n, text, html):
+    """Build email.mime objects around the rendered bodies and flatten them"""
+    context = context_for(n)
+    message = MIMEMultipart('alternative')
+    message['Subject'] = '🎉 Room Booking Approved - IGNITRON 2K25'
+    message['From'] = 'accommodation@example.com'
+    message['To'] = f'participant{n}@example.com'
+    message.attach(MIMEText(text.render(context), 'plain'))
+    message.attach(MIMEText(html.render(context), 'html'))
+    return message.as_bytes()
+
+def skeleton(n):
+    context = context_for(n)
+    return render_email('booking_approved', f'participant{n}@example.com', **context).data
+
+def render_only(n, text, html):
+    context = context_for(n)
+    return text.render(context), html.render(context)
+
+def measure(name, count, render):
+    started = time.perf_counter()
+    size = 0
+    for n in range(count):
+        result = render(n)
+        size += len(result) if isinstance(result, bytes) else sum(map(len, result))
+    elapsed = time.perf_counter() - started
+    print(f'{name:<34}{elapsed / count * 1e6:9.1f} µs/email  {count / elapsed:9.0f} emails/s  '
+          f'{size / count / 1024:6.1f} KiB/email')
+    return elapsed / count
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    env = create_environment()
+    text = env.get_template('booking_approved.txt')
+    html = env.get_template('booking_approved.html')
+
+    print(f'Rendering {count} booking approval emails from {TEMPLATE_DIR}')
+    with app.app_context():
+        measure('templates compiled per call', max(count // 10, 1), uncached)
+        before = measure('compiled + email.mime + flatten', count, lambda n: mime_objects(n, text, html))
+        after = measure('compiled + pre-built MIME skeleton', count, skeleton)
+        measure('template render only', count, lambda n: render_only(n, text, html))
+        for kind in EMAIL_SUBJECTS:
+            if kind != 'booking_approved':
+                measure(f'{kind} (skeleton)', count, lambda n, kind=kind: render_email(
+                    kind, f'participant{n}@example.com', **context_for(n)).data)
+
+    print(f'✅ The pre-built skeleton renders emails {before / after:.1f}x faster than email.mime objects')
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
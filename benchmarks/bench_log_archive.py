@@ -0,0 +1,143 @@
+"""
+Benchmark and check for log archival.
+Seeds log entries spread over the past two months on a scratch SQLite file,
+runs `flask archive-logs`, and reports how many rows moved, how fast, and
+how much smaller the archive is than the rows it replaced. Checks that the
+logs page and CSV export still see every entry when the From Date reaches
+into archived days (walking every page forwards and back), that they stay on
+the hot table otherwise, and that entries archived twice after an
+interrupted run are only listed once.
+Run with: python -m benchmarks.bench_log_archive [entries]
+"""
+
+import os
+import random
+import re
+import sys
+import time
+from datetime import timedelta
+
+from models import db, User, Log, get_ist_now
+import log_archive
+from routes.admin import log_stats_cache
+from benchmarks.common import scratch_app, database_file, admin_id, logged_in_client, add_participants
+
+app = scratch_app('bench_log_archive')
+
+ACTIONS = ['login', 'logout', 'booking_requested', 'booking_approved', 'check_in', 'check_out']
+DAYS = 60
+
+def seed(count, rng):
+    now = get_ist_now().replace(tzinfo=None)
+    user_ids = add_participants(200)
+    for start in range(0, count, 10000):
+        db.session.execute(db.insert(Log), [
+            {'user_id': rng.choice(user_ids), 'action': rng.choice(ACTIONS), 'details': f'Seeded entry {n}',
+             'timestamp': now - timedelta(seconds=rng.randrange(DAYS * 86400))}
+            for n in range(start, min(count, start + 10000))
+        ])
+    db.session.commit()
+
+def walk_pages(client, query):
+    """Every log id on the pages of the logs view, following Older links, then back with Newer links"""
+    forward, url = [], f'/admin/logs?{query}'
+    pages = []
+    while url:
+        html = client.get(url).get_data(as_text=True)
+        pages.append(url)
+        forward += [int(found) for found in re.findall(r'<strong>#(\d+)</strong>', html)]
+        older = re.search(r'href="([^"#]+)">\s*Older', html)
+        url = older.group(1).replace('&amp;', '&') if older else None
+    backward, url = [], pages[-1]
+    while url:
+        html = client.get(url).get_data(as_text=True)
+        backward = [int(found) for found in re.findall(r'<strong>#(\d+)</strong>', html)] + backward
+        newer = re.search(r'href="([^"#]+)">\s*<i class="bi bi-chevron-left"></i> Newer', html)
+        url = newer.group(1).replace('&amp;', '&') if newer else None
+    return forward, backward, len(pages)
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+    rng = random.Random(2025)
+    problems = []
+
+    with app.app_context():
+        seed(count, rng)
+        cutoff = log_archive.retention_cutoff()
+        expected_archived = Log.query.filter(Log.timestamp < cutoff).count()
+        oldest = db.session.query(db.func.min(Log.timestamp)).scalar().date()
+        user = User.query.filter_by(email='participant7@example.com').first()
+        expected_user_total = Log.query.filter_by(user_id=user.id, action='login').count()
+    db_bytes = os.path.getsize(database_file(app))
+
+    client = logged_in_client(app, admin_id(app), 'admin')
+
+    client.get('/admin/logs')  # Warm up templates and caches
+    started = time.perf_counter()
+    client.get('/admin/logs?per_page=50&action=login')
+    print(f'logs page with {count} hot rows: {(time.perf_counter() - started) * 1000:.0f} ms')
+
+    started = time.perf_counter()
+    result = app.test_cli_runner().invoke(args=['archive-logs'])
+    elapsed = time.perf_counter() - started
+    print(result.output.rstrip())
+    with app.app_context():
+        hot = Log.query.count()
+        segments = log_archive.segment_days()
+        archive_bytes = sum(os.path.getsize(log_archive.segment_path(day)) for day in segments)
+    print(f'archived {count + 1 - hot} rows in {elapsed:.2f}s ({(count + 1 - hot) / elapsed:.0f} rows/s) '
+          f'into {len(segments)} daily segments, {archive_bytes / 1024:.0f} KiB '
+          f'(the database file held all {count} rows in {db_bytes / 1024:.0f} KiB)')
+    if result.exit_code != 0 or count - (hot - 1) != expected_archived:
+        problems.append(f'expected {expected_archived} archived rows, {count - (hot - 1)} left the table')
+
+    log_stats_cache.clear()
+    started = time.perf_counter()
+    client.get('/admin/logs?per_page=50&action=login')
+    print(f'logs page with {hot} hot rows: {(time.perf_counter() - started) * 1000:.0f} ms')
+
+    # Without a From Date only the hot table is listed
+    html = client.get('/admin/logs').get_data(as_text=True)
+    if 'Including' in html:
+        problems.append('the default logs page searched the archive')
+
+    # A From Date in the archive lists hot and archived entries, every one exactly once
+    query = f'date_from={oldest:%Y-%m-%d}&action=login&user_email=PARTICIPANT7@&per_page=7'
+    started = time.perf_counter()
+    forward, backward, pages = walk_pages(client, query)
+    print(f'walked {pages} pages of one user\'s logins across hot and archived entries in '
+          f'{time.perf_counter() - started:.2f}s')
+    if len(forward) != expected_user_total or len(set(forward)) != len(forward):
+        problems.append(f'paging found {len(forward)} entries ({len(set(forward))} distinct), '
+                        f'expected {expected_user_total}')
+    if backward != forward:
+        problems.append('paging back with Newer did not retrace the Older pages')
+    totals = re.search(r'Total Logs</h6>\s*<h2 class="mb-0">(\d+)', client.get(f'/admin/logs?{query}').get_data(as_text=True))
+    if not totals or int(totals.group(1)) != expected_user_total:
+        problems.append(f'the Total Logs card showed {totals and totals.group(1)}, expected {expected_user_total}')
+
+    # The export includes archived entries too
+    started = time.perf_counter()
+    export = client.get(f'/admin/logs/export?date_from={oldest:%Y-%m-%d}').get_data(as_text=True)
+    rows = export.count('\n') - 1
+    print(f'export of all {rows} entries: {time.perf_counter() - started:.2f}s')
+    if rows != count + 1:
+        problems.append(f'the export had {rows} rows, expected {count + 1}')
+
+    # A run interrupted after writing but before deleting archives its rows again; they are listed once
+    with app.app_context():
+        day = log_archive.segment_days()[0]
+        records = list(log_archive.read_segment(day))
+        log_archive._append_segment(day, records[:50])
+        if len(list(log_archive.read_segment(day))) != len(records):
+            problems.append('an entry archived twice was listed twice')
+
+    if problems:
+        for problem in problems:
+            print(f'❌ {problem}')
+        return 1
+    print('✅ Old logs moved to compressed daily segments and stayed searchable from the logs page and export')
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,114 @@
+"""
+Throughput benchmark for the pooled SMTP transport.
+Sends the same batch of emails to the local SMTP stand-in three ways: a new
+connection and login per email (the old behaviour), pooled connections shared
+by a thread pool (what the outbox worker does), and a batch per pooled
+session. The stand-in adds a round-trip delay to every reply so the
+handshake cost resembles a remote server. Also checks that a dropped
+connection is replaced transparently and that the rate limit holds.
+Run with: python -m benchmarks.bench_mail_transport [emails] [threads] [latency ms]
+"""
+
+import smtplib
+import socket
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from email.mime.text import MIMEText
+
+from mail_transport import SMTPPool
+from scripts.smtp_standin import SMTPStandIn
+
+def make_messages(count):
+    messages = []
+    for n in range(count):
+        message = MIMEText(f'Booking update number {n}', 'plain')
+        message['Subject'] = f'Benchmark {n}'
+        message['From'] = 'accommodation@example.com'
+        message['To'] = f'participant{n}@example.com'
+        messages.append(message)
+    return messages
+
+def send_unpooled(standin, message):
+    """What send_message used to do: connect, log in, send, quit"""
+    with smtplib.SMTP('localhost', standin.port, timeout=30) as server:
+        server.login('bench', 'bench')
+        server.send_message(message)
+
+def run(name, standin, send):
+    """Run send(), then report messages per second, connections and logins"""
+    standin.messages.clear()
+    standin.connections = standin.logins = 0
+    started = time.perf_counter()
+    send()
+    elapsed = time.perf_counter() - started
+    count = len(standin.messages)
+    print(f'{name:<28}{count:>6} emails in {elapsed:6.2f}s  {count / elapsed:8.1f} emails/s  '
+          f'{standin.connections:>4} connections  {standin.logins:>4} logins')
+    return count
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 300
+    threads = int(sys.argv[2]) if len(sys.argv) > 2 else 4
+    latency = (float(sys.argv[3]) if len(sys.argv) > 3 else 5) / 1000
+    standin = SMTPStandIn(latency=latency).start()
+    messages = make_messages(count)
+    problems = []
+
+    def pool_for(**options):
+        return SMTPPool('localhost', standin.port, username='bench', password='bench',
+                        use_tls=False, size=threads, **options)
+
+    print(f'{count} emails, {threads} threads, {latency * 1000:.0f} ms per SMTP reply')
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        run('connection per email', standin,
+            lambda: list(executor.map(lambda message: send_unpooled(standin, message), messages)))
+
+        pool = pool_for()
+        sent = run('pooled, one per call', standin, lambda: list(executor.map(pool.send, messages)))
+        if standin.connections > threads:
+            problems.append(f'the pool opened {standin.connections} connections for {threads} threads')
+        pool.close()
+
+        pool = pool_for()
+        batches = [messages[n::threads] for n in range(threads)]
+        sent += run('pooled, batch per thread', standin, lambda: list(executor.map(pool.send_many, batches)))
+        if sent != 2 * count:
+            problems.append(f'expected {2 * count} pooled emails, the stand-in got {sent}')
+        pool.close()
+
+    # A connection the server dropped is replaced and the email still goes out
+    pool = pool_for()
+    pool.send(messages[0])
+    idle = pool._idle.get_nowait()
+    idle.smtp.sock.shutdown(socket.SHUT_RDWR)
+    pool._idle.put(idle)
+    run('after a dropped connection', standin, lambda: pool.send(messages[0]))
+    if len(standin.messages) != 1 or pool.connections_opened != 2:
+        problems.append('the dropped connection was not replaced, or the email was lost')
+    pool.close()
+
+    # Connections are recycled after MAIL_MAX_MESSAGES_PER_CONNECTION emails
+    pool = pool_for(max_messages_per_connection=25)
+    run('recycled every 25 emails', standin, lambda: pool.send_many(messages[:100]))
+    if standin.connections != 4:
+        problems.append(f'expected 4 connections for 100 emails, got {standin.connections}')
+    pool.close()
+
+    # The rate limit caps throughput
+    pool = pool_for(rate_limit=50)
+    started = time.perf_counter()
+    run('rate limited to 50/s', standin, lambda: pool.send_many(messages[:100]))
+    if time.perf_counter() - started < 1.5:
+        problems.append('100 emails at 50/s finished in under 1.5s')
+    pool.close()
+
+    if problems:
+        for problem in problems:
+            print(f'❌ {problem}')
+        return 1
+    print('✅ Pooled sending reused connections, survived a drop and respected the rate limit')
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
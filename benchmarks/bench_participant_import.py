@@ -0,0 +1,102 @@
+"""
+Benchmark and check for bulk participant pre-registration.
+On a scratch SQLite file: times hashing the same passwords in one process and
+across a process pool (one per core), then imports a registration sheet
+through `flask import-participants` and reports users per second. Checks that
+imported participants (with their own or a generated password) can log in,
+and that a sheet with bad or already registered rows imports nothing.
+The pool only helps with more than one core; on a single core both runs take
+about the same time.
+Run with: python -m benchmarks.bench_participant_import [participants]
+"""
+
+import csv
+import os
+import sys
+import time
+
+from models import User
+import participant_import
+from benchmarks.common import scratch_app, database_file
+
+app = scratch_app('bench_participant_import')
+workdir = os.path.dirname(database_file(app))
+
+def write_sheet(path, rows):
+    with open(path, 'w', newline='', encoding='utf-8') as out:
+        writer = csv.writer(out)
+        writer.writerow(['name', 'email', 'phone', 'password'])
+        writer.writerows(rows)
+    return path
+
+def user_count():
+    with app.app_context():
+        return User.query.count()
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 96
+    cores = os.cpu_count() or 1
+    problems = []
+    runner = app.test_cli_runner()
+
+    # Hashing alone, serial against the pool
+    passwords = [f'secret{n:05d}' for n in range(count)]
+    timings = {}
+    for processes in sorted({1, cores, max(cores, 2)}):
+        started = time.perf_counter()
+        participant_import.hash_passwords(passwords, processes)
+        timings[processes] = time.perf_counter() - started
+        print(f'hash {count} passwords with {processes} processes: {timings[processes]:6.2f}s '
+              f'({count / timings[processes]:6.1f} users/s)')
+    if cores > 1 and timings[cores] > timings[1] / min(cores, 4) * 1.5:
+        problems.append(f'{cores} processes were only {timings[1] / timings[cores]:.1f}x faster than one')
+
+    # A sheet with bad or duplicate rows imports nothing
+    bad = write_sheet(os.path.join(workdir, 'bad.csv'), [
+        ('Ok', 'ok@example.com', '1', 'secret1'), ('No Phone', 'nophone@example.com', '', ''),
+        ('Bad Email', 'not-an-email', '1', ''), ('Again', 'ok@example.com', '1', ''),
+        ('Short', 'short@example.com', '1', 'abc'), ('Admin', 'admin@ignitron.com', '1', ''),
+    ])
+    before = user_count()
+    result = runner.invoke(args=['import-participants', bad])
+    reported = result.output.count('❌')
+    if result.exit_code == 0 or user_count() != before or reported != 5:
+        problems.append(f'a sheet with 5 bad rows imported {user_count() - before} users and reported {reported} errors')
+
+    # The full sheet: every other participant gets a generated password
+    rows = [(f'Participant {n}', f'participant{n}@example.com', f'9{n:09d}', passwords[n] if n % 2 else '')
+            for n in range(count)]
+    sheet = write_sheet(os.path.join(workdir, 'participants.csv'), rows)
+    credentials = os.path.join(workdir, 'credentials.csv')
+    before = user_count()
+    started = time.perf_counter()
+    result = runner.invoke(args=['import-participants', sheet, '--credentials-out', credentials])
+    elapsed = time.perf_counter() - started
+    print(result.output.rstrip())
+    added = user_count() - before
+    print(f'import: {added} participants in {elapsed:.2f}s ({added / elapsed:.1f} users/s)')
+    if result.exit_code != 0 or added != count:
+        problems.append(f'expected {count} imported participants, got {added}')
+
+    # Both kinds of password work for logging in
+    with open(credentials, encoding='utf-8') as stream:
+        generated = {row['email']: row['password'] for row in csv.DictReader(stream)}
+    if len(generated) != (count + 1) // 2:
+        problems.append(f'expected {(count + 1) // 2} generated passwords, got {len(generated)}')
+    with app.app_context():
+        for n in (0, 1, count - 1):
+            email = f'participant{n}@example.com'
+            user = User.query.filter_by(email=email).first()
+            password = passwords[n] if n % 2 else generated.get(email, '')
+            if not user or user.role != 'user' or not user.check_password(password):
+                problems.append(f'{email} cannot log in with its password')
+
+    if problems:
+        for problem in problems:
+            print(f'❌ {problem}')
+        return 1
+    print('✅ Participants were hashed in parallel, imported in one transaction and can log in')
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,76 @@
+"""
+Benchmark for the bulk room import.
+On a scratch SQLite file: adds a sample of rooms one form POST at a time for
+comparison, then uploads a CSV of hundreds of rooms through the import page
+and times it, and times an upsert of the same rooms.
+tests/test_room_import.py checks validation, upserts and JSON files.
+Run with: python -m benchmarks.bench_room_import [rooms]
+"""
+
+import io
+import sys
+import time
+
+from models import Room
+from benchmarks.common import scratch_app, admin_id, logged_in_client
+
+app = scratch_app('bench_room_import')
+
+SAMPLE = 50  # Rooms added one at a time for comparison
+
+def csv_file(rows):
+    lines = ['room_no,capacity,description'] + [f'{room_no},{capacity},{description}'
+                                                 for room_no, capacity, description in rows]
+    return io.BytesIO('\n'.join(lines).encode())
+
+def upload(client, data, filename, mode='insert', action='import'):
+    return client.post('/admin/rooms/import', data={
+        'rooms_file': (data, filename), 'mode': mode, 'action': action
+    }, content_type='multipart/form-data', follow_redirects=True)
+
+def room_count():
+    with app.app_context():
+        return Room.query.count()
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 800
+    problems = []
+
+    client = logged_in_client(app, admin_id(app), 'admin')
+
+    # One form POST per room
+    started = time.perf_counter()
+    for n in range(SAMPLE):
+        client.post('/admin/rooms/add', data={'room_no': f'S{n:03d}', 'capacity': '4'})
+    single = (time.perf_counter() - started) / SAMPLE
+    print(f'one at a time  {SAMPLE:>6} rooms in {single * SAMPLE:6.2f}s  {single * 1000:7.2f} ms each')
+
+    # Hundreds of rooms in one upload
+    rows = [(f'H{n:04d}', 2 + n % 6, f'Hostel block {n // 100}') for n in range(count)]
+    before = room_count()
+    started = time.perf_counter()
+    response = upload(client, csv_file(rows), 'rooms.csv')
+    bulk = time.perf_counter() - started
+    added = room_count() - before
+    print(f'bulk import    {added:>6} rooms in {bulk:6.2f}s  {bulk / max(added, 1) * 1000:7.2f} ms each '
+          f'({single * count / bulk:.0f}x faster than one at a time)')
+    if added != count:
+        problems.append(f'expected {count} imported rooms, got {added}')
+
+    # Every room again in upsert mode, with two more beds each
+    started = time.perf_counter()
+    response = upload(client, csv_file([(room_no, capacity + 2, '') for room_no, capacity, _ in rows]), 'grow.csv',
+                      mode='upsert')
+    print(f'bulk upsert    {count:>6} rooms in {time.perf_counter() - started:6.2f}s')
+    if f'updated {count} existing rooms'.encode() not in response.data:
+        problems.append(f'the upsert did not update all {count} rooms')
+
+    if problems:
+        for problem in problems:
+            print(f'❌ {problem}')
+        return 1
+    print('✅ Rooms were imported and upserted in bulk')
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
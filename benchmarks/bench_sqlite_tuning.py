@@ -0,0 +1,128 @@
+"""
+Throughput benchmark for the SQLite tuning profile.
+Runs the same peak-hour mix twice, each time in a fresh process on a fresh
+database file: once with SQLite's stock settings (SQLITE_TUNING=false) and
+once with the tuned profile. Participants request bookings while others
+reload their dashboards and poll the availability API, then the admin
+approves the requests under the same read load. Reports requests/second per
+phase, how often SQLite said the database was locked and whether any booking
+request or approval was lost, and checks the pragmas each run actually used.
+Run with: python -m benchmarks.bench_sqlite_tuning [participants] [threads]
+"""
+
+import json
+import os
+import random
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from sqlalchemy import event
+from models import db, Room, Booking, get_ist_now
+import sqlite_tuning
+from benchmarks.common import scratch_app, admin_id, logged_in_client, add_participants
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+READS_PER_WRITE = 5  # Dashboard reloads and API polls sent alongside every write
+
+def run_profile(tuned, participants, threads):
+    """One run in this process on a fresh database file"""
+    app = scratch_app('bench_sqlite_tuning', SQLITE_TUNING=tuned)
+    admin = admin_id(app)
+    with app.app_context():
+        now = get_ist_now()
+        db.session.execute(db.insert(Room), [
+            {'room_no': f'R{n:03d}', 'capacity': 4, 'available_beds': 4, 'occupied_beds': 0,
+             'allocated_beds': 0, 'created_at': now} for n in range(participants // 4 + 1)
+        ])
+        user_ids = add_participants(participants)
+        db.session.commit()
+        room_ids = [room_id for room_id, in db.session.query(Room.id)]
+        pragmas = sqlite_tuning.current_pragmas()
+        engine = db.engine
+
+    locked = []
+    event.listen(engine, 'handle_error', lambda context: locked.append(1) if 'locked' in str(context.original_exception) else None)
+
+    def send(request):
+        user_id, role, method, path, data = request
+        return getattr(logged_in_client(app, user_id, role), method)(path, data=data).status_code
+
+    def reads(rng, count):
+        return [(user_id, 'user', 'get', '/user/dashboard', None) if rng.random() < 0.6
+                else (user_id, 'user', 'get', '/api/rooms', None) for user_id in rng.choices(user_ids, k=count)]
+
+    def fire(work):
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=threads) as pool:
+            statuses = list(pool.map(send, work))
+        return len(work), time.perf_counter() - started, sum(status >= 500 for status in statuses)
+
+    rng = random.Random(2025)
+    requests = [(user_id, 'user', 'post', '/user/bookings/request', {'room_id': str(room_ids[n // 4])})
+                for n, user_id in enumerate(user_ids)]
+    work = requests + reads(rng, len(requests) * READS_PER_WRITE)
+    rng.shuffle(work)
+    phases = {'request': fire(work)}
+
+    with app.app_context():
+        pending = [booking_id for booking_id, in db.session.query(Booking.id).filter(Booking.status == 'pending')]
+    approvals = [(admin, 'admin', 'post', f'/admin/bookings/approve/{booking_id}', None) for booking_id in pending]
+    work = approvals + reads(rng, len(approvals) * READS_PER_WRITE)
+    rng.shuffle(work)
+    phases['approve'] = fire(work)
+
+    with app.app_context():
+        approved = Booking.query.filter_by(status='approved').count()
+    return {'tuned': tuned, 'pragmas': pragmas, 'phases': phases, 'locked': len(locked),
+            'lost': participants - approved}
+
+def main():
+    participants = int(sys.argv[1]) if len(sys.argv) > 1 else 300
+    threads = int(sys.argv[2]) if len(sys.argv) > 2 else 16
+    results = []
+    for tuned in (False, True):
+        out = subprocess.run([sys.executable, '-m', 'benchmarks.bench_sqlite_tuning', '--run',
+                              str(tuned).lower(), str(participants), str(threads)],
+                             cwd=ROOT, capture_output=True, text=True)
+        if out.returncode != 0:
+            print(out.stderr)
+            return 1
+        results.append(json.loads(out.stdout.strip().splitlines()[-1]))
+
+    print(f'{participants} participants, {threads} threads, {READS_PER_WRITE} reads per write')
+    problems = []
+    for result in results:
+        name = 'tuned' if result['tuned'] else 'stock'
+        pragmas = result['pragmas']
+        print(f'{name}: journal_mode={pragmas["journal_mode"]} synchronous={pragmas["synchronous"]} '
+              f'busy_timeout={pragmas["busy_timeout"]} cache_size={pragmas["cache_size"]} '
+              f'mmap_size={pragmas["mmap_size"]} temp_store={pragmas["temp_store"]}')
+        for phase, (count, elapsed, errors) in result['phases'].items():
+            print(f'  {phase:<8}{count:>7} requests in {elapsed:6.2f}s {count / elapsed:8.1f} req/s  {errors} server errors')
+        print(f'  {result["locked"]} "database is locked" errors, {result["lost"]} bookings not approved')
+        if result['lost'] or any(errors for _, _, errors in result['phases'].values()):
+            problems.append(f'the {name} run lost {result["lost"]} bookings')
+    stock, tuned = results
+    if tuned['pragmas']['journal_mode'] != 'wal' or tuned['pragmas']['synchronous'] != 1:
+        problems.append(f'the tuned run used {tuned["pragmas"]}')
+
+    def rate(result):
+        count = sum(count for count, _, _ in result['phases'].values())
+        return count / sum(elapsed for _, elapsed, _ in result['phases'].values())
+    print(f'overall: {rate(stock):.1f} req/s stock, {rate(tuned):.1f} req/s tuned ({rate(tuned) / rate(stock):.2f}x)')
+
+    if problems:
+        for problem in problems:
+            print(f'❌ {problem}')
+        return 1
+    print('✅ Both profiles kept every write; the tuned one ran with WAL and synchronous=NORMAL')
+    return 0
+
+if __name__ == '__main__':
+    if sys.argv[1:2] == ['--run']:
+        participants, threads = int(sys.argv[3]), int(sys.argv[4])
+        print(json.dumps(run_profile(sys.argv[2] == 'true', participants, threads)))
+        sys.exit(0)
+    sys.exit(main())
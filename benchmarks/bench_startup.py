@@ -0,0 +1,116 @@
+"""
+Startup benchmark for the application factory.
+Times `import app` and create_app() in fresh interpreters against a budget
+and checks that neither opens the database, so pre-forked workers can start
+together. Then seeds the default admin from several processes at once
+(exactly one must be created), and forks workers from a parent whose
+connection pool and per-process resources are in use, checking that every
+child starts with an empty pool and serves a login on its own connection.
+Run with: python -m benchmarks.bench_startup [runs] [workers]
+"""
+
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+from multiprocessing import Pool
+
+# Set in the environment rather than passed to create_app(), so the fresh interpreters and pool workers see it too
+DB_FILE = os.path.join(tempfile.mkdtemp(), 'bench_startup.db')
+os.environ['DATABASE_URL'] = f'sqlite:///{DB_FILE}'
+os.environ['MAIL_PASSWORD'] = ''  # Skip emails
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Seconds each step may take in a fresh worker process
+IMPORT_BUDGET = 1.5
+CREATE_APP_BUDGET = 0.25
+
+TIMING = '''
+import time
+started = time.perf_counter()
+import app
+imported = time.perf_counter()
+app.create_app()
+print(imported - started, time.perf_counter() - imported)
+'''
+
+def time_startup(runs):
+    """Median import and create_app() seconds over fresh interpreters"""
+    imports, creates = [], []
+    for _ in range(runs):
+        out = subprocess.run([sys.executable, '-c', TIMING], cwd=ROOT, capture_output=True, text=True, check=True)
+        imported, created = map(float, out.stdout.split()[-2:])
+        imports.append(imported)
+        creates.append(created)
+    return statistics.median(imports), statistics.median(creates)
+
+def seed_in_worker(_):
+    from app import create_app
+    from seed import create_default_admin
+    app = create_app()
+    with app.app_context():
+        return create_default_admin()
+
+def main():
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    workers = int(sys.argv[2]) if len(sys.argv) > 2 else 4
+    problems = []
+
+    # Importing and building the app leaves the database alone
+    imported, created = time_startup(runs)
+    print(f'import app: {imported * 1000:.0f} ms, create_app(): {created * 1000:.1f} ms (median of {runs})')
+    if imported > IMPORT_BUDGET or created > CREATE_APP_BUDGET:
+        problems.append(f'startup took {imported:.2f}s to import and {created:.2f}s to build, '
+                        f'over the {IMPORT_BUDGET}s / {CREATE_APP_BUDGET}s budget')
+    if os.path.exists(DB_FILE):
+        problems.append('importing or building the app opened the database')
+
+    from app import create_app
+    from migrations import init_db
+    from models import db, User
+    import live_feed
+
+    app = create_app()
+    with app.app_context():
+        init_db()
+
+    # Seeding from several workers at once creates one admin
+    with Pool(workers) as pool:
+        created = pool.map(seed_in_worker, range(workers))
+    with app.app_context():
+        admins = User.query.filter_by(role='admin').count()
+    print(f'{workers} concurrent seeds: {sum(created)} created the admin, {admins} admin in the table')
+    if sum(created) != 1 or admins != 1:
+        problems.append(f'{workers} concurrent seeds created {sum(created)} admins')
+
+    # Forked workers drop the parent's pooled connections and per-process resources
+    with app.app_context():
+        User.query.count()
+        live_feed.get_feed()
+        pooled = db.engine.pool.checkedin()
+    children = []
+    for _ in range(workers):
+        pid = os.fork()
+        if pid == 0:
+            with app.app_context():
+                fresh = db.engine.pool.checkedin() == 0 and 'live_feed' not in app.extensions
+            response = app.test_client().post('/login', data={'email': 'admin@ignitron.com', 'password': 'admin123'})
+            os._exit(0 if fresh and response.status_code == 302 else 1)
+        children.append(pid)
+    failed = sum(os.waitpid(pid, 0)[1] != 0 for pid in children)
+    with app.app_context():
+        still_works = User.query.count() == 1
+    print(f'parent had {pooled} pooled connection(s); {workers - failed} of {workers} forked workers started clean')
+    if failed or not still_works:
+        problems.append(f'{failed} forked workers inherited the parent\'s pool or could not serve a login')
+
+    if problems:
+        for problem in problems:
+            print(f'❌ {problem}')
+        return 1
+    print('✅ Startup stays within budget, never touches the database, and forked workers start clean')
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,57 @@
+"""
+Benchmark for the synthetic dataset generator.
+Runs `flask generate-data` at fest scale (20k participants, 1k rooms, 50k
+bookings, 2M log entries by default) on a scratch SQLite file, checks that it
+finishes within a minute, then checks that each admin page answers within a
+second on the result.
+tests/test_synthetic_data.py checks the generated rows themselves.
+Run with: python -m benchmarks.bench_synthetic_data [users rooms bookings logs]
+"""
+
+import sys
+import time
+
+from benchmarks.common import scratch_app
+
+app = scratch_app('bench_synthetic_data')
+
+BUDGET_SECONDS = 60
+PAGE_BUDGET_MS = 1000
+PAGES = ['/admin/dashboard', '/admin/bookings', '/admin/logs', '/admin/users']
+
+def main():
+    users, rooms, bookings, logs = [int(arg) for arg in sys.argv[1:5]] or [20000, 1000, 50000, 2000000]
+    problems = []
+
+    started = time.perf_counter()
+    result = app.test_cli_runner().invoke(args=['generate-data', '--users', str(users), '--rooms', str(rooms),
+                                                '--bookings', str(bookings), '--logs', str(logs)])
+    elapsed = time.perf_counter() - started
+    print(result.output.rstrip())
+    if result.exit_code != 0:
+        print(f'❌ generate-data failed: {result.exception!r}')
+        return 1
+    if elapsed > BUDGET_SECONDS:
+        problems.append(f'generating took {elapsed:.1f}s, over the {BUDGET_SECONDS}s budget')
+
+    client = app.test_client()
+    client.post('/login', data={'email': 'admin@ignitron.com', 'password': 'admin123'})
+    for path in PAGES:
+        started = time.perf_counter()
+        status = client.get(path).status_code
+        page_ms = (time.perf_counter() - started) * 1000
+        print(f'{path}: {status} in {page_ms:.0f} ms')
+        if status != 200:
+            problems.append(f'{path} answered {status}')
+        elif page_ms > PAGE_BUDGET_MS:
+            problems.append(f'{path} took {page_ms:.0f} ms, over the {PAGE_BUDGET_MS} ms budget')
+
+    if problems:
+        for problem in problems:
+            print(f'❌ {problem}')
+        return 1
+    print(f'✅ Generated the dataset in {elapsed:.1f}s and every admin page answered within budget')
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
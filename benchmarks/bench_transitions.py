@@ -0,0 +1,110 @@
+"""
+Benchmark of the mutating endpoints: commits and latency per request.
+Drives register, login, booking and room routes through the Flask test
+client against a scratch SQLite file and reports, per endpoint, how many
+COMMITs each request issued and its mean / 95th percentile latency.
+Run with: python -m benchmarks.bench_transitions [requests per endpoint]
+"""
+
+import statistics
+import sys
+import time
+
+from sqlalchemy import event
+from models import db, Room, Booking
+from benchmarks.common import scratch_app
+
+app = scratch_app('bench_transitions')
+
+class Recorder:
+    """Collects commit counts and latencies per endpoint"""
+
+    def __init__(self, engine):
+        self.commits = 0
+        self.results = {}
+        event.listen(engine, 'commit', self._on_commit)
+
+    def _on_commit(self, conn):
+        self.commits += 1
+
+    def measure(self, name, send):
+        commits_before = self.commits
+        started = time.perf_counter()
+        response = send()
+        elapsed = time.perf_counter() - started
+        assert response.status_code in (200, 302), f'{name} returned {response.status_code}'
+        timings, commits = self.results.get(name, ([], 0))
+        timings.append(elapsed)
+        self.results[name] = (timings, commits + self.commits - commits_before)
+
+    def report(self):
+        print(f'{"endpoint":<18}{"requests":>10}{"commits/req":>13}{"mean ms":>10}{"p95 ms":>10}')
+        for name, (timings, commits) in self.results.items():
+            timings = sorted(timings)
+            p95 = timings[min(len(timings) - 1, int(len(timings) * 0.95))]
+            print(f'{name:<18}{len(timings):>10}{commits / len(timings):>13.2f}'
+                  f'{statistics.mean(timings) * 1000:>10.2f}{p95 * 1000:>10.2f}')
+
+def login(client, email, password):
+    client.get('/logout')
+    client.post('/login', data={'email': email, 'password': password})
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+
+    with app.app_context():
+        engine = db.engine
+    recorder = Recorder(engine)
+    client = app.test_client()
+    password = 'password123'
+    emails = [f'bench{n}@example.com' for n in range(count)]
+
+    # Accounts
+    for n, email in enumerate(emails):
+        recorder.measure('register', lambda: client.post('/register', data={
+            'name': f'Bench {n}', 'email': email, 'phone': '0000000000',
+            'password': password, 'confirm_password': password}))
+    for email in emails:
+        client.get('/logout')
+        recorder.measure('login', lambda: client.post('/login', data={'email': email, 'password': password}))
+
+    # Rooms
+    login(client, 'admin@ignitron.com', 'admin123')
+    for n in range(count):
+        recorder.measure('add_room', lambda: client.post('/admin/rooms/add', data={
+            'room_no': f'B{n}', 'capacity': '4'}))
+    with app.app_context():
+        room_ids = [room.id for room in Room.query.filter(Room.room_no.like('B%')).order_by(Room.id)]
+    for n, room_id in enumerate(room_ids):
+        recorder.measure('edit_room', lambda: client.post(f'/admin/rooms/edit/{room_id}', data={
+            'room_no': f'B{n}', 'capacity': '4', 'description': 'Benchmark room'}))
+
+    # Booking requests, then approve half and reject the rest
+    for n, email in enumerate(emails):
+        login(client, email, password)
+        recorder.measure('request_booking', lambda: client.post('/user/bookings/request', data={
+            'room_id': room_ids[n // 4]}))
+    with app.app_context():
+        bookings = [(booking.id, booking.user_id) for booking in Booking.query.order_by(Booking.id)]
+    approved = bookings[::2]
+    login(client, 'admin@ignitron.com', 'admin123')
+    for booking_id, _ in approved:
+        recorder.measure('approve_booking', lambda: client.post(f'/admin/bookings/approve/{booking_id}'))
+    for booking_id, _ in bookings[1::2]:
+        recorder.measure('reject_booking', lambda: client.post(f'/admin/bookings/reject/{booking_id}'))
+
+    # Check in and out of the approved bookings
+    for index, (booking_id, _) in enumerate(approved):
+        login(client, emails[index * 2], password)
+        recorder.measure('checkin', lambda: client.post(f'/user/bookings/checkin/{booking_id}'))
+        recorder.measure('checkout', lambda: client.post(f'/user/bookings/checkout/{booking_id}'))
+
+    # Rooms without active bookings can be deleted
+    login(client, 'admin@ignitron.com', 'admin123')
+    for room_id in room_ids:
+        recorder.measure('delete_room', lambda: client.post(f'/admin/rooms/delete/{room_id}'))
+
+    recorder.report()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,52 @@
+"""
+Shared setup for the benchmarks: an app on a scratch SQLite file, the
+default admin, logged-in test clients and bulk-inserted participants.
+Run the benchmarks from the repository root, e.g.:
+    python -m benchmarks.bench_transitions
+"""
+
+import os
+import tempfile
+from app import create_app, init_database
+from models import db, User, get_ist_now
+from seed import DEFAULT_ADMIN_EMAIL
+
+def scratch_app(name, **config):
+    """An app with the schema and default admin on <name>.db in a fresh temp directory"""
+    workdir = tempfile.mkdtemp(prefix=f'{name}-')
+    app = create_app({
+        'SQLALCHEMY_DATABASE_URI': f'sqlite:///{os.path.join(workdir, f"{name}.db")}',
+        'LOG_ARCHIVE_DIR': os.path.join(workdir, 'log_archive'),
+        'MAIL_PASSWORD': '',  # Queued emails are skipped, never sent
+        **config,
+    })
+    init_database(app)
+    return app
+
+def database_file(app):
+    """Path of the app's SQLite file"""
+    return app.config['SQLALCHEMY_DATABASE_URI'][len('sqlite:///'):]
+
+def admin_id(app):
+    with app.app_context():
+        return User.query.filter_by(email=DEFAULT_ADMIN_EMAIL).first().id
+
+def logged_in_client(app, user_id, role='user'):
+    """A test client whose session is already logged in as user_id"""
+    client = app.test_client()
+    with client.session_transaction() as session:
+        session['user_id'] = user_id
+        session['user_role'] = role
+        session['user_name'] = 'x'
+    return client
+
+def add_participants(count, prefix='participant', password_hash='unused'):
+    """Insert count participants in one statement and return their ids in order; needs an app context"""
+    now = get_ist_now()
+    db.session.execute(db.insert(User), [
+        {'name': f'{prefix.title()} {n}', 'email': f'{prefix}{n}@example.com', 'phone': '0000000000',
+         'password_hash': password_hash, 'role': 'user', 'created_at': now} for n in range(count)
+    ])
+    db.session.flush()
+    return [user_id for user_id, in db.session.query(User.id).filter(
+        User.email.like(f'{prefix}%@example.com')).order_by(User.id)]
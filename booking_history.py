@@ -0,0 +1,69 @@
+"""
+Booking history: finished bookings out of the hot table.
+Rejected and checked-out bookings never change again, but left in bookings
+they bloat every availability, dashboard and admission query. `flask
+move-booking-history` moves those finished more than BOOKING_HISTORY_AFTER_DAYS
+ago into booking_history (same columns, own indexes) in batches, one
+transaction each.
+
+Moved bookings keep their id. The bookings table is AUTOINCREMENT, so SQLite
+never hands a moved booking's id out again and new bookings cannot collide
+with the history table.
+
+Pages read the history only when asked (?history=1): live and historical
+rows are merged by pagination.paginate_keyset_merge or user_bookings().
+"""
+
+import heapq
+from datetime import timedelta
+from flask import current_app
+from sqlalchemy import func
+from sqlalchemy.orm import joinedload
+from models import db, Booking, BookingHistory, get_ist_now
+import transitions
+
+def history_cutoff(days=None):
+    """Bookings finished before this are moved to the history"""
+    if days is None:
+        days = current_app.config.get('BOOKING_HISTORY_AFTER_DAYS', 7)
+    return get_ist_now() - timedelta(days=days)
+
+def move_finished_bookings(admin_id, before=None, batch_size=None):
+    """Move bookings rejected or checked out before before into booking_history; returns how many moved"""
+    before = before or history_cutoff()
+    batch_size = batch_size or current_app.config.get('BOOKING_HISTORY_BATCH_SIZE', 2000)
+    total = 0
+    while True:
+        booking_ids = [booking_id for booking_id, in db.session.query(Booking.id).filter(
+            Booking.status.in_(transitions.FINISHED_STATUSES),
+            Booking.updated_at < before
+        ).order_by(Booking.id).limit(batch_size)]
+        if not booking_ids:
+            break
+        total += transitions.move_to_history(booking_ids)
+        if len(booking_ids) < batch_size:
+            break
+
+    if total:
+        transitions.log_action(admin_id, 'bookings_moved_to_history',
+                               f'Moved {total} finished bookings from before {before:%Y-%m-%d} to the history')
+        transitions.commit()
+    return total
+
+def history_counts(user_id):
+    """{status: count} of a user's historical bookings, from the history index"""
+    return dict(db.session.query(BookingHistory.status, func.count(BookingHistory.id)).filter(
+        BookingHistory.user_id == user_id
+    ).group_by(BookingHistory.status))
+
+def user_bookings(user_id, include_history=False):
+    """A user's bookings newest first, with their moved bookings merged in if asked"""
+    live = Booking.query.options(joinedload(Booking.room)).filter_by(user_id=user_id).order_by(
+        Booking.created_at.desc(), Booking.id.desc()
+    ).all()
+    if not include_history:
+        return live
+    history = BookingHistory.query.options(joinedload(BookingHistory.room)).filter_by(user_id=user_id).order_by(
+        BookingHistory.created_at.desc(), BookingHistory.id.desc()
+    ).all()
+    return list(heapq.merge(live, history, key=lambda booking: (booking.created_at, booking.id), reverse=True))
@@ -0,0 +1,65 @@
+"""
+Shared pieces of the bulk importers (room_import, participant_import).
+Both read a whole file into labelled rows before validating any of them,
+collect every bad row in the same result shape, and find the rows that
+already exist with one set-based query per LOOKUP_CHUNK values.
+"""
+
+import csv
+import io
+import json
+from models import db
+
+LOOKUP_CHUNK = 500  # Values per existing-row query, well under SQLite's parameter limit
+
+# What reading an unreadable file raises; the importers report it as a single 'file' error
+READ_ERRORS = (ValueError, UnicodeDecodeError, csv.Error)
+
+class ImportResult:
+    """The per-row errors of a validated import; subclasses add the rows to write"""
+
+    def __init__(self):
+        self.errors = []  # (row label, message)
+
+    @property
+    def ok(self):
+        return not self.errors
+
+    def error(self, label, message):
+        self.errors.append((label, message))
+
+def read_rows(stream, required, filename='', json_key=None):
+    """
+    (row label, dict) pairs from an uploaded or opened file. CSV files need a
+    header row with the required columns; with a json_key, a .json file holds
+    a list of objects or an object with that list under json_key.
+    """
+    data = stream.read()
+    if isinstance(data, bytes):
+        data = data.decode('utf-8-sig')
+
+    if json_key and filename.lower().endswith('.json'):
+        items = json.loads(data)
+        if isinstance(items, dict):
+            items = items.get(json_key)
+        if not isinstance(items, list):
+            raise ValueError(f'JSON must be a list of {json_key} or an object with a "{json_key}" list.')
+        return [(f'item {number}', item) for number, item in enumerate(items, start=1)]
+
+    reader = csv.DictReader(io.StringIO(data))
+    reader.fieldnames = [name.strip().lower() for name in reader.fieldnames or []]
+    missing = set(required) - set(reader.fieldnames)
+    if missing:
+        raise ValueError(f'CSV header is missing {", ".join(sorted(missing))}.')
+    # Line numbers as shown in a spreadsheet: the header is line 1
+    return [(f'line {number}', row) for number, row in enumerate(reader, start=2)]
+
+def existing_values(column, values, *columns):
+    """{value: (columns...)} for the values of column already in the database"""
+    found = {}
+    values = list(values)
+    for start in range(0, len(values), LOOKUP_CHUNK):
+        chunk = values[start:start + LOOKUP_CHUNK]
+        found.update((value, tuple(rest)) for value, *rest in db.session.query(column, *columns).filter(
+            column.in_(chunk)))
+    return found
@@ -0,0 +1,60 @@
+"""
+Small in-process caches with a time-to-live.
+Each worker process keeps its own copy, so values are only ever a few
+seconds stale and nothing needs to be shared between workers.
+"""
+
+import threading
+import time
+
+class TTLCache:
+    """Thread-safe mapping whose entries expire ttl seconds after being set"""
+
+    def __init__(self, ttl=5, max_entries=1024):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return default
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return default
+            return value
+
+    def set(self, key, value, ttl=None):
+        ttl = self.ttl if ttl is None else ttl
+        if ttl <= 0:
+            return
+        with self._lock:
+            if len(self._entries) >= self.max_entries:
+                self._evict_expired()
+                if len(self._entries) >= self.max_entries:
+                    self._entries.clear()
+            self._entries[key] = (time.monotonic() + ttl, value)
+
+    def get_or_set(self, key, compute, ttl=None):
+        """Return the cached value for key, computing and storing it on a miss"""
+        value = self.get(key)
+        if value is None:
+            value = compute()
+            self.set(key, value, ttl)
+        return value
+
+    def delete(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def _evict_expired(self):
+        now = time.monotonic()
+        for key in [key for key, (expires_at, _) in self._entries.items() if expires_at < now]:
+            del self._entries[key]
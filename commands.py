@@ -0,0 +1,290 @@
+"""
+Flask CLI commands for database maintenance and background workers.
+Run with: flask --app app <command>
+"""
+
+import csv
+import os
+import time
+import click
+from flask.cli import with_appcontext
+from flask import current_app
+from sqlalchemy import func
+from werkzeug.security import check_password_hash
+from models import db, User, EmailOutbox, IST
+from migrations import init_db
+from seed import create_default_admin, DEFAULT_ADMIN_EMAIL, DEFAULT_ADMIN_PASSWORD
+import outbox
+import allocation
+import room_import
+import participant_import
+import passwords
+import log_archive
+import booking_history
+import transitions
+import sqlite_tuning
+import synthetic_data
+
+def acting_admin():
+    """The admin that command-line changes are logged as, or a hint to seed one"""
+    admin = User.query.filter_by(role='admin').order_by(User.id).first()
+    if admin is None:
+        raise click.ClickException('Run flask seed first')
+    return admin
+
+@click.command('init-db')
+@with_appcontext
+def init_db_command():
+    """Create the tables, or add missing columns and indexes to an existing database. Run once per deployment."""
+    changes = init_db()
+    if changes:
+        for change in changes:
+            click.echo(f'✓ Added {change}')
+    else:
+        click.echo('✓ Database schema is up to date')
+
+@click.command('seed')
+@click.option('--admin-email', default=DEFAULT_ADMIN_EMAIL, show_default=True, help='Email of the admin account.')
+@click.option('--admin-password', default=DEFAULT_ADMIN_PASSWORD, help='Password of the admin account if it is created.')
+@with_appcontext
+def seed_command(admin_email, admin_password):
+    """Create the admin account if it doesn't exist."""
+    if create_default_admin(admin_email, admin_password):
+        click.echo(f'✓ Created admin {admin_email}')
+    else:
+        click.echo(f'✓ Admin {admin_email} already exists')
+
+@click.command('outbox-worker')
+@click.option('--threads', type=int, default=None, help='Sending threads (default EMAIL_WORKER_THREADS).')
+@with_appcontext
+def outbox_worker_command(threads):
+    """Send queued notification emails until interrupted."""
+    worker = outbox.OutboxWorker(current_app._get_current_object(), threads)
+    click.echo(f'📧 Email outbox worker running with {worker.threads} threads (Ctrl+C to stop)')
+    try:
+        worker.run()
+    except KeyboardInterrupt:
+        worker.stop()
+
+@click.command('outbox-status')
+@with_appcontext
+def outbox_status_command():
+    """Show how many outbox emails are in each state."""
+    counts = db.session.query(EmailOutbox.status, func.count(EmailOutbox.id)).group_by(EmailOutbox.status).all()
+    for status, count in counts:
+        click.echo(f'{status:<10}{count:>8}')
+    if not counts:
+        click.echo('The email outbox is empty')
+
+@click.command('outbox-requeue')
+@with_appcontext
+def outbox_requeue_command():
+    """Retry dead-lettered emails, and emails skipped while no credentials were configured."""
+    click.echo(f'✓ Requeued {outbox.requeue_dead()} dead-lettered or skipped emails')
+
+@click.command('allocate-rooms')
+@click.option('--dry-run', is_flag=True, help='Show the plan without changing anything.')
+@click.option('--no-groups', is_flag=True, help='Do not keep participants who requested the same room together.')
+@with_appcontext
+def allocate_rooms_command(dry_run, no_groups):
+    """Pack every pending booking into the free beds and approve it."""
+    started = time.perf_counter()
+    plan = allocation.load_allocation_plan(keep_groups=not no_groups)
+    elapsed = time.perf_counter() - started
+    summary = plan.summary()
+    click.echo(f'Planned in {elapsed * 1000:.0f} ms: {summary["assigned"]} bookings into {summary["rooms_used"]} rooms '
+               f'({summary["rooms_filled"]} filled), {summary["unassigned"]} left pending, '
+               f'free beds {summary["free_beds_before"]} -> {summary["free_beds_after"]}')
+    if dry_run:
+        return
+
+    admin = acting_admin()
+    try:
+        count = transitions.apply_allocation(plan, admin.id)
+    except transitions.TransitionError as e:
+        raise click.ClickException(e.message)
+    click.echo(f'✓ Approved {count} bookings; approval emails queued')
+
+@click.command('import-rooms')
+@click.argument('path', type=click.Path(exists=True, dir_okay=False))
+@click.option('--upsert', is_flag=True, help='Update the capacity of rooms that already exist.')
+@click.option('--dry-run', is_flag=True, help='Validate the file without importing it.')
+@with_appcontext
+def import_rooms_command(path, upsert, dry_run):
+    """Import rooms from a CSV or JSON file."""
+    started = time.perf_counter()
+    with open(path, encoding='utf-8-sig') as stream:
+        result = room_import.load_room_import(stream, path, upsert)
+    for label, message in result.errors:
+        click.echo(f'❌ {label}: {message}')
+    if not result.ok:
+        raise click.ClickException(f'{len(result.errors)} rows have errors; nothing was imported')
+    click.echo(f'✓ {len(result.new_rooms)} new rooms, {len(result.updates)} to update')
+    if dry_run:
+        return
+
+    admin = acting_admin()
+    try:
+        added, updated = transitions.import_rooms(result, admin.id)
+    except transitions.TransitionError as e:
+        raise click.ClickException(e.message)
+    click.echo(f'✓ Imported {added} rooms and updated {updated} in {time.perf_counter() - started:.2f}s')
+
+@click.command('import-participants')
+@click.argument('path', type=click.Path(exists=True, dir_okay=False))
+@click.option('--processes', type=int, default=None, help='Password hashing processes (default: one per core).')
+@click.option('--credentials-out', type=click.Path(dir_okay=False, writable=True),
+              help='Write the generated initial passwords to this CSV file.')
+@click.option('--dry-run', is_flag=True, help='Validate the file without importing it.')
+@with_appcontext
+def import_participants_command(path, processes, credentials_out, dry_run):
+    """Pre-register participants from a CSV file with name, email, phone and optional password columns."""
+    started = time.perf_counter()
+    with open(path, encoding='utf-8-sig') as stream:
+        result = participant_import.load_participant_import(stream)
+    for label, message in result.errors:
+        click.echo(f'❌ {label}: {message}')
+    if not result.ok:
+        raise click.ClickException(f'{len(result.errors)} rows have errors; nothing was imported')
+    generated = [p for p in result.participants if p['generated']]
+    click.echo(f'✓ {len(result.participants)} participants to register, {len(generated)} without a password')
+    if dry_run:
+        return
+    if generated and not credentials_out:
+        raise click.ClickException('Some rows have no password; pass --credentials-out to keep the generated ones')
+
+    admin = acting_admin()
+    processes = processes or os.cpu_count() or 1
+    hashing_started = time.perf_counter()
+    hashes = participant_import.hash_passwords([p['password'] for p in result.participants], processes)
+    hashing = time.perf_counter() - hashing_started
+    click.echo(f'✓ Hashed {len(hashes)} passwords in {hashing:.2f}s with {processes} processes '
+               f'({len(hashes) / max(hashing, 1e-9):.0f} users/s)')
+
+    try:
+        count = transitions.import_participants(result, hashes, admin.id)
+    except transitions.TransitionError as e:
+        raise click.ClickException(e.message)
+
+    if generated:
+        with open(credentials_out, 'w', newline='', encoding='utf-8') as out:
+            writer = csv.writer(out)
+            writer.writerow(['name', 'email', 'password'])
+            writer.writerows([p['name'], p['email'], p['password']] for p in generated)
+        click.echo(f'✓ Wrote {len(generated)} initial passwords to {credentials_out}')
+    elapsed = time.perf_counter() - started
+    click.echo(f'✓ Registered {count} participants in {elapsed:.2f}s ({count / elapsed:.0f} users/s)')
+
+# Methods compared by bench-password-hash besides the configured one
+BENCH_HASH_METHODS = ['scrypt:32768:8:1', 'scrypt:16384:8:1', 'scrypt:8192:8:1',
+                      'pbkdf2:sha256:600000', 'pbkdf2:sha256:260000']
+
+@click.command('bench-password-hash')
+@click.option('--method', 'methods', multiple=True, help='Method to measure (repeatable; default: a standard set).')
+@click.option('--seconds', type=float, default=1.0, help='Time spent measuring each method.')
+@with_appcontext
+def bench_password_hash_command(methods, seconds):
+    """Report password hashes per second for each hash method on this machine."""
+    configured = passwords.normalize_method(current_app.config['PASSWORD_HASH_METHOD'])
+    methods = methods or [configured] + [m for m in BENCH_HASH_METHODS if m != configured]
+    workers = current_app.config['PASSWORD_VERIFY_WORKERS']
+    click.echo(f'{os.cpu_count()} cores, PASSWORD_VERIFY_WORKERS={workers}')
+    for method in methods:
+        password_hash = passwords.hash_password('benchmark-password', method)
+        count = 0
+        started = time.perf_counter()
+        while time.perf_counter() - started < seconds:
+            check_password_hash(password_hash, 'benchmark-password')
+            count += 1
+        elapsed = time.perf_counter() - started
+        marker = '  (configured)' if passwords.normalize_method(method) == configured else ''
+        click.echo(f'{passwords.normalize_method(method):<24}{count / elapsed:8.1f} hashes/s '
+                   f'{elapsed / count * 1000:8.1f} ms each{marker}')
+
+@click.command('archive-logs')
+@click.option('--days', type=int, default=None, help='Keep this many days in the logs table (default LOG_RETENTION_DAYS).')
+@click.option('--batch-size', type=int, default=None, help='Rows moved per transaction (default LOG_ARCHIVE_BATCH_SIZE).')
+@with_appcontext
+def archive_logs_command(days, batch_size):
+    """Move old log entries into compressed daily archive segments; run it daily from cron."""
+    started = time.perf_counter()
+    before = log_archive.retention_cutoff(days)
+    admin = acting_admin()
+    count = log_archive.archive_logs(admin.id, before, batch_size)
+    elapsed = time.perf_counter() - started
+    click.echo(f'✓ Archived {count} log entries from before {before:%Y-%m-%d} in {elapsed:.2f}s '
+               f'to {log_archive.archive_dir()}')
+
+@click.command('move-booking-history')
+@click.option('--days', type=int, default=None, help='Move bookings finished this many days ago (default BOOKING_HISTORY_AFTER_DAYS).')
+@click.option('--batch-size', type=int, default=None, help='Bookings moved per transaction (default BOOKING_HISTORY_BATCH_SIZE).')
+@with_appcontext
+def move_booking_history_command(days, batch_size):
+    """Move rejected and checked-out bookings into the booking_history table."""
+    started = time.perf_counter()
+    before = booking_history.history_cutoff(days)
+    admin = acting_admin()
+    count = booking_history.move_finished_bookings(admin.id, before, batch_size)
+    click.echo(f'✓ Moved {count} finished bookings from before {before:%Y-%m-%d %H:%M} '
+               f'to the history in {time.perf_counter() - started:.2f}s')
+
+@click.command('db-maintenance')
+@click.option('--full-analyze', is_flag=True, help='Analyse every row instead of sampling SQLITE_ANALYSIS_LIMIT per index.')
+@click.option('--checkpoint', type=click.Choice(['PASSIVE', 'FULL', 'RESTART', 'TRUNCATE'], case_sensitive=False),
+              default='TRUNCATE', show_default=True, help='WAL checkpoint mode.')
+@with_appcontext
+def db_maintenance_command(full_analyze, checkpoint):
+    """Refresh the query planner statistics and checkpoint the WAL; run it from cron, e.g. hourly."""
+    if db.engine.dialect.name != 'sqlite':
+        raise click.ClickException('db-maintenance only applies to SQLite databases')
+    for step, seconds, result in sqlite_tuning.run_maintenance(full_analyze, checkpoint.upper()):
+        if step == 'checkpoint' and result:
+            busy, wal_pages, checkpointed = result
+            detail = f'{checkpointed} of {wal_pages} WAL pages written back' + (' (readers still busy)' if busy else '')
+        else:
+            detail = 'done'
+        click.echo(f'✓ {step}: {detail} in {seconds * 1000:.0f} ms')
+
+@click.command('generate-data')
+@click.option('--users', type=int, default=20000, show_default=True, help='Participants to create.')
+@click.option('--rooms', type=int, default=1000, show_default=True, help='Rooms to create.')
+@click.option('--bookings', type=int, default=50000, show_default=True, help='Bookings across all states.')
+@click.option('--logs', type=int, default=2000000, show_default=True, help='Log entries, including the bookings\' own.')
+@click.option('--days', type=int, default=14, show_default=True, help='Length of the fest the data covers.')
+@click.option('--end', type=click.DateTime(['%Y-%m-%d', '%Y-%m-%d %H:%M']), default=None,
+              help='When the data ends, in IST (default: now); fix it to reproduce the same rows.')
+@click.option('--seed', type=int, default=2025, show_default=True, help='Random seed.')
+@click.option('--password', default='password', show_default=True, help='Password of every generated participant.')
+@with_appcontext
+def generate_data_command(users, rooms, bookings, logs, days, end, seed, password):
+    """Fill a fresh database with synthetic participants, rooms, bookings and logs for load testing."""
+    if not User.query.filter_by(role='admin').first():
+        raise click.ClickException('Run flask init-db and flask seed first')
+    if synthetic_data.has_data():
+        raise click.ClickException('The database already has rooms, bookings or participants; '
+                                   'point DATABASE_URL at a new file')
+    started = time.perf_counter()
+    result = synthetic_data.generate(users, rooms, bookings, logs, seed, days,
+                                     IST.localize(end) if end else None, password, click.echo)
+    if db.engine.dialect.name == 'sqlite':
+        # Planner statistics for the new table sizes
+        sqlite_tuning.run_maintenance()
+    click.echo(f'✓ Generated {result["users"]} participants, {result["rooms"]} rooms, {result["bookings"]} bookings '
+               f'and {result["logs"]} log entries in {time.perf_counter() - started:.1f}s (seed {seed})')
+
+def register_commands(app):
+    """Register the maintenance commands on the Flask CLI"""
+    app.cli.add_command(init_db_command)
+    app.cli.add_command(init_db_command, 'upgrade-db')  # Its name before init-db
+    app.cli.add_command(seed_command)
+    app.cli.add_command(outbox_worker_command)
+    app.cli.add_command(outbox_status_command)
+    app.cli.add_command(outbox_requeue_command)
+    app.cli.add_command(allocate_rooms_command)
+    app.cli.add_command(import_rooms_command)
+    app.cli.add_command(import_participants_command)
+    app.cli.add_command(bench_password_hash_command)
+    app.cli.add_command(archive_logs_command)
+    app.cli.add_command(move_booking_history_command)
+    app.cli.add_command(db_maintenance_command)
+    app.cli.add_command(generate_data_command)
@@ -5,8 +5,64 @@ class Config:
     SECRET_KEY = os.environ.get('SECRET_KEY') or 'your-secret-key-change-this-in-production'
     SQLALCHEMY_DATABASE_URI = os.environ.get('DATABASE_URL') or 'sqlite:///accommodation.db'
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+    
+    # SQLite tuning applied to every new connection (see sqlite_tuning.py); SQLITE_TUNING=false keeps SQLite's defaults.
+    # WAL needs the database on a local disk, not a network share.
+    SQLITE_TUNING = (os.environ.get('SQLITE_TUNING') or 'true').lower() in ('1', 'true', 'yes')
+    SQLITE_JOURNAL_MODE = os.environ.get('SQLITE_JOURNAL_MODE') or 'WAL'  # Readers don't wait for the writer
+    SQLITE_SYNCHRONOUS = os.environ.get('SQLITE_SYNCHRONOUS') or 'NORMAL'  # No fsync per commit; safe with WAL
+    SQLITE_BUSY_TIMEOUT_MS = int(os.environ.get('SQLITE_BUSY_TIMEOUT_MS') or 5000)  # Wait this long for the write lock
+    SQLITE_CACHE_SIZE_KB = int(os.environ.get('SQLITE_CACHE_SIZE_KB') or 32768)  # Page cache per connection
+    SQLITE_MMAP_SIZE_MB = int(os.environ.get('SQLITE_MMAP_SIZE_MB') or 256)  # Memory-mapped reads, 0 disables
+    SQLITE_TEMP_STORE = os.environ.get('SQLITE_TEMP_STORE') or 'MEMORY'  # Sorts and temp tables stay off disk
+    # Rows per index sampled by `flask db-maintenance` when it refreshes the planner statistics
+    SQLITE_ANALYSIS_LIMIT = int(os.environ.get('SQLITE_ANALYSIS_LIMIT') or 1000)
     PERMANENT_SESSION_LIFETIME = timedelta(hours=24)
     
+    # Times a booking or room transition is retried when SQLite reports the database is locked
+    TRANSITION_RETRIES = int(os.environ.get('TRANSITION_RETRIES') or 5)
+    
+    # Admin listings (bookings, logs, users) are paginated with keyset cursors
+    ADMIN_PAGE_SIZE = int(os.environ.get('ADMIN_PAGE_SIZE') or 50)
+    ADMIN_MAX_PAGE_SIZE = int(os.environ.get('ADMIN_MAX_PAGE_SIZE') or 500)
+    
+    # Seconds a logged-in user's name and role are cached per worker for authorisation (0 disables)
+    PRINCIPAL_CACHE_TTL = int(os.environ.get('PRINCIPAL_CACHE_TTL') or 30)
+    
+    # Seconds the admin dashboard counts and recent lists are cached; any transition clears them (0 disables)
+    DASHBOARD_CACHE_TTL = int(os.environ.get('DASHBOARD_CACHE_TTL') or 5)
+    
+    # Seconds the logs page statistics are cached per filter combination (0 disables)
+    LOG_STATS_CACHE_TTL = int(os.environ.get('LOG_STATS_CACHE_TTL') or 10)
+    
+    # Log retention: `flask archive-logs` moves older entries into gzip JSONL segments, one per day
+    LOG_RETENTION_DAYS = int(os.environ.get('LOG_RETENTION_DAYS') or 30)
+    LOG_ARCHIVE_BATCH_SIZE = int(os.environ.get('LOG_ARCHIVE_BATCH_SIZE') or 5000)  # Rows moved per transaction
+    LOG_ARCHIVE_DIR = os.environ.get('LOG_ARCHIVE_DIR') or ''  # Default: log_archive/ in the instance folder
+    
+    # Rows fetched from the database per chunk when streaming the logs CSV export
+    EXPORT_CHUNK_SIZE = int(os.environ.get('EXPORT_CHUNK_SIZE') or 1000)
+    
+    # Password hashing: Werkzeug method and cost, e.g. scrypt:32768:8:1 or pbkdf2:sha256:600000.
+    # Existing hashes are rewritten with this method when their owner next logs in.
+    PASSWORD_HASH_METHOD = os.environ.get('PASSWORD_HASH_METHOD') or 'scrypt:32768:8:1'
+    # Threads checking passwords at login in each worker process, so workers x this at most across the app
+    # (about cores / workers keeps a burst within the CPU); request threads still block on their check
+    PASSWORD_VERIFY_WORKERS = int(os.environ.get('PASSWORD_VERIFY_WORKERS') or os.cpu_count() or 1)
+    
+    # Booking history: `flask move-booking-history` moves bookings rejected or checked out this long ago
+    BOOKING_HISTORY_AFTER_DAYS = int(os.environ.get('BOOKING_HISTORY_AFTER_DAYS') or 7)
+    BOOKING_HISTORY_BATCH_SIZE = int(os.environ.get('BOOKING_HISTORY_BATCH_SIZE') or 2000)  # Bookings moved per transaction
+    
+    # Live dashboards: Server-Sent Events streams fed by the booking transitions (see live_feed.py).
+    # Each open screen holds a request thread, so run gthread workers with --threads above LIVE_FEED_MAX_STREAMS
+    LIVE_FEED_MAX_STREAMS = int(os.environ.get('LIVE_FEED_MAX_STREAMS') or 200)  # Open screens per worker; each holds a thread
+    LIVE_FEED_MAX_QUEUED = int(os.environ.get('LIVE_FEED_MAX_QUEUED') or 100)  # Unsent events before a screen is told to reload
+    LIVE_FEED_HEARTBEAT_SECONDS = float(os.environ.get('LIVE_FEED_HEARTBEAT_SECONDS') or 15)
+    LIVE_FEED_POLL_SECONDS = float(os.environ.get('LIVE_FEED_POLL_SECONDS') or 1)  # How soon other workers' changes reach a screen
+    # Longest a stream stays open before the browser reconnects (0 = no limit); keep it below any server request timeout
+    LIVE_FEED_MAX_STREAM_SECONDS = float(os.environ.get('LIVE_FEED_MAX_STREAM_SECONDS') or 0)
+    
     # Email Configuration
     # Set these as environment variables for security:
     # MAIL_USERNAME=your-email@gmail.com
@@ -16,4 +72,21 @@ class Config:
     # Get App Password from: https://myaccount.google.com/apppasswords
     MAIL_PASSWORD = os.environ.get('MAIL_PASSWORD') or ''  # Set via environment variable for security
     MAIL_DEFAULT_SENDER = os.environ.get('MAIL_USERNAME') or 'rahulrgadgimata@gmail.com'
+    # SMTP server; point these at a local stand-in (python -m scripts.smtp_standin) for development
+    MAIL_SERVER = os.environ.get('MAIL_SERVER') or 'smtp.gmail.com'
+    MAIL_PORT = int(os.environ.get('MAIL_PORT') or 587)
+    MAIL_USE_TLS = (os.environ.get('MAIL_USE_TLS') or 'true').lower() in ('1', 'true', 'yes')
+    # Public address of the site, used for links in notification emails
+    APP_BASE_URL = os.environ.get('APP_BASE_URL') or 'http://127.0.0.1:5000'
+    # Pooled SMTP connections: logged-in sessions are reused across emails
+    MAIL_POOL_SIZE = int(os.environ.get('MAIL_POOL_SIZE') or 4)  # Open connections at most; match EMAIL_WORKER_THREADS
+    MAIL_MAX_MESSAGES_PER_CONNECTION = int(os.environ.get('MAIL_MAX_MESSAGES_PER_CONNECTION') or 100)  # Then reconnect
+    MAIL_RATE_LIMIT = float(os.environ.get('MAIL_RATE_LIMIT') or 0)  # Messages per second across the app, 0 for no limit
+    
+    # Email outbox: notifications are queued with the booking change and sent by a worker pool
+    EMAIL_WORKER_THREADS = int(os.environ.get('EMAIL_WORKER_THREADS') or 4)
+    EMAIL_MAX_ATTEMPTS = int(os.environ.get('EMAIL_MAX_ATTEMPTS') or 6)  # Then the email is dead-lettered
+    EMAIL_RETRY_BASE_SECONDS = int(os.environ.get('EMAIL_RETRY_BASE_SECONDS') or 30)  # Doubles per attempt
+    EMAIL_LEASE_SECONDS = int(os.environ.get('EMAIL_LEASE_SECONDS') or 300)  # Claimed emails return to the queue after this
+    EMAIL_POLL_SECONDS = float(os.environ.get('EMAIL_POLL_SECONDS') or 2)
 
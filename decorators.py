@@ -1,6 +1,6 @@
 from functools import wraps
 from flask import redirect, url_for, flash, session
-from models import User
+from principal import current_principal
 
 # Decorator for admin-only routes
 def admin_required(f):
@@ -9,8 +9,8 @@ def admin_required(f):
         if 'user_id' not in session:
             flash('Please login to access this page.', 'warning')
             return redirect(url_for('login'))
-        user = User.query.get(session['user_id'])
-        if not user or not user.is_admin():
+        principal = current_principal()
+        if not principal or not principal.is_admin():
             flash('Access denied. Admin privileges required.', 'danger')
             return redirect(url_for('user.dashboard'))
         return f(*args, **kwargs)
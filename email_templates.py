@@ -0,0 +1,117 @@
+"""
+Notification email rendering.
+Each kind of email has an HTML and a plain-text Jinja template under
+templates/email. The templates are compiled once when the app starts, and the
+MIME structure around them (headers, boundary and part headers) is serialised
+once per template too, so rendering an email only fills in the recipient and
+the two bodies. The result is ready-to-send bytes rather than an
+email.message.Message, which saves flattening the message for every recipient.
+"""
+
+import base64
+import os
+import uuid
+from email.header import Header
+from email.utils import formatdate
+from email import message_from_bytes
+from flask import current_app
+from jinja2 import Environment, FileSystemLoader, select_autoescape
+
+TEMPLATE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'templates', 'email')
+
+# Subject line for each kind of email; the kind is also the template name
+EMAIL_SUBJECTS = {
+    'booking_approved': '🎉 Room Booking Approved - IGNITRON 2K25',
+    'booking_rejected': 'Room Booking Update - IGNITRON 2K25',
+    'checkin_reminder': '⏰ Check-in Reminder - IGNITRON 2K25',
+    'checked_in': '🏠 Checked In - IGNITRON 2K25',
+}
+
+class RenderedEmail:
+    """A fully serialised email, sent as is by the SMTP pool"""
+
+    def __init__(self, sender, recipient, subject, data):
+        self.sender = sender
+        self.recipients = [recipient]
+        self.subject = subject
+        self.data = data
+
+    def as_message(self):
+        """Parse back into an email.message.Message (for inspection, not needed to send)"""
+        return message_from_bytes(self.data)
+
+def _encode_body(text):
+    # SMTP wants CRLF line endings and the bytes are sent as they are
+    return base64.encodebytes(text.encode('utf-8')).replace(b'\n', b'\r\n')
+
+class EmailTemplate:
+    """Compiled HTML and text templates plus the pre-serialised MIME skeleton around them"""
+
+    def __init__(self, env, kind, subject, sender, app_url):
+        self.kind = kind
+        self.subject = subject
+        self.sender = sender
+        self.html = env.get_template(f'{kind}.html')
+        self.text = env.get_template(f'{kind}.txt')
+        self.defaults = {'app_url': app_url}
+
+        boundary = f'==============={uuid.uuid4().hex}=='
+        part_headers = (
+            f'--{boundary}\r\n'
+            'Content-Type: text/{subtype}; charset="utf-8"\r\n'
+            'MIME-Version: 1.0\r\n'
+            'Content-Transfer-Encoding: base64\r\n\r\n'
+        )
+        subject_header = Header(subject, 'utf-8').encode(linesep='\r\n')
+        self._head = (
+            f'Content-Type: multipart/alternative; boundary="{boundary}"\r\n'
+            'MIME-Version: 1.0\r\n'
+            f'Subject: {subject_header}\r\n'
+            f'From: {sender}\r\n'
+        ).encode()
+        self._text_part = ('\r\n' + part_headers.format(subtype='plain')).encode()
+        self._html_part = ('\r\n' + part_headers.format(subtype='html')).encode()
+        self._tail = f'\r\n--{boundary}--\r\n'.encode()
+
+    def render(self, recipient, **context):
+        """Render the email for one recipient"""
+        if '\r' in recipient or '\n' in recipient:
+            raise ValueError(f'Invalid recipient address: {recipient!r}')
+        context = {**self.defaults, **context}
+        data = b''.join((
+            self._head,
+            f'To: {recipient}\r\nDate: {formatdate(localtime=True)}\r\n'.encode(),
+            self._text_part,
+            _encode_body(self.text.render(context)),
+            self._html_part,
+            _encode_body(self.html.render(context)),
+            self._tail,
+        ))
+        return RenderedEmail(self.sender, recipient, self.subject, data)
+
+def create_environment():
+    """A Jinja environment that compiles each email template once and never reloads it"""
+    return Environment(
+        loader=FileSystemLoader(TEMPLATE_DIR),
+        autoescape=select_autoescape(['html']),
+        auto_reload=False,
+        keep_trailing_newline=True,
+    )
+
+def init_email_templates(app):
+    """Compile every email template and build its MIME skeleton"""
+    env = create_environment()
+    sender = app.config.get('MAIL_DEFAULT_SENDER') or app.config.get('MAIL_USERNAME', '')
+    app_url = app.config.get('APP_BASE_URL', 'http://127.0.0.1:5000').rstrip('/')
+    app.extensions['email_templates'] = {
+        kind: EmailTemplate(env, kind, subject, sender, app_url)
+        for kind, subject in EMAIL_SUBJECTS.items()
+    }
+
+def render_email(kind, recipient, **context):
+    """Render the kind of email for recipient with the current app's compiled templates"""
+    templates = current_app.extensions.get('email_templates')
+    if templates is None:
+        init_email_templates(current_app)
+        templates = current_app.extensions['email_templates']
+    return templates[kind].render(recipient, **context)
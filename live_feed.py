@@ -0,0 +1,284 @@
+"""
+Live booking and occupancy feed over Server-Sent Events.
+Booking and room transitions report what they changed once their transaction
+has committed (bookings_changed, rooms_changed). The app's one LiveFeed fans
+each change out to every open dashboard stream through a bounded queue per
+screen, so an admin screen follows new requests, approvals and check-ins and a
+participant's screen follows room availability without reloading the page.
+Nothing is queried when no screen is listening.
+
+Admin screens get every booking change with the pending and checked-in count
+deltas; a participant's screen only gets room changes and their own bookings.
+A screen that falls too far behind is told to reload instead of being sent a
+gap.
+
+Under several worker processes (gunicorn -w 4) a change is made in one worker
+but its screens are spread over all of them. A worker with open screens keeps
+a row in live_feed_listeners renewed; while any worker is listening, each
+change is also written to live_events, and every listening worker polls that
+table every LIVE_FEED_POLL_SECONDS for the events other workers wrote.
+
+Each open stream holds a request thread for as long as the screen is open, so
+the app must run under a threaded worker class (gunicorn -k gthread --threads
+N, with N above LIVE_FEED_MAX_STREAMS plus the threads ordinary requests
+need). A sync worker serves one request at a time and is killed by --timeout
+while a stream is open. LIVE_FEED_MAX_STREAM_SECONDS caps how long one stream
+stays open, for servers that time out long requests anyway; the browser then
+reconnects, and changes made while it reconnects are not replayed.
+"""
+
+import json
+import queue
+import threading
+import time
+import uuid
+from datetime import timedelta
+from functools import wraps
+from flask import Response, current_app
+from sqlalchemy import func
+from models import db, User, Room, Booking, LiveEvent, LiveFeedListener, get_ist_now
+
+_feed_lock = threading.Lock()
+
+LISTENING_SECONDS = 30  # A listener row outlives its worker by at most this long
+EVENT_RETENTION = timedelta(minutes=5)  # Written events are pruned after this
+
+class Subscriber:
+    """One open stream: the screen's viewer and the events waiting to be sent to it"""
+
+    def __init__(self, user_id, is_admin, max_queued):
+        self.user_id = user_id
+        self.is_admin = is_admin
+        self.events = queue.Queue(max_queued)
+        self.overflowed = False
+
+    def visible(self, event, payload):
+        """The part of an event this screen may see, or None"""
+        if self.is_admin or event != 'bookings':
+            return payload
+        own = [booking for booking in payload['bookings'] if booking['user_id'] == self.user_id]
+        return {'bookings': own} if own else None
+
+class LiveFeed:
+    """Fans published events out to the subscribed streams of one app in one worker process"""
+
+    def __init__(self, max_subscribers, max_queued, app=None, poll_seconds=1.0):
+        self.max_subscribers = max_subscribers
+        self.max_queued = max_queued
+        self.app = app
+        self.poll_seconds = poll_seconds
+        self.origin = uuid.uuid4().hex  # Tells this feed's events apart from other workers'
+        self._subscribers = set()
+        self._lock = threading.Lock()
+        self._poller = None
+        self._closed = threading.Event()
+
+    def __len__(self):
+        return len(self._subscribers)
+
+    def subscribe(self, user_id, is_admin):
+        """A new Subscriber, or None if max_subscribers streams are already open"""
+        with self._lock:
+            if len(self._subscribers) >= self.max_subscribers:
+                return None
+            subscriber = Subscriber(user_id, is_admin, self.max_queued)
+            self._subscribers.add(subscriber)
+            if self._poller is None and self.app is not None and not self._closed.is_set():
+                self._poller = threading.Thread(target=self._poll, name='live-feed-poller', daemon=True)
+                self._poller.start()
+            return subscriber
+
+    def unsubscribe(self, subscriber):
+        with self._lock:
+            self._subscribers.discard(subscriber)
+
+    def publish(self, event, payload):
+        """Queue event for every subscriber allowed to see it, without ever blocking the publisher"""
+        with self._lock:
+            subscribers = list(self._subscribers)
+        shared = None
+        for subscriber in subscribers:
+            visible = subscriber.visible(event, payload)
+            if visible is None:
+                continue
+            if visible is payload:
+                # Encoded once for all the screens that see the whole event
+                shared = shared or json.dumps(payload, separators=(',', ':'))
+                data = shared
+            else:
+                data = json.dumps(visible, separators=(',', ':'))
+            try:
+                subscriber.events.put_nowait((event, data))
+            except queue.Full:
+                # Its stream sends a reload and ends; later events need not wait for it
+                subscriber.overflowed = True
+                self.unsubscribe(subscriber)
+
+    def close(self):
+        """Stop polling for other workers' events"""
+        self._closed.set()
+
+    def _poll(self):
+        """While screens are open here: stay listed as listening and publish the events other workers wrote"""
+        last_id = None
+        renew_at = 0
+        with self.app.app_context():
+            try:
+                while True:
+                    with self._lock:
+                        if not self._subscribers or self._closed.is_set():
+                            self._poller = None
+                            return
+                    try:
+                        if time.monotonic() >= renew_at:
+                            renew_listener(self.origin)
+                            renew_at = time.monotonic() + LISTENING_SECONDS / 3
+                        if last_id is None:
+                            # Only events written from now on
+                            last_id = db.session.query(func.max(LiveEvent.id)).scalar() or 0
+                        events = LiveEvent.query.filter(LiveEvent.id > last_id).order_by(LiveEvent.id).all()
+                        db.session.commit()  # Ends the read so writers are not held back
+                        for event in events:
+                            last_id = event.id
+                            if event.origin != self.origin:
+                                self.publish(event.event, json.loads(event.payload))
+                    except Exception as e:
+                        db.session.rollback()
+                        print(f"⚠️ Live feed poll failed: {e}")
+                    self._closed.wait(self.poll_seconds)
+            finally:
+                db.session.remove()
+
+def renew_listener(origin):
+    """List origin as listening for LISTENING_SECONDS more, and prune expired listeners and old events"""
+    now = get_ist_now()
+    db.session.merge(LiveFeedListener(origin=origin, listening_until=now + timedelta(seconds=LISTENING_SECONDS)))
+    LiveFeedListener.query.filter(LiveFeedListener.listening_until < now).delete(synchronize_session=False)
+    LiveEvent.query.filter(LiveEvent.created_at < now - EVENT_RETENTION).delete(synchronize_session=False)
+    db.session.commit()
+
+def get_feed():
+    """The current app's feed, created on first use"""
+    extensions = current_app.extensions
+    feed = extensions.get('live_feed')
+    if feed is None:
+        with _feed_lock:
+            feed = extensions.get('live_feed')
+            if feed is None:
+                feed = extensions['live_feed'] = LiveFeed(
+                    current_app.config.get('LIVE_FEED_MAX_STREAMS', 200),
+                    current_app.config.get('LIVE_FEED_MAX_QUEUED', 100),
+                    current_app._get_current_object(),
+                    current_app.config.get('LIVE_FEED_POLL_SECONDS', 1)
+                )
+    return feed
+
+def listening():
+    """True if a stream is open in this worker or any other, so a change is worth describing"""
+    feed = current_app.extensions.get('live_feed')
+    if feed is not None and len(feed) > 0:
+        return True
+    return db.session.query(
+        LiveFeedListener.query.filter(LiveFeedListener.listening_until > get_ist_now()).exists()
+    ).scalar()
+
+def publish(event, payload):
+    """Publish to this worker's screens, and write the event for the screens of other workers"""
+    feed = get_feed()
+    feed.publish(event, payload)
+    db.session.add(LiveEvent(origin=feed.origin, event=event, payload=json.dumps(payload, separators=(',', ':'))))
+    db.session.commit()
+
+def sse(event, data):
+    return f'event: {event}\ndata: {data}\n\n'
+
+def stream(feed, subscriber, heartbeat, lifetime=0):
+    """
+    The text/event-stream body for one subscriber; unsubscribes when the client
+    goes away. With a lifetime (seconds) the stream ends after it and the
+    browser reconnects straight away.
+    """
+    deadline = time.monotonic() + lifetime if lifetime else None
+    try:
+        yield 'retry: 5000\n\n'
+        while not subscriber.overflowed:
+            wait = heartbeat
+            if deadline is not None:
+                wait = min(wait, deadline - time.monotonic())
+                if wait <= 0:
+                    yield 'retry: 500\n\n'
+                    return
+            try:
+                event, data = subscriber.events.get(timeout=wait)
+            except queue.Empty:
+                # Keeps proxies from closing an idle stream and notices closed connections
+                yield ': keepalive\n\n'
+                continue
+            yield sse(event, data)
+        yield sse('reload', '{}')
+    finally:
+        feed.unsubscribe(subscriber)
+
+def event_stream(user_id, is_admin):
+    """Response streaming the live feed to the logged-in screen, or 503 if too many are open"""
+    feed = get_feed()
+    subscriber = feed.subscribe(user_id, is_admin)
+    if subscriber is None:
+        return Response('Too many live screens are open.', status=503, headers={'Retry-After': '30'})
+    heartbeat = current_app.config.get('LIVE_FEED_HEARTBEAT_SECONDS', 15)
+    lifetime = current_app.config.get('LIVE_FEED_MAX_STREAM_SECONDS', 0)
+    return Response(stream(feed, subscriber, heartbeat, lifetime), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+# Called by the transitions after they commit
+
+def change_report(f):
+    """
+    Describe a committed change only if a stream is open, and never let it
+    fail the transition: the change is already in the database
+    """
+    @wraps(f)
+    def decorated_function(*args, **kwargs):
+        try:
+            if listening():
+                f(*args, **kwargs)
+        except Exception as e:
+            db.session.rollback()
+            print(f"⚠️ Live feed update failed: {e}")
+    return decorated_function
+
+@change_report
+def rooms_changed(room_ids):
+    """Publish the current counters of rooms whose occupancy or capacity changed (or that were deleted)"""
+    room_ids = list(room_ids)
+    rooms = db.session.query(
+        Room.id, Room.room_no, Room.capacity, Room.allocated_beds, Room.occupied_beds, Room.available_beds
+    ).filter(Room.id.in_(room_ids)).all()
+    found = {room.id for room in rooms}
+    publish('rooms', {
+        'rooms': [room._asdict() for room in rooms],
+        'deleted': [room_id for room_id in room_ids if room_id not in found],
+        'total_rooms': db.session.query(func.count(Room.id)).scalar()
+    })
+
+@change_report
+def bookings_changed(booking_ids, previous_status=None):
+    """Publish bookings that were just requested (previous_status None) or moved on from previous_status"""
+    bookings = db.session.query(
+        Booking.id, Booking.user_id, User.name.label('user_name'), Booking.room_id, Room.room_no,
+        Booking.status, Booking.created_at
+    ).join(User, Booking.user_id == User.id).join(Room, Booking.room_id == Room.id).filter(
+        Booking.id.in_(list(booking_ids))
+    ).order_by(Booking.created_at, Booking.id).all()
+
+    counts = {'pending': 0, 'checked_in': 0}
+    for booking in bookings:
+        if previous_status in counts:
+            counts[previous_status] -= 1
+        if booking.status in counts:
+            counts[booking.status] += 1
+    publish('bookings', {
+        'bookings': [{**booking._asdict(), 'created_at': booking.created_at.strftime('%Y-%m-%d %H:%M')}
+                     for booking in bookings],
+        'counts': counts
+    })
@@ -0,0 +1,139 @@
+"""
+Log retention with compressed cold storage.
+`flask archive-logs` (or the Archive button on the logs page) moves log
+entries older than LOG_RETENTION_DAYS out of the logs table into one
+append-only segment per day, LOG_ARCHIVE_DIR/logs-YYYY-MM-DD.jsonl.gz, so the
+hot table only holds recent activity. Each batch is appended as a new gzip
+member and synced to disk before its rows are deleted; if the job dies in
+between, the next run archives those rows again and readers skip the
+duplicate ids.
+
+Archived entries keep the user's name, email and role as they were, and the
+logs page and CSV export search them when the From Date reaches back into
+archived days (see search_archive).
+"""
+
+import gzip
+import json
+import os
+from datetime import date, datetime, timedelta
+from types import SimpleNamespace
+from flask import current_app
+from models import db, User, Log, get_ist_now
+import transitions
+
+SEGMENT_PREFIX = 'logs-'
+SEGMENT_SUFFIX = '.jsonl.gz'
+
+class ArchivedLog:
+    """An archived log entry, shaped like a Log row (with .user) for the logs page and export"""
+
+    __slots__ = ('id', 'user_id', 'name', 'email', 'action', 'details', 'timestamp', 'user')
+
+    def __init__(self, record):
+        self.id = record['id']
+        self.user_id = record['user_id']
+        self.name = record['name']
+        self.email = record['email']
+        self.action = record['action']
+        self.details = record['details']
+        self.timestamp = datetime.fromisoformat(record['timestamp'])
+        self.user = SimpleNamespace(name=self.name, email=self.email, role=record['role'])
+
+def archive_dir():
+    """LOG_ARCHIVE_DIR, or log_archive/ in the instance folder"""
+    return current_app.config.get('LOG_ARCHIVE_DIR') or os.path.join(current_app.instance_path, 'log_archive')
+
+def segment_path(day):
+    return os.path.join(archive_dir(), f'{SEGMENT_PREFIX}{day.isoformat()}{SEGMENT_SUFFIX}')
+
+def segment_days(date_from=None, date_to=None):
+    """Days with an archive segment, newest first, optionally within [date_from, date_to]"""
+    if not os.path.isdir(archive_dir()):
+        return []
+    days = []
+    for filename in os.listdir(archive_dir()):
+        if filename.startswith(SEGMENT_PREFIX) and filename.endswith(SEGMENT_SUFFIX):
+            try:
+                day = date.fromisoformat(filename[len(SEGMENT_PREFIX):-len(SEGMENT_SUFFIX)])
+            except ValueError:
+                continue
+            if (date_from is None or day >= date_from) and (date_to is None or day <= date_to):
+                days.append(day)
+    return sorted(days, reverse=True)
+
+def retention_cutoff(retention_days=None):
+    """Midnight (IST) of the oldest day kept in the logs table; everything before it is archived"""
+    if retention_days is None:
+        retention_days = current_app.config.get('LOG_RETENTION_DAYS', 30)
+    cutoff_day = get_ist_now().date() - timedelta(days=retention_days)
+    return datetime.combine(cutoff_day, datetime.min.time())
+
+def _append_segment(day, records):
+    """Append records to a day's segment as a new gzip member and sync it to disk"""
+    data = ''.join(json.dumps(record, separators=(',', ':')) + '\n' for record in records).encode('utf-8')
+    os.makedirs(archive_dir(), exist_ok=True)
+    with open(segment_path(day), 'ab') as raw:
+        with gzip.GzipFile(fileobj=raw, mode='ab') as segment:
+            segment.write(data)
+        raw.flush()
+        os.fsync(raw.fileno())
+
+def archive_logs(admin_id, before=None, batch_size=None):
+    """Move log entries older than before (default: the retention cutoff) into the archive.
+    Runs in batches of LOG_ARCHIVE_BATCH_SIZE, one transaction each; returns the number moved."""
+    before = before or retention_cutoff()
+    batch_size = batch_size or current_app.config.get('LOG_ARCHIVE_BATCH_SIZE', 5000)
+    total = 0
+    while True:
+        rows = db.session.query(
+            Log.id, Log.user_id, User.name, User.email, User.role, Log.action, Log.details, Log.timestamp
+        ).outerjoin(Log.user).filter(Log.timestamp < before).order_by(Log.timestamp, Log.id).limit(batch_size).all()
+        if not rows:
+            break
+
+        by_day = {}
+        for row in rows:
+            by_day.setdefault(row.timestamp.date(), []).append({
+                'id': row.id, 'user_id': row.user_id, 'name': row.name, 'email': row.email, 'role': row.role,
+                'action': row.action, 'details': row.details, 'timestamp': row.timestamp.isoformat()
+            })
+        for day, records in by_day.items():
+            _append_segment(day, records)
+
+        # The rows are on disk, so they can leave the hot table
+        db.session.query(Log).filter(Log.id.in_([row.id for row in rows])).delete(synchronize_session=False)
+        transitions.commit()
+        total += len(rows)
+        if len(rows) < batch_size:
+            break
+
+    if total:
+        transitions.log_action(admin_id, 'logs_archived',
+                               f'Archived {total} log entries from before {before:%Y-%m-%d}')
+        transitions.commit()
+    return total
+
+def read_segment(day):
+    """The records of one day's segment in the order they were archived, without duplicates"""
+    path = segment_path(day)
+    seen = set()
+    with gzip.open(path, 'rt', encoding='utf-8') as segment:
+        for line in segment:
+            record = json.loads(line)
+            if record['id'] not in seen:
+                seen.add(record['id'])
+                yield record
+
+def search_archive(action=None, user_email=None, date_from=None, date_to=None):
+    """Archived entries matching the logs page filters, newest first.
+    A generator: segments are opened one day at a time, only as far as the caller reads,
+    so at most one day's matches are held in memory."""
+    email = user_email.lower() if user_email else None
+    for day in segment_days(date_from, date_to):
+        records = [ArchivedLog(record) for record in read_segment(day)
+                   if (not action or record['action'] == action)
+                   and (not email or email in (record['email'] or '').lower())]
+        # Batches archived on different runs can interleave within a day
+        records.sort(key=lambda entry: (entry.timestamp, entry.id), reverse=True)
+        yield from records
@@ -0,0 +1,205 @@
+"""
+Pooled SMTP transport.
+Keeps a few authenticated SMTP connections open and sends many messages over
+each one, so a burst of notifications costs one TLS handshake and login per
+connection instead of one per email. Connections are checked before reuse,
+replaced when the server drops them and recycled after a fixed number of
+messages, and sending is throttled to MAIL_RATE_LIMIT messages per second so
+Gmail does not start rejecting us.
+"""
+
+import queue
+import smtplib
+import threading
+import time
+from email.message import Message
+from flask import current_app
+
+# Errors after which a connection cannot be trusted and is replaced
+CONNECTION_ERRORS = (smtplib.SMTPServerDisconnected, smtplib.SMTPConnectError, ConnectionError, OSError)
+
+class RateLimiter:
+    """Token bucket allowing rate operations per second with bursts of up to burst"""
+
+    def __init__(self, rate, burst=None):
+        self.rate = rate
+        self.capacity = burst or max(1, rate)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Block until an operation is allowed"""
+        if self.rate <= 0:
+            return
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+class PooledConnection:
+    """An open, authenticated SMTP session and its usage counters"""
+
+    def __init__(self, settings):
+        self.smtp = smtplib.SMTP(settings['server'], settings['port'], timeout=settings['timeout'])
+        try:
+            if settings['use_tls']:
+                self.smtp.starttls()
+            if settings['username'] and settings['password']:
+                self.smtp.login(settings['username'], settings['password'])
+        except Exception:
+            self.close()
+            raise
+        self.sent = 0
+        self.last_used = time.monotonic()
+
+    def is_alive(self, idle_check_seconds):
+        """Cheap liveness check: trust recently used sessions, NOOP idle ones"""
+        if time.monotonic() - self.last_used < idle_check_seconds:
+            return True
+        try:
+            return self.smtp.noop()[0] == 250
+        except CONNECTION_ERRORS + (smtplib.SMTPException,):
+            return False
+
+    def send(self, message):
+        if isinstance(message, Message):
+            self.smtp.send_message(message)
+        else:
+            # Already serialised (email_templates.RenderedEmail)
+            self.smtp.sendmail(message.sender, message.recipients, message.data)
+        self.sent += 1
+        self.last_used = time.monotonic()
+
+    def close(self):
+        try:
+            self.smtp.quit()
+        except Exception:
+            try:
+                self.smtp.close()
+            except Exception:
+                pass
+
+class SMTPPool:
+    """A bounded pool of persistent SMTP connections shared by all sending threads"""
+
+    def __init__(self, server, port, username='', password='', use_tls=True, size=2,
+                 max_messages_per_connection=100, rate_limit=0, idle_check_seconds=30, timeout=30):
+        self.settings = {
+            'server': server, 'port': port, 'username': username, 'password': password,
+            'use_tls': use_tls, 'timeout': timeout,
+        }
+        self.size = size
+        self.max_messages_per_connection = max_messages_per_connection
+        self.idle_check_seconds = idle_check_seconds
+        self.rate_limiter = RateLimiter(rate_limit)
+        self.connections_opened = 0
+        self._idle = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(size)
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, config):
+        return cls(
+            server=config['MAIL_SERVER'],
+            port=config['MAIL_PORT'],
+            username=config.get('MAIL_USERNAME', ''),
+            password=config.get('MAIL_PASSWORD', ''),
+            use_tls=config.get('MAIL_USE_TLS', True),
+            size=config.get('MAIL_POOL_SIZE', 2),
+            max_messages_per_connection=config.get('MAIL_MAX_MESSAGES_PER_CONNECTION', 100),
+            rate_limit=config.get('MAIL_RATE_LIMIT', 0),
+        )
+
+    def _open(self):
+        connection = PooledConnection(self.settings)
+        with self._lock:
+            self.connections_opened += 1
+        return connection
+
+    def _checkout(self):
+        """Take an idle live connection or open a new one (call with a slot held)"""
+        while True:
+            try:
+                connection = self._idle.get_nowait()
+            except queue.Empty:
+                return self._open()
+            if connection.is_alive(self.idle_check_seconds):
+                return connection
+            connection.close()
+
+    def _checkin(self, connection):
+        if connection.sent >= self.max_messages_per_connection:
+            connection.close()
+        else:
+            self._idle.put(connection)
+
+    def send(self, message):
+        """Send one message over a pooled connection, raising on failure"""
+        failures = self.send_many([message])
+        if failures:
+            raise failures[0][1]
+
+    def send_many(self, messages):
+        """Send messages back to back over one pooled session.
+        Returns a list of (message, error) for the messages the server refused;
+        raises if the server cannot be reached at all."""
+        failures = []
+        self._slots.acquire()
+        connection = None
+        try:
+            connection = self._checkout()
+            for message in messages:
+                self.rate_limiter.acquire()
+                if connection.sent >= self.max_messages_per_connection:
+                    connection.close()
+                    connection = None
+                    connection = self._open()
+                try:
+                    try:
+                        connection.send(message)
+                    except CONNECTION_ERRORS:
+                        # The server dropped the session: reconnect and retry this message once
+                        connection.close()
+                        connection = None
+                        connection = self._open()
+                        connection.send(message)
+                except (smtplib.SMTPResponseException, smtplib.SMTPRecipientsRefused) as e:
+                    if connection is None:
+                        raise  # Reconnecting failed (connect or login refused)
+                    # The server refused this message but the session is still usable
+                    failures.append((message, e))
+            self._checkin(connection)
+            connection = None
+        finally:
+            if connection is not None:
+                connection.close()
+            self._slots.release()
+        return failures
+
+    def close(self):
+        """Close every idle connection"""
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                return
+
+_pool_lock = threading.Lock()
+
+def get_pool():
+    """The current app's SMTP pool, created on first use"""
+    extensions = current_app.extensions
+    pool = extensions.get('smtp_pool')
+    if pool is None:
+        with _pool_lock:
+            pool = extensions.get('smtp_pool')
+            if pool is None:
+                pool = extensions['smtp_pool'] = SMTPPool.from_config(current_app.config)
+    return pool
@@ -0,0 +1,124 @@
+"""
+Schema upgrades for existing databases.
+db.create_all() only creates missing tables, so columns and indexes added to
+the models after a database was created are added here. Every step but one
+only adds, so upgrading never touches existing rows beyond backfilling new
+columns; the exception rebuilds the bookings table once, copying its rows as
+they are, so SQLite stops reusing booking ids.
+"""
+
+from sqlalchemy import func, inspect, text
+from sqlalchemy.schema import CreateTable
+from models import db, Room, Booking, BookingHistory, OccupancyVersion
+
+# Columns added to existing tables: table -> [(column, DDL)]
+ADDED_COLUMNS = {
+    'rooms': [
+        ('occupied_beds', 'INTEGER NOT NULL DEFAULT 0'),
+        ('allocated_beds', 'INTEGER NOT NULL DEFAULT 0'),
+    ],
+}
+
+def add_missing_columns():
+    """Add columns declared in ADDED_COLUMNS that the database does not have yet"""
+    inspector = inspect(db.engine)
+    added = []
+    for table, columns in ADDED_COLUMNS.items():
+        existing = {column['name'] for column in inspector.get_columns(table)}
+        for name, ddl in columns:
+            if name not in existing:
+                db.session.execute(text(f'ALTER TABLE {table} ADD COLUMN {name} {ddl}'))
+                added.append(f'{table}.{name}')
+    return added
+
+def create_missing_indexes():
+    """Create indexes declared on the models that the database does not have yet"""
+    inspector = inspect(db.engine)
+    created = []
+    for table in db.metadata.sorted_tables:
+        existing = {index['name'] for index in inspector.get_indexes(table.name)}
+        for index in table.indexes:
+            if index.name not in existing:
+                index.create(db.session.connection())
+                created.append(index.name)
+    return created
+
+def rebuild_bookings_autoincrement():
+    """
+    Rebuild a bookings table created without AUTOINCREMENT, returning True if it did.
+    Without it SQLite hands out max(id) + 1, which reuses the ids of bookings
+    moved to booking_history; the id sequence starts past both tables.
+    Its indexes are dropped with the old table and built again on the new one.
+    """
+    if db.engine.dialect.name != 'sqlite':
+        return False
+    table_sql = db.session.execute(text(
+        "SELECT sql FROM sqlite_master WHERE type = 'table' AND name = 'bookings'"
+    )).scalar()
+    if 'AUTOINCREMENT' in table_sql.upper():
+        return False
+
+    columns = ', '.join(column.name for column in Booking.__table__.columns)
+    create_sql = str(CreateTable(Booking.__table__).compile(db.engine))
+    db.session.execute(text(create_sql.replace('CREATE TABLE bookings', 'CREATE TABLE bookings_rebuilt', 1)))
+    db.session.execute(text(f'INSERT INTO bookings_rebuilt ({columns}) SELECT {columns} FROM bookings'))
+    db.session.execute(text('DROP TABLE bookings'))
+    db.session.execute(text('ALTER TABLE bookings_rebuilt RENAME TO bookings'))
+    for index in Booking.__table__.indexes:
+        index.create(db.session.connection())
+
+    last_id = max(db.session.query(func.max(Booking.id)).scalar() or 0,
+                  db.session.query(func.max(BookingHistory.id)).scalar() or 0)
+    db.session.execute(text("DELETE FROM sqlite_sequence WHERE name = 'bookings'"))
+    db.session.execute(text("INSERT INTO sqlite_sequence (name, seq) VALUES ('bookings', :seq)"), {'seq': last_id})
+    # Committed on its own so the later steps inspect the rebuilt table
+    db.session.commit()
+    return True
+
+def recount_room_occupancy():
+    """Rebuild every room's occupancy counters with one grouped query"""
+    counts = db.session.query(Booking.room_id, Booking.status, func.count(Booking.id)).filter(
+        Booking.status.in_(['approved', 'checked_in'])
+    ).group_by(Booking.room_id, Booking.status).all()
+
+    occupied = {}
+    allocated = {}
+    for room_id, status, count in counts:
+        allocated[room_id] = allocated.get(room_id, 0) + count
+        if status == 'checked_in':
+            occupied[room_id] = count
+
+    for room in Room.query.all():
+        room.occupied_beds = occupied.get(room.id, 0)
+        room.allocated_beds = allocated.get(room.id, 0)
+        room.update_available_beds()
+    OccupancyVersion.bump()
+
+def create_occupancy_version():
+    """Add the occupancy version row that room transitions bump; True if it was missing"""
+    if db.session.get(OccupancyVersion, 1):
+        return False
+    db.session.add(OccupancyVersion(id=1, version=0))
+    return True
+
+def upgrade_schema(create_indexes=True):
+    """
+    Bring an existing database up to date with the models, returning what was changed.
+    Building indexes on a large table takes a while; create_indexes=False
+    leaves them for a later `flask init-db`.
+    """
+    added = add_missing_columns()
+    if rebuild_bookings_autoincrement():
+        added.append('bookings.id AUTOINCREMENT')
+    if create_occupancy_version():
+        added.append('occupancy_version')
+    if any(column.startswith('rooms.') for column in added):
+        recount_room_occupancy()
+    created = create_missing_indexes() if create_indexes else []
+    db.session.commit()
+    return added + created
+
+def init_db():
+    """Create missing tables and bring an existing schema up to date; `flask init-db` runs it once per deployment"""
+    db.create_all()
+    return upgrade_schema()
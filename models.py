@@ -1,7 +1,7 @@
 from flask_sqlalchemy import SQLAlchemy
-from werkzeug.security import generate_password_hash, check_password_hash
 from datetime import datetime
 import pytz
+from passwords import hash_password, needs_rehash, verify_password
 
 db = SQLAlchemy()
 
@@ -14,6 +14,9 @@ def get_ist_now():
 
 class User(db.Model):
     __tablename__ = 'users'
+    __table_args__ = (
+        db.Index('ix_users_role_created_at', 'role', 'created_at'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(100), nullable=False)
@@ -25,13 +28,18 @@ class User(db.Model):
     
     # Relationships
     bookings = db.relationship('Booking', backref='user', lazy=True, cascade='all, delete-orphan')
+    # History outlives the user: deleting one leaves its moved bookings untouched
+    booking_history = db.relationship('BookingHistory', backref='user', lazy=True, passive_deletes='all')
     logs = db.relationship('Log', backref='user', lazy=True, cascade='all, delete-orphan')
     
     def set_password(self, password):
-        self.password_hash = generate_password_hash(password)
+        self.password_hash = hash_password(password)
     
     def check_password(self, password):
-        return check_password_hash(self.password_hash, password)
+        return verify_password(self.password_hash, password)
+    
+    def password_needs_rehash(self):
+        return needs_rehash(self.password_hash)
     
     def is_admin(self):
         return self.role == 'admin'
@@ -46,32 +54,115 @@ class Room(db.Model):
     room_no = db.Column(db.String(50), unique=True, nullable=False)
     capacity = db.Column(db.Integer, nullable=False)
     available_beds = db.Column(db.Integer, nullable=False)
+    # Occupancy counters, maintained by the booking state transitions
+    occupied_beds = db.Column(db.Integer, default=0, nullable=False)  # checked_in bookings
+    allocated_beds = db.Column(db.Integer, default=0, nullable=False)  # approved + checked_in bookings
     description = db.Column(db.Text)
     created_at = db.Column(db.DateTime, default=get_ist_now)
     
     # Relationships
     bookings = db.relationship('Booking', backref='room', lazy=True, cascade='all, delete-orphan')
+    # History outlives the room: deleting one leaves its moved bookings untouched
+    booking_history = db.relationship('BookingHistory', backref='room', lazy=True, passive_deletes='all')
     
     def get_occupied_beds(self):
-        """Calculate number of occupied beds (checked_in bookings)"""
-        return Booking.query.filter_by(room_id=self.id).filter(
-            Booking.status == 'checked_in'
-        ).count()
+        """Number of occupied beds (checked_in bookings)"""
+        return self.occupied_beds or 0
     
     def get_actual_available_beds(self):
-        """Calculate actual available beds based on current bookings"""
-        occupied = self.get_occupied_beds()
-        return max(0, self.capacity - occupied)
+        """Calculate actual available beds based on current occupancy"""
+        return max(0, self.capacity - self.get_occupied_beds())
     
     def update_available_beds(self):
         """Update available_beds based on current occupancy"""
         self.available_beds = self.get_actual_available_beds()
     
+    def is_full(self):
+        """True if every bed is already allocated to an approved or checked-in booking"""
+        return (self.allocated_beds or 0) >= self.capacity
+    
+    # The counters are only changed with conditional UPDATEs, so concurrent
+    # workers can never push a room past its capacity
+    def _update_counters(self, condition, **values):
+        """Apply values to this room's row if condition holds; True if the row was updated"""
+        result = db.session.execute(
+            db.update(Room).where(Room.id == self.id, condition).values(**values)
+            .execution_options(synchronize_session=False)
+        )
+        db.session.expire(self, ['capacity', 'available_beds', 'occupied_beds', 'allocated_beds'])
+        if result.rowcount != 1:
+            return False
+        OccupancyVersion.bump()
+        return True
+    
+    def allocate_bed(self, count=1):
+        """Reserve beds for bookings that were just approved; False if the room lacks count free beds"""
+        return self._update_counters(
+            Room.allocated_beds + count <= Room.capacity,
+            allocated_beds=Room.allocated_beds + count
+        )
+    
+    def occupy_bed(self):
+        """Mark an allocated bed as occupied on check-in; False if the room is full"""
+        return self._update_counters(
+            Room.occupied_beds < Room.capacity,
+            occupied_beds=Room.occupied_beds + 1,
+            available_beds=Room.capacity - Room.occupied_beds - 1
+        )
+    
+    def release_bed(self):
+        """Free the bed of a booking that checked out"""
+        return self._update_counters(
+            db.and_(Room.occupied_beds > 0, Room.allocated_beds > 0),
+            occupied_beds=Room.occupied_beds - 1,
+            allocated_beds=Room.allocated_beds - 1,
+            available_beds=Room.capacity - Room.occupied_beds + 1
+        )
+    
+    def set_capacity(self, capacity):
+        """Change the capacity; False if more beds than that are already allocated"""
+        return self._update_counters(
+            Room.allocated_beds <= capacity,
+            capacity=capacity,
+            available_beds=db.case((Room.occupied_beds < capacity, capacity - Room.occupied_beds), else_=0)
+        )
+    
     def __repr__(self):
         return f'<Room {self.room_no}>'
 
+class OccupancyVersion(db.Model):
+    """
+    Single-row counter bumped in every transaction that changes a room or its
+    occupancy, so polling clients can tell whether availability changed by
+    reading one row (see routes/api.py)
+    """
+    __tablename__ = 'occupancy_version'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    version = db.Column(db.Integer, default=0, nullable=False)
+    
+    @staticmethod
+    def bump():
+        """Advance the version as part of the current transaction"""
+        db.session.execute(
+            db.update(OccupancyVersion).where(OccupancyVersion.id == 1)
+            .values(version=OccupancyVersion.version + 1).execution_options(synchronize_session=False)
+        )
+    
+    @staticmethod
+    def current():
+        return db.session.query(OccupancyVersion.version).filter(OccupancyVersion.id == 1).scalar() or 0
+
 class Booking(db.Model):
     __tablename__ = 'bookings'
+    __table_args__ = (
+        db.Index('ix_bookings_room_status', 'room_id', 'status'),
+        db.Index('ix_bookings_user_status', 'user_id', 'status'),
+        db.Index('ix_bookings_status_created_at', 'status', 'created_at'),
+        db.Index('ix_bookings_created_at', 'created_at'),
+        # Ids are never handed out again, so they cannot collide with bookings moved to the history
+        {'sqlite_autoincrement': True},
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
@@ -82,11 +173,61 @@ class Booking(db.Model):
     created_at = db.Column(db.DateTime, default=get_ist_now)
     updated_at = db.Column(db.DateTime, default=get_ist_now, onupdate=get_ist_now)
     
+    def transition(self, from_status, to_status, **values):
+        """Atomically move from from_status to to_status; False if another request moved it first"""
+        values.update(status=to_status, updated_at=get_ist_now())
+        result = db.session.execute(
+            db.update(Booking).where(Booking.id == self.id, Booking.status == from_status).values(**values)
+            .execution_options(synchronize_session=False)
+        )
+        db.session.expire(self)
+        return result.rowcount == 1
+    
+    @staticmethod
+    def transition_many(condition, from_status, to_status, **values):
+        """Move every booking matching condition from from_status to to_status; returns how many moved"""
+        values.update(status=to_status, updated_at=get_ist_now())
+        result = db.session.execute(
+            db.update(Booking).where(condition, Booking.status == from_status).values(**values)
+            .execution_options(synchronize_session=False)
+        )
+        return result.rowcount
+    
     def __repr__(self):
         return f'<Booking {self.id} - User {self.user_id} - Room {self.room_id}>'
 
+class BookingHistory(db.Model):
+    """Finished bookings moved out of the bookings table (see booking_history.py); same shape, own indexes"""
+    __tablename__ = 'booking_history'
+    __table_args__ = (
+        db.Index('ix_booking_history_user_created_at', 'user_id', 'created_at'),
+        db.Index('ix_booking_history_room_id', 'room_id'),
+        db.Index('ix_booking_history_status_created_at', 'status', 'created_at'),
+        db.Index('ix_booking_history_created_at', 'created_at'),
+    )
+    
+    id = db.Column(db.Integer, primary_key=True, autoincrement=False)  # The booking's own id
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    room_id = db.Column(db.Integer, db.ForeignKey('rooms.id'), nullable=False)
+    status = db.Column(db.String(20), nullable=False)  # 'rejected' or 'checked_out'
+    checkin_time = db.Column(db.DateTime)
+    checkout_time = db.Column(db.DateTime)
+    created_at = db.Column(db.DateTime)
+    updated_at = db.Column(db.DateTime)
+    moved_at = db.Column(db.DateTime, default=get_ist_now)
+    
+    def __repr__(self):
+        return f'<BookingHistory {self.id} - User {self.user_id} - Room {self.room_id}>'
+
 class Log(db.Model):
     __tablename__ = 'logs'
+    __table_args__ = (
+        db.Index('ix_logs_timestamp', 'timestamp'),
+        db.Index('ix_logs_action_timestamp', 'action', 'timestamp'),
+        db.Index('ix_logs_user_timestamp', 'user_id', 'timestamp'),
+        # Distinct users per action for the logs page statistics, without reading the table
+        db.Index('ix_logs_action_user_timestamp', 'action', 'user_id', 'timestamp'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
@@ -97,3 +238,52 @@ class Log(db.Model):
     def __repr__(self):
         return f'<Log {self.id} - {self.action} at {self.timestamp}>'
 
+
+class EmailOutbox(db.Model):
+    __tablename__ = 'email_outbox'
+    __table_args__ = (
+        db.Index('ix_email_outbox_status_next_attempt', 'status', 'next_attempt_at'),
+    )
+    
+    id = db.Column(db.Integer, primary_key=True)
+    kind = db.Column(db.String(50), nullable=False)  # e.g., 'booking_approved'
+    recipient = db.Column(db.String(120), nullable=False)
+    payload = db.Column(db.Text, nullable=False)  # JSON parameters for the email template
+    status = db.Column(db.String(20), default='pending', nullable=False)  # 'pending', 'sending', 'sent', 'dead', 'skipped'
+    attempts = db.Column(db.Integer, default=0, nullable=False)
+    next_attempt_at = db.Column(db.DateTime, default=get_ist_now, nullable=False)
+    locked_until = db.Column(db.DateTime)  # Lease of the worker currently sending it
+    last_error = db.Column(db.Text)
+    created_at = db.Column(db.DateTime, default=get_ist_now)
+    sent_at = db.Column(db.DateTime)
+    
+    def __repr__(self):
+        return f'<EmailOutbox {self.id} - {self.kind} to {self.recipient} ({self.status})>'
+
+class LiveEvent(db.Model):
+    """Live feed events written for the screens of other worker processes (see live_feed.py)"""
+    __tablename__ = 'live_events'
+    __table_args__ = (
+        db.Index('ix_live_events_created_at', 'created_at'),
+        # Pollers read past the last id they saw, so ids must never go back after pruning
+        {'sqlite_autoincrement': True},
+    )
+    
+    id = db.Column(db.Integer, primary_key=True)
+    origin = db.Column(db.String(32), nullable=False)  # The worker's feed that published it
+    event = db.Column(db.String(20), nullable=False)  # 'bookings' or 'rooms'
+    payload = db.Column(db.Text, nullable=False)  # JSON, as sent to the screens
+    created_at = db.Column(db.DateTime, default=get_ist_now)
+    
+    def __repr__(self):
+        return f'<LiveEvent {self.id} - {self.event} from {self.origin}>'
+
+class LiveFeedListener(db.Model):
+    """A worker process with live screens open, renewed while they stay open"""
+    __tablename__ = 'live_feed_listeners'
+    
+    origin = db.Column(db.String(32), primary_key=True)
+    listening_until = db.Column(db.DateTime, nullable=False)
+    
+    def __repr__(self):
+        return f'<LiveFeedListener {self.origin} until {self.listening_until}>'
@@ -0,0 +1,175 @@
+"""
+Durable outbox for notification emails.
+Transitions enqueue an email in the same transaction as the booking change,
+so a committed approval always has its notification row and a rolled-back
+one never does. A pool of worker threads leases due rows, sends them over
+SMTP and retries failures with exponential backoff; after EMAIL_MAX_ATTEMPTS
+a row is dead-lettered (status 'dead') until `flask outbox-requeue`.
+Without MAIL_USERNAME and MAIL_PASSWORD nothing is sent: due emails are
+marked 'skipped' without counting an attempt, and can be requeued the same
+way once the credentials are configured.
+
+Delivery is at-least-once: if a worker dies after sending but before
+recording it, the lease expires and the email is sent again.
+"""
+
+import json
+import random
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from flask import current_app
+from sqlalchemy import and_, or_
+from models import db, EmailOutbox, get_ist_now
+from email_service import send_message
+from email_templates import render_email
+
+def enqueue(kind, recipient, **params):
+    """Queue an email in the current transaction; it becomes visible to workers on commit.
+    kind names the email template (see email_templates.EMAIL_SUBJECTS) and params fill it in."""
+    entry = EmailOutbox(kind=kind, recipient=recipient, payload=json.dumps(params))
+    db.session.add(entry)
+    return entry
+
+def enqueue_many(kind, messages):
+    """Queue one email of kind per (recipient, params) pair with a single multi-row INSERT"""
+    if messages:
+        now = get_ist_now()
+        db.session.execute(db.insert(EmailOutbox), [
+            {'kind': kind, 'recipient': recipient, 'payload': json.dumps(params),
+             'status': 'pending', 'attempts': 0, 'next_attempt_at': now, 'created_at': now}
+            for recipient, params in messages
+        ])
+
+def _claimable(now):
+    """Due pending emails, plus emails whose worker's lease has run out"""
+    return or_(
+        and_(EmailOutbox.status == 'pending', EmailOutbox.next_attempt_at <= now),
+        and_(EmailOutbox.status == 'sending', EmailOutbox.locked_until < now)
+    )
+
+def claim_due(limit):
+    """Lease up to limit due emails to the calling worker and return their ids"""
+    now = get_ist_now()
+    lease = now + timedelta(seconds=current_app.config.get('EMAIL_LEASE_SECONDS', 300))
+    candidates = [row.id for row in db.session.query(EmailOutbox.id).filter(
+        _claimable(now)
+    ).order_by(EmailOutbox.next_attempt_at).limit(limit)]
+
+    # Conditional updates, so two workers never claim the same email
+    claimed = []
+    for entry_id in candidates:
+        result = db.session.execute(
+            db.update(EmailOutbox).where(EmailOutbox.id == entry_id, _claimable(now))
+            .values(status='sending', locked_until=lease)
+            .execution_options(synchronize_session=False)
+        )
+        if result.rowcount == 1:
+            claimed.append(entry_id)
+    db.session.commit()
+    return claimed
+
+def deliver(entry_id):
+    """Send one claimed email and record the outcome; True if it was sent"""
+    entry = db.session.get(EmailOutbox, entry_id)
+    if entry is None or entry.status != 'sending':
+        return False
+
+    if not current_app.config.get('MAIL_USERNAME') or not current_app.config.get('MAIL_PASSWORD'):
+        entry.status = 'skipped'
+        entry.locked_until = None
+        db.session.commit()
+        print(f"⚠️ Email credentials not configured. Skipped email #{entry.id} to {entry.recipient}.")
+        return False
+
+    try:
+        message = render_email(entry.kind, entry.recipient, **json.loads(entry.payload))
+        send_message(message)
+    except Exception as e:
+        record_failure(entry, e)
+        return False
+
+    entry.status = 'sent'
+    entry.attempts += 1
+    entry.sent_at = get_ist_now()
+    entry.locked_until = None
+    db.session.commit()
+    return True
+
+def record_failure(entry, error):
+    """Schedule a retry with exponential backoff, or dead-letter the email"""
+    entry.attempts += 1
+    entry.last_error = f'{type(error).__name__}: {error}'[:1000]
+    entry.locked_until = None
+
+    if entry.attempts >= current_app.config.get('EMAIL_MAX_ATTEMPTS', 6):
+        entry.status = 'dead'
+        print(f"❌ Email #{entry.id} to {entry.recipient} failed {entry.attempts} times, dead-lettered: {entry.last_error}")
+    else:
+        base = current_app.config.get('EMAIL_RETRY_BASE_SECONDS', 30)
+        delay = base * 2 ** (entry.attempts - 1) * random.uniform(0.8, 1.2)
+        entry.status = 'pending'
+        entry.next_attempt_at = get_ist_now() + timedelta(seconds=delay)
+        print(f"⚠️ Email #{entry.id} to {entry.recipient} failed, retrying in {delay:.0f}s: {entry.last_error}")
+    db.session.commit()
+
+def requeue_dead():
+    """Return dead-lettered and skipped emails to the queue for another round of attempts"""
+    count = EmailOutbox.query.filter(EmailOutbox.status.in_(['dead', 'skipped'])).update(
+        {'status': 'pending', 'attempts': 0, 'next_attempt_at': get_ist_now()},
+        synchronize_session=False
+    )
+    db.session.commit()
+    return count
+
+class OutboxWorker:
+    """Polls the outbox and sends due emails on a pool of threads"""
+
+    def __init__(self, app, threads=None):
+        self.app = app
+        self.threads = threads or app.config.get('EMAIL_WORKER_THREADS', 4)
+        self.poll_seconds = app.config.get('EMAIL_POLL_SECONDS', 2)
+        self._stop = threading.Event()
+        self._wakeup = threading.Event()
+
+    def _deliver(self, entry_id):
+        with self.app.app_context():
+            return deliver(entry_id)
+
+    def run_once(self, pool):
+        """Claim one batch and send it; returns the number of emails claimed"""
+        with self.app.app_context():
+            entry_ids = claim_due(self.threads * 10)
+        list(pool.map(self._deliver, entry_ids))
+        return len(entry_ids)
+
+    def run(self):
+        """Send emails until stop() is called"""
+        with ThreadPoolExecutor(max_workers=self.threads) as pool:
+            while not self._stop.is_set():
+                try:
+                    if self.run_once(pool):
+                        continue
+                except Exception as e:
+                    print(f"⚠️ Email outbox worker error: {e}")
+                self._wakeup.wait(self.poll_seconds)
+                self._wakeup.clear()
+
+    def drain(self):
+        """Send every email that is due now, then return (used by scripts and tests)"""
+        with ThreadPoolExecutor(max_workers=self.threads) as pool:
+            while self.run_once(pool):
+                pass
+
+    def start(self):
+        """Run the worker in a background daemon thread and return self"""
+        threading.Thread(target=self.run, name='email-outbox', daemon=True).start()
+        return self
+
+    def notify(self):
+        """Wake the worker now instead of at its next poll"""
+        self._wakeup.set()
+
+    def stop(self):
+        self._stop.set()
+        self._wakeup.set()
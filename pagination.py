@@ -0,0 +1,193 @@
+"""
+Keyset (cursor) pagination for the admin listings.
+Pages are ordered newest first on (sort column, id); a cursor is the key of
+the row at a page edge, so every page costs one indexed range scan no matter
+how deep it is.
+"""
+
+from collections import deque
+from datetime import datetime
+from itertools import dropwhile, islice, takewhile
+from flask import current_app, request, url_for
+from sqlalchemy import and_, or_
+
+def encode_cursor(sort_value, row_id):
+    """Encode a row key as an opaque cursor string"""
+    return f'{sort_value.isoformat()}_{row_id}'
+
+def decode_cursor(cursor):
+    """Decode a cursor string, returning None if it is missing or malformed"""
+    if not cursor:
+        return None
+    try:
+        sort_value, row_id = cursor.rsplit('_', 1)
+        return datetime.fromisoformat(sort_value), int(row_id)
+    except ValueError:
+        return None
+
+def get_page_size():
+    """Page size from the per_page argument, bounded by the configured limits"""
+    default = current_app.config.get('ADMIN_PAGE_SIZE', 50)
+    maximum = current_app.config.get('ADMIN_MAX_PAGE_SIZE', 500)
+    per_page = request.args.get('per_page', default, type=int)
+    return max(1, min(per_page or default, maximum))
+
+class KeysetPage:
+    """One page of rows plus the cursors of its neighbouring pages"""
+
+    def __init__(self, items, per_page, next_cursor=None, prev_cursor=None):
+        self.items = items
+        self.per_page = per_page
+        self.next_cursor = next_cursor
+        self.prev_cursor = prev_cursor
+
+    def _url(self, **cursor):
+        args = {key: value for key, value in request.args.items() if key not in ('after', 'before')}
+        args.update(cursor)
+        return url_for(request.endpoint, **request.view_args, **args)
+
+    @property
+    def next_url(self):
+        return self._url(after=self.next_cursor) if self.next_cursor else None
+
+    @property
+    def prev_url(self):
+        return self._url(before=self.prev_cursor) if self.prev_cursor else None
+
+def paginate_keyset(query, sort_column, id_column, key=None, per_page=None):
+    """
+    Return a KeysetPage of query ordered by (sort_column, id_column) descending.
+    The page position comes from the 'after'/'before' request arguments.
+    key maps a result row to its (sort value, id); by default the row is an
+    entity carrying both columns as attributes.
+    """
+    if key is None:
+        key = lambda row: (getattr(row, sort_column.key), getattr(row, id_column.key))
+    if per_page is None:
+        per_page = get_page_size()
+
+    after = decode_cursor(request.args.get('after'))
+    before = decode_cursor(request.args.get('before')) if not after else None
+
+    if before:
+        # Walk towards newer rows, then restore newest-first order
+        sort_value, row_id = before
+        rows = query.filter(or_(
+            sort_column > sort_value,
+            and_(sort_column == sort_value, id_column > row_id)
+        )).order_by(sort_column.asc(), id_column.asc()).limit(per_page + 1).all()
+        has_newer = len(rows) > per_page
+        items = list(reversed(rows[:per_page]))
+        next_cursor = encode_cursor(*key(items[-1])) if items else None
+        prev_cursor = encode_cursor(*key(items[0])) if items and has_newer else None
+        return KeysetPage(items, per_page, next_cursor, prev_cursor)
+
+    if after:
+        sort_value, row_id = after
+        query = query.filter(or_(
+            sort_column < sort_value,
+            and_(sort_column == sort_value, id_column < row_id)
+        ))
+    rows = query.order_by(sort_column.desc(), id_column.desc()).limit(per_page + 1).all()
+    has_older = len(rows) > per_page
+    items = rows[:per_page]
+    next_cursor = encode_cursor(*key(items[-1])) if items and has_older else None
+    prev_cursor = encode_cursor(*key(items[0])) if items and after else None
+    return KeysetPage(items, per_page, next_cursor, prev_cursor)
+
+def paginate_keyset_chain(query, sort_column, id_column, older, key=None, per_page=None):
+    """
+    Like paginate_keyset, but the listing continues into older: a newest-first
+    iterable of rows that all sort before every row of query (such as archived
+    log entries), so paging past the last row of query walks on into it.
+    older is read lazily and only as far as the page needs.
+    """
+    if key is None:
+        key = lambda row: (getattr(row, sort_column.key), getattr(row, id_column.key))
+    if per_page is None:
+        per_page = get_page_size()
+
+    after = decode_cursor(request.args.get('after'))
+    before = decode_cursor(request.args.get('before')) if not after else None
+
+    if before:
+        # The closest newer rows: the end of older first, then the oldest newer rows of query
+        rows = list(deque(takewhile(lambda row: key(row) > before, older), maxlen=per_page + 1))
+        if len(rows) <= per_page:
+            sort_value, row_id = before
+            live = query.filter(or_(
+                sort_column > sort_value,
+                and_(sort_column == sort_value, id_column > row_id)
+            )).order_by(sort_column.asc(), id_column.asc()).limit(per_page + 1 - len(rows)).all()
+            rows = list(reversed(live)) + rows
+        has_newer = len(rows) > per_page
+        items = rows[-per_page:]
+        next_cursor = encode_cursor(*key(items[-1])) if items else None
+        prev_cursor = encode_cursor(*key(items[0])) if items and has_newer else None
+        return KeysetPage(items, per_page, next_cursor, prev_cursor)
+
+    if after:
+        sort_value, row_id = after
+        query = query.filter(or_(
+            sort_column < sort_value,
+            and_(sort_column == sort_value, id_column < row_id)
+        ))
+    rows = query.order_by(sort_column.desc(), id_column.desc()).limit(per_page + 1).all()
+    if len(rows) <= per_page:
+        continuation = dropwhile(lambda row: key(row) >= after, older) if after else older
+        rows += islice(continuation, per_page + 1 - len(rows))
+    has_older = len(rows) > per_page
+    items = rows[:per_page]
+    next_cursor = encode_cursor(*key(items[-1])) if items and has_older else None
+    prev_cursor = encode_cursor(*key(items[0])) if items and after else None
+    return KeysetPage(items, per_page, next_cursor, prev_cursor)
+
+def paginate_keyset_merge(sources, key=None, per_page=None):
+    """
+    Keyset pagination over several queries merged into one newest-first
+    listing, such as live and historical bookings. sources are
+    (query, sort column, id column) triples; rows from different sources
+    must never share a key. Each page reads at most per_page + 1 rows per source.
+    """
+    if key is None:
+        sort_key, id_key = sources[0][1].key, sources[0][2].key
+        key = lambda row: (getattr(row, sort_key), getattr(row, id_key))
+    if per_page is None:
+        per_page = get_page_size()
+
+    after = decode_cursor(request.args.get('after'))
+    before = decode_cursor(request.args.get('before')) if not after else None
+
+    rows = []
+    for query, sort_column, id_column in sources:
+        if before:
+            sort_value, row_id = before
+            query = query.filter(or_(
+                sort_column > sort_value,
+                and_(sort_column == sort_value, id_column > row_id)
+            )).order_by(sort_column.asc(), id_column.asc())
+        else:
+            if after:
+                sort_value, row_id = after
+                query = query.filter(or_(
+                    sort_column < sort_value,
+                    and_(sort_column == sort_value, id_column < row_id)
+                ))
+            query = query.order_by(sort_column.desc(), id_column.desc())
+        rows += query.limit(per_page + 1).all()
+
+    if before:
+        # Walk towards newer rows, then restore newest-first order
+        rows = sorted(rows, key=key)[:per_page + 1]
+        has_newer = len(rows) > per_page
+        items = list(reversed(rows[:per_page]))
+        next_cursor = encode_cursor(*key(items[-1])) if items else None
+        prev_cursor = encode_cursor(*key(items[0])) if items and has_newer else None
+        return KeysetPage(items, per_page, next_cursor, prev_cursor)
+
+    rows = sorted(rows, key=key, reverse=True)[:per_page + 1]
+    has_older = len(rows) > per_page
+    items = rows[:per_page]
+    next_cursor = encode_cursor(*key(items[-1])) if items and has_older else None
+    prev_cursor = encode_cursor(*key(items[0])) if items and after else None
+    return KeysetPage(items, per_page, next_cursor, prev_cursor)
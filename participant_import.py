@@ -0,0 +1,88 @@
+"""
+Bulk participant pre-registration from the fest's registration sheet.
+Reads a CSV with name, email and phone columns (and optionally password),
+validates every row up front, finds already registered emails with
+set-based queries (see bulk_import), hashes the initial passwords across a
+process pool so every core works on the deliberately slow password hash,
+and leaves the insert to transitions.import_participants().
+
+Rows without a password get a random initial password, returned with the
+result so the caller can hand them out (flask import-participants writes
+them to a credentials file).
+"""
+
+import os
+import re
+import secrets
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from werkzeug.security import generate_password_hash
+from models import User
+from passwords import configured_method
+from bulk_import import ImportResult, READ_ERRORS, read_rows, existing_values
+
+MIN_PASSWORD_LENGTH = 6  # Same rule as the registration form
+EMAIL_PATTERN = re.compile(r'^[^@\s]+@[^@\s]+\.[^@\s]+$')
+FIELD_LENGTHS = {field: User.__table__.c[field].type.length for field in ('name', 'email', 'phone')}
+
+class ParticipantImport(ImportResult):
+    """A validated import: the participants to create and the per-row errors"""
+
+    def __init__(self):
+        super().__init__()
+        self.participants = []  # {'name', 'email', 'phone', 'password', 'generated'}
+
+def validate_participants(rows):
+    """Check every row; participants without a password get a generated one"""
+    result = ParticipantImport()
+    seen = {}  # email -> row label
+    for label, row in rows:
+        name = (row.get('name') or '').strip()
+        email = (row.get('email') or '').strip()
+        phone = (row.get('phone') or '').strip()
+        password = (row.get('password') or '').strip()
+
+        if not all([name, email, phone]):
+            result.error(label, 'Name, email and phone are required.')
+        elif any(len(value) > FIELD_LENGTHS[field] for field, value in (('name', name), ('email', email), ('phone', phone))):
+            result.error(label, f'{email}: name, email or phone is longer than allowed '
+                                f'({FIELD_LENGTHS["name"]}/{FIELD_LENGTHS["email"]}/{FIELD_LENGTHS["phone"]} characters).')
+        elif not EMAIL_PATTERN.match(email):
+            result.error(label, f'{email} is not a valid email address.')
+        elif email in seen:
+            result.error(label, f'{email} also appears on {seen[email]}.')
+        elif password and len(password) < MIN_PASSWORD_LENGTH:
+            result.error(label, f'{email}: password must be at least {MIN_PASSWORD_LENGTH} characters long.')
+        else:
+            seen[email] = label
+            result.participants.append({
+                'name': name, 'email': email, 'phone': phone,
+                'password': password or secrets.token_urlsafe(9), 'generated': not password,
+            })
+
+    registered = set(existing_values(User.email, seen))
+    for email in sorted(registered):
+        result.error(seen[email], f'{email} is already registered.')
+    if registered:
+        result.participants = [p for p in result.participants if p['email'] not in registered]
+    return result
+
+def load_participant_import(stream):
+    """Read and validate a registration sheet; unreadable files become a single error"""
+    try:
+        rows = read_rows(stream, ('name', 'email', 'phone'))
+    except READ_ERRORS as e:
+        result = ParticipantImport()
+        result.error('file', str(e))
+        return result
+    return validate_participants(rows)
+
+def hash_passwords(passwords, processes=None, method=None):
+    """Hash every password with PASSWORD_HASH_METHOD, spread over a pool of processes (one per core by default)"""
+    processes = processes or os.cpu_count() or 1
+    hash_one = partial(generate_password_hash, method=method or configured_method())
+    if processes == 1 or len(passwords) < 2:
+        return [hash_one(password) for password in passwords]
+    chunksize = max(1, len(passwords) // (processes * 4))
+    with ProcessPoolExecutor(max_workers=processes) as pool:
+        return list(pool.map(hash_one, passwords, chunksize=chunksize))
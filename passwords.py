@@ -0,0 +1,72 @@
+"""
+Password hashing with a configurable method and cost.
+PASSWORD_HASH_METHOD picks the Werkzeug method (scrypt:n:r:p or
+pbkdf2:hash:iterations). Stored hashes made with another method keep working
+and are rewritten with the configured one the next time their owner logs in
+(see transitions.record_login), so changing the cost up or down needs no
+migration.
+
+Verification runs on a small thread pool of PASSWORD_VERIFY_WORKERS threads.
+The login request thread blocks until its check is done, so the pool does not
+free request threads. It only bounds how many hashes one worker process
+computes at once (hashlib releases the GIL, so each uses a core), at the cost
+of a hand-off to a pool thread; extra logins wait their turn instead of
+piling onto the CPU. The pool is per process, so a deployment hashes at most
+workers x PASSWORD_VERIFY_WORKERS passwords at a time.
+"""
+
+import hmac
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from flask import current_app, has_app_context
+from werkzeug.security import DEFAULT_PBKDF2_ITERATIONS, generate_password_hash, check_password_hash
+
+DEFAULT_METHOD = 'scrypt:32768:8:1'  # Werkzeug's own default
+
+_pool_lock = threading.Lock()
+
+def normalize_method(method):
+    """The method string Werkzeug stores in the hash, e.g. 'pbkdf2' -> 'pbkdf2:sha256:600000'"""
+    name, *args = method.split(':')
+    if name == 'scrypt':
+        n, r, p = map(int, args) if args else (2**15, 8, 1)
+        return f'scrypt:{n}:{r}:{p}'
+    if name == 'pbkdf2':
+        hash_name = args[0] if args else 'sha256'
+        iterations = int(args[1]) if len(args) > 1 else DEFAULT_PBKDF2_ITERATIONS
+        return f'pbkdf2:{hash_name}:{iterations}'
+    raise ValueError(f"Invalid hash method '{method}'.")
+
+def configured_method():
+    """PASSWORD_HASH_METHOD of the current app, or Werkzeug's default outside one"""
+    if has_app_context():
+        return current_app.config.get('PASSWORD_HASH_METHOD') or DEFAULT_METHOD
+    return DEFAULT_METHOD
+
+def hash_password(password, method=None):
+    return generate_password_hash(password, method=method or configured_method())
+
+def needs_rehash(password_hash, method=None):
+    """True if the stored hash was made with a different method or cost than configured"""
+    stored = password_hash.split('$', 1)[0]
+    return not hmac.compare_digest(stored, normalize_method(method or configured_method()))
+
+def get_verify_pool():
+    """The current app's verification thread pool, created on first use"""
+    extensions = current_app.extensions
+    pool = extensions.get('password_pool')
+    if pool is None:
+        with _pool_lock:
+            pool = extensions.get('password_pool')
+            if pool is None:
+                pool = extensions['password_pool'] = ThreadPoolExecutor(
+                    max_workers=current_app.config.get('PASSWORD_VERIFY_WORKERS') or 1,
+                    thread_name_prefix='password-verify'
+                )
+    return pool
+
+def verify_password(password_hash, password):
+    """Check a password on the verification pool, blocking until it is done (directly outside an app)"""
+    if not has_app_context():
+        return check_password_hash(password_hash, password)
+    return get_verify_pool().submit(check_password_hash, password_hash, password).result()
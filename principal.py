@@ -0,0 +1,63 @@
+"""
+The logged-in user for the current request.
+current_principal() answers "who is this and what role do they have" for the
+decorators and templates, from a short-TTL cache keyed on user id, so hot
+sessions authorise without touching the database. current_user() loads the
+full User row at most once per request and keeps it on g for the view.
+
+Each worker process caches on its own for PRINCIPAL_CACHE_TTL seconds;
+transitions that change a user's name or role call forget_principal() so this
+process sees the change at once and other workers within the TTL.
+"""
+
+from flask import current_app, g, session
+from cache import TTLCache
+from models import db, User
+
+principal_cache = TTLCache(max_entries=4096)
+
+class Principal:
+    """The id, name and role of a logged-in user, safe to share between requests"""
+
+    __slots__ = ('id', 'name', 'role')
+
+    def __init__(self, user):
+        self.id = user.id
+        self.name = user.name
+        self.role = user.role
+
+    def is_admin(self):
+        return self.role == 'admin'
+
+def init_principal(app):
+    """Start every request without a principal, even when an app context is reused across requests"""
+    @app.before_request
+    def reset_principal():
+        g.pop('user', None)
+        g.pop('principal', None)
+
+def current_user():
+    """The logged-in User, or None; queried once per request"""
+    if 'user' not in g:
+        user_id = session.get('user_id')
+        g.user = db.session.get(User, user_id) if user_id is not None else None
+    return g.user
+
+def current_principal():
+    """The logged-in Principal, or None; from the cache when possible"""
+    if 'principal' not in g:
+        user_id = session.get('user_id')
+        principal = principal_cache.get(user_id) if user_id is not None else None
+        if principal is None and user_id is not None:
+            user = current_user()
+            if user:
+                principal = Principal(user)
+                principal_cache.set(user_id, principal, current_app.config.get('PRINCIPAL_CACHE_TTL', 30))
+        g.principal = principal
+    return g.principal
+
+def forget_principal(user_id):
+    """Drop a user's cached principal after their name or role changed"""
+    principal_cache.delete(user_id)
+    if g.get('principal') is not None and g.principal.id == user_id:
+        g.pop('principal')
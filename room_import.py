@@ -0,0 +1,94 @@
+"""
+Bulk room inventory import from CSV or JSON.
+Every row is validated before anything is written: room numbers and
+capacities are checked, duplicates within the file are reported, and rooms
+that already exist are found with set-based queries (see bulk_import).
+A file with any error imports nothing and reports every bad row; a clean file
+is written by transitions.import_rooms() with bulk statements in one
+transaction. In upsert mode existing rooms get the file's capacity (and
+description, if given) instead of being reported as duplicates.
+
+CSV files need a header row with room_no and capacity columns; description
+is optional. Available beds follow from capacity and the beds in use, so an
+available_beds column is ignored. JSON files hold a list of objects with the
+same keys, or an object with such a list under "rooms".
+"""
+
+from models import Room
+from bulk_import import ImportResult, READ_ERRORS, read_rows, existing_values
+
+ROOM_NO_LENGTH = Room.__table__.c.room_no.type.length
+
+class RoomImport(ImportResult):
+    """A validated import: the rooms to insert, the rooms to update and the per-row errors"""
+
+    def __init__(self, upsert=False):
+        super().__init__()
+        self.upsert = upsert
+        self.new_rooms = []  # {'room_no', 'capacity', 'description'}
+        self.updates = []  # {'room_id', 'room_no', 'capacity', 'description'}
+
+def _clean(label, item, result):
+    """Validate one row; returns (room_no, capacity, description) or None after recording the error"""
+    if not isinstance(item, dict):
+        result.error(label, 'Expected an object with room_no and capacity.')
+        return None
+
+    room_no = str(item.get('room_no') or '').strip()
+    if not room_no:
+        result.error(label, 'Room number is required.')
+        return None
+    if len(room_no) > ROOM_NO_LENGTH:
+        result.error(label, f'Room number {room_no} is longer than {ROOM_NO_LENGTH} characters.')
+        return None
+
+    try:
+        capacity = int(str(item.get('capacity', '')).strip())
+    except ValueError:
+        result.error(label, f'Room {room_no}: capacity must be a valid number.')
+        return None
+    if capacity < 1:
+        result.error(label, f'Room {room_no}: capacity must be at least 1.')
+        return None
+
+    description = str(item.get('description') or '').strip() or None
+    return room_no, capacity, description
+
+def validate_rooms(rows, upsert=False):
+    """Check every row and sort them into inserts and updates"""
+    result = RoomImport(upsert)
+    cleaned = {}  # room_no -> (label, capacity, description)
+    for label, item in rows:
+        row = _clean(label, item, result)
+        if row is None:
+            continue
+        room_no, capacity, description = row
+        if room_no in cleaned:
+            result.error(label, f'Room {room_no} also appears on {cleaned[room_no][0]}.')
+            continue
+        cleaned[room_no] = (label, capacity, description)
+
+    existing = existing_values(Room.room_no, cleaned, Room.id, Room.allocated_beds)
+    for room_no, (label, capacity, description) in cleaned.items():
+        if room_no not in existing:
+            result.new_rooms.append({'room_no': room_no, 'capacity': capacity, 'description': description})
+            continue
+        room_id, allocated = existing[room_no]
+        if not upsert:
+            result.error(label, f'Room {room_no} already exists. Use upsert mode to update it.')
+        elif capacity < allocated:
+            result.error(label, f'Room {room_no}: capacity cannot be lower than the {allocated} beds already allocated.')
+        else:
+            result.updates.append({'room_id': room_id, 'room_no': room_no,
+                                   'capacity': capacity, 'description': description})
+    return result
+
+def load_room_import(stream, filename, upsert=False):
+    """Read and validate a room file; unreadable files become a single error"""
+    try:
+        rows = read_rows(stream, ('room_no', 'capacity'), filename, json_key='rooms')
+    except READ_ERRORS as e:
+        result = RoomImport(upsert)
+        result.error('file', str(e))
+        return result
+    return validate_rooms(rows, upsert)
@@ -1,8 +1,22 @@
-from flask import Blueprint, render_template, redirect, url_for, flash, request, session, jsonify, make_response
-from models import db, User, Room, Booking, Log, get_ist_now, IST
-from decorators import admin_required, login_required
+from flask import Blueprint, render_template, redirect, url_for, flash, request, session, Response, current_app, stream_with_context
+from models import db, User, Room, Booking, BookingHistory, Log, get_ist_now, IST
+from decorators import admin_required
+from principal import current_user
+from pagination import paginate_keyset, paginate_keyset_chain, paginate_keyset_merge
+from transitions import TransitionError
+import transitions
+import allocation
+import room_import
+import log_archive
+import live_feed
+import dashboard_stats
+from cache import TTLCache
+from sqlalchemy import func, and_
+from sqlalchemy.orm import joinedload, aliased
 from datetime import datetime, timedelta
+from itertools import chain
 import csv
+import zlib
 from io import StringIO
 
 admin_bp = Blueprint('admin', __name__)
@@ -10,35 +24,20 @@ admin_bp = Blueprint('admin', __name__)
 @admin_bp.route('/dashboard')
 @admin_required
 def dashboard():
-    total_users = User.query.filter_by(role='user').count()
-    total_rooms = Room.query.count()
-    total_bookings = Booking.query.count()
-    pending_bookings = Booking.query.filter_by(status='pending').count()
-    checked_in = Booking.query.filter_by(status='checked_in').count()
-    
-    # Recent bookings
-    recent_bookings = Booking.query.order_by(Booking.created_at.desc()).limit(10).all()
-    
-    # Recent logs
-    recent_logs = Log.query.order_by(Log.timestamp.desc()).limit(10).all()
-    
-    return render_template('admin/dashboard.html',
-                         total_users=total_users,
-                         total_rooms=total_rooms,
-                         total_bookings=total_bookings,
-                         pending_bookings=pending_bookings,
-                         checked_in=checked_in,
-                         recent_bookings=recent_bookings,
-                         recent_logs=recent_logs)
+    # Counts and recent lists in three queries, cached until the next transition
+    return render_template('admin/dashboard.html', **dashboard_stats.dashboard())
+
+@admin_bp.route('/live')
+@admin_required
+def live():
+    """Server-Sent Events stream of booking and occupancy changes for the dashboard and bookings page"""
+    return live_feed.event_stream(session['user_id'], is_admin=True)
 
 @admin_bp.route('/rooms')
 @admin_required
 def rooms():
+    # Occupancy counters are maintained by the booking transitions, so this is a plain read
     rooms = Room.query.order_by(Room.room_no).all()
-    # Update available beds for all rooms
-    for room in rooms:
-        room.update_available_beds()
-    db.session.commit()
     return render_template('admin/rooms.html', rooms=rooms)
 
 @admin_bp.route('/rooms/add', methods=['GET', 'POST'])
@@ -47,46 +46,58 @@ def add_room():
     if request.method == 'POST':
         room_no = request.form.get('room_no')
         capacity = request.form.get('capacity')
-        available_beds = request.form.get('available_beds')
         description = request.form.get('description')
         
-        if not all([room_no, capacity, available_beds]):
-            flash('Room number, capacity, and available beds are required.', 'danger')
+        if not all([room_no, capacity]):
+            flash('Room number and capacity are required.', 'danger')
             return render_template('admin/add_room.html')
         
         try:
             capacity = int(capacity)
-            available_beds = int(available_beds)
-            
-            if available_beds > capacity:
-                flash('Available beds cannot exceed room capacity.', 'danger')
-                return render_template('admin/add_room.html')
             
-            if Room.query.filter_by(room_no=room_no).first():
-                flash('Room number already exists.', 'danger')
-                return render_template('admin/add_room.html')
-            
-            room = Room(room_no=room_no, capacity=capacity, 
-                       available_beds=available_beds, description=description)
-            db.session.add(room)
-            db.session.commit()
-            
-            # Log action
-            log = Log(user_id=session['user_id'], action='room_added', 
-                     details=f'Admin added room: {room_no}')
-            db.session.add(log)
-            db.session.commit()
+            transitions.add_room(session['user_id'], room_no, capacity, description)
             
             flash('Room added successfully!', 'success')
             return redirect(url_for('admin.rooms'))
+        except TransitionError as e:
+            flash(e.message, e.category)
+            return render_template('admin/add_room.html')
         except ValueError:
-            flash('Capacity and available beds must be valid numbers.', 'danger')
+            flash('Capacity must be a valid number.', 'danger')
         except Exception as e:
             db.session.rollback()
             flash('An error occurred. Please try again.', 'danger')
     
     return render_template('admin/add_room.html')
 
+@admin_bp.route('/rooms/import', methods=['GET', 'POST'])
+@admin_required
+def import_rooms():
+    if request.method == 'POST':
+        upload = request.files.get('rooms_file')
+        upsert = request.form.get('mode') == 'upsert'
+        
+        if not upload or not upload.filename:
+            flash('Choose a CSV or JSON file to import.', 'danger')
+            return render_template('admin/import_rooms.html', upsert=upsert)
+        
+        result = room_import.load_room_import(upload.stream, upload.filename, upsert)
+        if not result.ok or request.form.get('action') == 'validate':
+            # Report every bad row (or the validation result) without importing anything
+            return render_template('admin/import_rooms.html', result=result, upsert=upsert,
+                                 filename=upload.filename)
+        
+        try:
+            added, updated = transitions.import_rooms(result, session['user_id'])
+        except TransitionError as e:
+            flash(e.message, e.category)
+            return render_template('admin/import_rooms.html', upsert=upsert)
+        
+        flash(f'Imported {added} new rooms and updated {updated} existing rooms!', 'success')
+        return redirect(url_for('admin.rooms'))
+    
+    return render_template('admin/import_rooms.html', upsert=False)
+
 @admin_bp.route('/rooms/edit/<int:room_id>', methods=['GET', 'POST'])
 @admin_required
 def edit_room(room_id):
@@ -95,45 +106,24 @@ def edit_room(room_id):
     if request.method == 'POST':
         room_no = request.form.get('room_no')
         capacity = request.form.get('capacity')
-        available_beds = request.form.get('available_beds')
         description = request.form.get('description')
         
-        if not all([room_no, capacity, available_beds]):
-            flash('Room number, capacity, and available beds are required.', 'danger')
+        if not all([room_no, capacity]):
+            flash('Room number and capacity are required.', 'danger')
             return render_template('admin/edit_room.html', room=room)
         
         try:
             capacity = int(capacity)
-            available_beds = int(available_beds)
-            
-            if available_beds > capacity:
-                flash('Available beds cannot exceed room capacity.', 'danger')
-                return render_template('admin/edit_room.html', room=room)
-            
-            # Check if room number already exists (excluding current room)
-            existing_room = Room.query.filter_by(room_no=room_no).first()
-            if existing_room and existing_room.id != room_id:
-                flash('Room number already exists.', 'danger')
-                return render_template('admin/edit_room.html', room=room)
             
-            old_room_no = room.room_no
-            room.room_no = room_no
-            room.capacity = capacity
-            room.available_beds = available_beds
-            room.description = description
-            
-            db.session.commit()
-            
-            # Log action
-            log = Log(user_id=session['user_id'], action='room_edited', 
-                     details=f'Admin edited room: {old_room_no} -> {room_no}')
-            db.session.add(log)
-            db.session.commit()
+            transitions.edit_room(room, session['user_id'], room_no, capacity, description)
             
             flash('Room updated successfully!', 'success')
             return redirect(url_for('admin.rooms'))
+        except TransitionError as e:
+            flash(e.message, e.category)
+            return render_template('admin/edit_room.html', room=room)
         except ValueError:
-            flash('Capacity and available beds must be valid numbers.', 'danger')
+            flash('Capacity must be a valid number.', 'danger')
         except Exception as e:
             db.session.rollback()
             flash('An error occurred. Please try again.', 'danger')
@@ -145,97 +135,72 @@ def edit_room(room_id):
 def delete_room(room_id):
     room = Room.query.get_or_404(room_id)
     
-    # Check if room has active bookings
-    active_bookings = Booking.query.filter_by(room_id=room_id).filter(
-        Booking.status.in_(['pending', 'approved', 'checked_in'])
-    ).count()
-    
-    if active_bookings > 0:
-        flash('Cannot delete room with active bookings.', 'danger')
+    try:
+        transitions.delete_room(room, session['user_id'])
+    except TransitionError as e:
+        flash(e.message, e.category)
         return redirect(url_for('admin.rooms'))
     
-    room_no = room.room_no
-    db.session.delete(room)
-    db.session.commit()
-    
-    # Log action
-    log = Log(user_id=session['user_id'], action='room_deleted', 
-             details=f'Admin deleted room: {room_no}')
-    db.session.add(log)
-    db.session.commit()
-    
     flash('Room deleted successfully!', 'success')
     return redirect(url_for('admin.rooms'))
 
 @admin_bp.route('/users')
 @admin_required
 def users():
-    users = User.query.filter_by(role='user').order_by(User.created_at.desc()).all()
-    return render_template('admin/users.html', users=users)
+    include_history = request.args.get('history') == '1'
+    
+    # Count each listed user's bookings with an index seek, instead of grouping every booking for each page
+    booking_count = db.session.query(func.count(Booking.id)).filter(Booking.user_id == User.id).scalar_subquery()
+    if include_history:
+        booking_count = booking_count + db.session.query(func.count(BookingHistory.id)).filter(
+            BookingHistory.user_id == User.id
+        ).scalar_subquery()
+    
+    query = db.session.query(User, booking_count).filter(User.role == 'user')
+    
+    page = paginate_keyset(query, User.created_at, User.id,
+                           key=lambda row: (row[0].created_at, row[0].id))
+    return render_template('admin/users.html', users=page.items, page=page, include_history=include_history)
 
 @admin_bp.route('/bookings')
 @admin_required
 def bookings():
     status_filter = request.args.get('status', 'all')
+    include_history = request.args.get('history') == '1'
     
-    query = Booking.query
+    # Load each booking's user and room in the same query
+    query = Booking.query.options(joinedload(Booking.user), joinedload(Booking.room))
     if status_filter != 'all':
         query = query.filter_by(status=status_filter)
     
-    bookings = query.order_by(Booking.created_at.desc()).all()
-    return render_template('admin/bookings.html', bookings=bookings, status_filter=status_filter)
+    # Finished bookings moved to the history are merged in only when asked for
+    if include_history:
+        history = BookingHistory.query.options(joinedload(BookingHistory.user), joinedload(BookingHistory.room))
+        if status_filter != 'all':
+            history = history.filter_by(status=status_filter)
+        page = paginate_keyset_merge([(query, Booking.created_at, Booking.id),
+                                      (history, BookingHistory.created_at, BookingHistory.id)])
+    else:
+        page = paginate_keyset(query, Booking.created_at, Booking.id)
+    
+    # Rooms for the bulk review form's "all pending in room" option
+    rooms = db.session.query(Room.id, Room.room_no).order_by(Room.room_no).all()
+    return render_template('admin/bookings.html', bookings=page.items, page=page,
+                         status_filter=status_filter, include_history=include_history, rooms=rooms,
+                         facets=dashboard_stats.booking_facets(include_history))
 
 @admin_bp.route('/bookings/approve/<int:booking_id>', methods=['POST'])
 @admin_required
 def approve_booking(booking_id):
     booking = Booking.query.get_or_404(booking_id)
     
-    if booking.status != 'pending':
-        flash('Only pending bookings can be approved.', 'warning')
-        return redirect(url_for('admin.bookings'))
-    
-    # Check if room has available beds
-    room = booking.room
-    room.update_available_beds()  # Update to get current availability
-    active_bookings = Booking.query.filter_by(room_id=room.id).filter(
-        Booking.status.in_(['approved', 'checked_in'])
-    ).count()
-    
-    if active_bookings >= room.capacity:
-        flash('Room is full. Cannot approve more bookings.', 'danger')
-        return redirect(url_for('admin.bookings'))
-    
-    booking.status = 'approved'
-    booking.updated_at = get_ist_now()
-    
-    # Update room available beds (in case it was manually changed)
-    room.update_available_beds()
-    
-    db.session.commit()
-    
-    # Log action
-    log = Log(user_id=session['user_id'], action='booking_approved', 
-             details=f'Admin approved booking #{booking_id} for user {booking.user.name}')
-    db.session.add(log)
-    db.session.commit()
-    
-    # Send approval email to user
     try:
-        from email_service import send_booking_approval_email
-        email_sent = send_booking_approval_email(
-            user_email=booking.user.email,
-            user_name=booking.user.name,
-            room_no=room.room_no,
-            room_description=room.description
-        )
-        if email_sent:
-            flash('Booking approved successfully! Email notification sent.', 'success')
-        else:
-            flash('Booking approved successfully! (Email notification failed - check email configuration)', 'warning')
-    except Exception as e:
-        print(f"Error sending email: {str(e)}")
-        flash('Booking approved successfully! (Email notification failed - check email configuration)', 'warning')
+        transitions.approve_booking(booking, session['user_id'])
+    except TransitionError as e:
+        flash(e.message, e.category)
+        return redirect(url_for('admin.bookings'))
     
+    flash('Booking approved successfully! Email notification queued.', 'success')
     return redirect(url_for('admin.bookings'))
 
 @admin_bp.route('/bookings/reject/<int:booking_id>', methods=['POST'])
@@ -243,32 +208,92 @@ def approve_booking(booking_id):
 def reject_booking(booking_id):
     booking = Booking.query.get_or_404(booking_id)
     
-    if booking.status != 'pending':
-        flash('Only pending bookings can be rejected.', 'warning')
+    try:
+        transitions.reject_booking(booking, session['user_id'])
+    except TransitionError as e:
+        flash(e.message, e.category)
         return redirect(url_for('admin.bookings'))
     
-    booking.status = 'rejected'
-    booking.updated_at = get_ist_now()
+    flash('Booking rejected successfully!', 'success')
+    return redirect(url_for('admin.bookings'))
+
+def bulk_selection():
+    """SQL condition for the bookings picked in the bulk review form"""
+    scope = request.form.get('scope', 'selected')
+    if scope == 'all':
+        return db.true()
+    if scope == 'room':
+        return Booking.room_id == request.form.get('room_id', type=int)
+    return Booking.id.in_(request.form.getlist('booking_ids', type=int))
+
+@admin_bp.route('/bookings/bulk', methods=['POST'])
+@admin_required
+def bulk_review_bookings():
+    action = request.form.get('action')
+    redirect_to = redirect(url_for('admin.bookings', status=request.form.get('status_filter', 'all')))
     
-    # Update room available beds
-    room = booking.room
-    room.update_available_beds()
+    if action not in ('approve', 'reject'):
+        flash('Unknown bulk action.', 'danger')
+        return redirect_to
     
-    db.session.commit()
+    try:
+        if action == 'approve':
+            count = transitions.bulk_approve_bookings(bulk_selection(), session['user_id'])
+        else:
+            count = transitions.bulk_reject_bookings(bulk_selection(), session['user_id'])
+    except TransitionError as e:
+        flash(e.message, e.category)
+        return redirect_to
+    
+    if action == 'approve':
+        flash(f'{count} bookings approved successfully! Email notifications queued.', 'success')
+    else:
+        flash(f'{count} bookings rejected successfully!', 'success')
+    return redirect_to
+
+@admin_bp.route('/bookings/allocate', methods=['GET', 'POST'])
+@admin_required
+def allocate_bookings():
+    keep_groups = request.values.get('groups', '1') == '1'
+    plan = allocation.load_allocation_plan(keep_groups)
     
-    # Log action
-    log = Log(user_id=session['user_id'], action='booking_rejected', 
-             details=f'Admin rejected booking #{booking_id} for user {booking.user.name}')
-    db.session.add(log)
-    db.session.commit()
+    if request.method == 'POST':
+        # Apply only the plan the admin previewed; anything that changed since is shown first
+        if request.form.get('plan') != plan.fingerprint():
+            flash('Bookings or rooms changed since this plan was shown. Review the updated plan and allocate again.', 'warning')
+            return redirect(url_for('admin.allocate_bookings', groups=int(keep_groups)))
+        
+        try:
+            count = transitions.apply_allocation(plan, session['user_id'])
+        except TransitionError as e:
+            flash(e.message, e.category)
+            return redirect(url_for('admin.allocate_bookings', groups=int(keep_groups)))
+        
+        flash(f'{count} bookings allocated and approved! Email notifications queued.', 'success')
+        return redirect(url_for('admin.bookings'))
     
-    flash('Booking rejected successfully!', 'success')
-    return redirect(url_for('admin.bookings'))
+    # Dry run: show what the plan would do without changing anything
+    beds = plan.beds_by_room()
+    room_nos = allocation.room_numbers(list(beds))
+    rooms = sorted(((room_nos[room_id], plan.free_before[room_id], count) for room_id, count in beds.items()))
+    return render_template('admin/allocate.html', summary=plan.summary(), rooms=rooms, plan=plan.fingerprint(),
+                         keep_groups=keep_groups, fragmented=allocation.fragmented_rooms())
 
-@admin_bp.route('/logs')
-@admin_required
-def logs():
-    query = Log.query
+LOG_FILTER_ARGS = ('action', 'user_email', 'date_from', 'date_to')
+
+# Log page statistics keyed on (today, filters)
+log_stats_cache = TTLCache()
+
+def filter_dates():
+    """The From and To dates of the logs filters, None where not given;
+    ValueError if either is not a real YYYY-MM-DD date"""
+    return tuple(datetime.strptime(value, '%Y-%m-%d').date() if value else None
+                 for value in (request.args.get('date_from'), request.args.get('date_to')))
+
+def filter_logs(query):
+    """Apply the admin logs page filters (action, user email, date range) from the request;
+    raises ValueError for a malformed date"""
+    date_from, date_to = filter_dates()
     
     # Filter by action
     action_filter = request.args.get('action')
@@ -278,91 +303,202 @@ def logs():
     # Filter by user email
     user_email = request.args.get('user_email')
     if user_email:
-        query = query.join(User).filter(User.email.ilike(f'%{user_email}%'))
+        matching_users = db.session.query(User.id).filter(User.email.ilike(f'%{user_email}%'))
+        query = query.filter(Log.user_id.in_(matching_users))
     
     # Filter by date range
-    date_from = request.args.get('date_from')
-    date_to = request.args.get('date_to')
     if date_from:
-        date_from_dt = IST.localize(datetime.strptime(date_from, '%Y-%m-%d'))
+        date_from_dt = IST.localize(datetime.combine(date_from, datetime.min.time()))
         query = query.filter(Log.timestamp >= date_from_dt)
     if date_to:
-        date_to_dt = IST.localize(datetime.strptime(date_to, '%Y-%m-%d'))
+        date_to_dt = IST.localize(datetime.combine(date_to, datetime.min.time()))
         # Add one day to include the entire end date
         date_to_dt = date_to_dt + timedelta(days=1)
         query = query.filter(Log.timestamp < date_to_dt)
     
-    logs = query.order_by(Log.timestamp.desc()).all()
-    
-    # Calculate statistics
-    from models import get_ist_now
+    return query
+
+def bad_log_dates():
+    """Redirect back to the logs page without the date filters, keeping the others"""
+    flash('Dates must be valid and in YYYY-MM-DD format.', 'danger')
+    return redirect(url_for('admin.logs', action=request.args.get('action') or None,
+                            user_email=request.args.get('user_email') or None))
+
+def search_archived_logs():
+    """Archived entries matching the filters, streamed newest first, when the From Date
+    reaches back into archived days; None when there is no From Date"""
+    date_from, date_to = filter_dates()
+    if not date_from:
+        return None
+    return log_archive.search_archive(request.args.get('action'), request.args.get('user_email'), date_from, date_to)
+
+def get_log_stats(query, today, archived=None):
+    """Total, today's, distinct-user and distinct-action counts of query in one statement of indexed subqueries,
+    plus the archived entries matched, read in one pass over the archive stream"""
+    today_start = IST.localize(datetime.combine(today, datetime.min.time()))
+    today_end = today_start + timedelta(days=1)
+    is_today = and_(Log.timestamp >= today_start, Log.timestamp < today_end)
+    
+    # Distinct users and actions are counted as the users and actions with a matching entry:
+    # one index seek each, instead of sorting every matching entry to drop duplicates
+    logger = aliased(User)
+    users = db.session.query(logger.id)
+    user_email = request.args.get('user_email')
+    if user_email:
+        # Only the users the email filter matches can have an entry
+        users = users.filter(logger.email.ilike(f'%{user_email}%'))
+    live_users = users.filter(query.filter(Log.user_id == logger.id).exists())
+    actions = db.session.query(Log.action.label('action')).distinct().subquery()
+    live_actions = db.session.query(actions.c.action).filter(query.filter(Log.action == actions.c.action).exists())
+    
+    counts = [
+        query.with_entities(func.count(Log.id)),
+        query.filter(is_today).with_entities(func.count(Log.id)),
+        live_users.with_entities(func.count(logger.id)),
+        live_actions.with_entities(func.count(actions.c.action)),
+    ]
+    total_logs, today_logs_count, unique_users, unique_actions = db.session.query(
+        *[count.order_by(None).scalar_subquery() for count in counts]
+    ).one()
+    
+    # Archived entries are never from today; distinct counts need the live sets to merge with them
+    archived_count, archived_users, archived_actions = 0, set(), set()
+    for entry in archived or ():
+        archived_count += 1
+        archived_users.add(entry.user_id)
+        archived_actions.add(entry.action)
+    if archived_count:
+        total_logs += archived_count
+        unique_users = len({user_id for user_id, in live_users} | archived_users)
+        unique_actions = len({action for action, in live_actions} | archived_actions)
+    
+    return {
+        'archived_count': archived_count,
+        'total_logs': total_logs,
+        'today_logs_count': today_logs_count,
+        'unique_users': unique_users,
+        'unique_actions': unique_actions,
+    }
+
+@admin_bp.route('/logs')
+@admin_required
+def logs():
+    try:
+        query = filter_logs(Log.query)
+    except ValueError:
+        return bad_log_dates()
+    archived = search_archived_logs()
+    
+    # Load each log's user with the page; archived entries follow the live ones
+    if archived is not None:
+        page = paginate_keyset_chain(query.options(joinedload(Log.user)), Log.timestamp, Log.id, archived)
+    else:
+        page = paginate_keyset(query.options(joinedload(Log.user)), Log.timestamp, Log.id)
+    
+    # Statistics over the whole filtered set, aggregated in SQL and cached briefly
     today = get_ist_now().date()
-    
-    # Count today's logs
-    today_logs = [log for log in logs if log.timestamp.date() == today]
-    
-    # Get unique user IDs
-    unique_users = len(set(log.user_id for log in logs))
-    
-    # Get unique action types
-    unique_actions = len(set(log.action for log in logs))
+    cache_key = (today,) + tuple(request.args.get(name) for name in LOG_FILTER_ARGS)
+    stats = log_stats_cache.get_or_set(cache_key, lambda: get_log_stats(query, today, search_archived_logs()),
+                                       ttl=current_app.config.get('LOG_STATS_CACHE_TTL', 10))
+    archive_days = log_archive.segment_days()
     
     return render_template('admin/logs.html', 
-                         logs=logs, 
+                         logs=page.items, 
+                         page=page,
                          today=today,
-                         today_logs_count=len(today_logs),
-                         unique_users=unique_users,
-                         unique_actions=unique_actions)
+                         archived_count=stats['archived_count'],
+                         archived_until=archive_days[0] if archive_days else None,
+                         total_logs=stats['total_logs'],
+                         today_logs_count=stats['today_logs_count'],
+                         unique_users=stats['unique_users'],
+                         unique_actions=stats['unique_actions'])
 
-@admin_bp.route('/logs/export')
-@admin_required
-def export_logs():
-    logs = Log.query.order_by(Log.timestamp.desc()).all()
-    
+def generate_logs_csv(query, chunk_size, archived=()):
+    """Yield the CSV export of query, then of the archived entries, one chunk of rows at a time"""
     output = StringIO()
     writer = csv.writer(output)
     
     # Write header
     writer.writerow(['ID', 'User', 'Email', 'Action', 'Details', 'Timestamp'])
     
-    # Write data
-    for log in logs:
+    # Write data, streaming rows from the database cursor in chunks
+    for index, row in enumerate(chain(query.yield_per(chunk_size), archived), start=1):
         writer.writerow([
-            log.id,
-            log.user.name,
-            log.user.email,
-            log.action,
-            log.details or '',
-            log.timestamp.strftime('%Y-%m-%d %H:%M:%S')
+            row.id,
+            row.name,
+            row.email,
+            row.action,
+            row.details or '',
+            row.timestamp.strftime('%Y-%m-%d %H:%M:%S')
         ])
+        if index % chunk_size == 0:
+            yield output.getvalue()
+            output.seek(0)
+            output.truncate()
     
-    output.seek(0)
-    
-    response = make_response(output.getvalue())
-    response.headers['Content-Type'] = 'text/csv'
-    response.headers['Content-Disposition'] = 'attachment; filename=accommodation_logs.csv'
+    yield output.getvalue()
+
+def gzip_stream(chunks):
+    """Gzip-compress a stream of text chunks on the fly"""
+    compressor = zlib.compressobj(wbits=31)  # 31 selects the gzip container
+    for chunk in chunks:
+        data = compressor.compress(chunk.encode('utf-8'))
+        if data:
+            yield data
+    yield compressor.flush()
+
+@admin_bp.route('/logs/export')
+@admin_required
+def export_logs():
+    # Same filters as the logs page, with the user columns joined in the same query
+    try:
+        query = filter_logs(
+            db.session.query(Log.id, User.name, User.email, Log.action, Log.details, Log.timestamp).join(Log.user)
+        ).order_by(Log.timestamp.desc(), Log.id.desc())
+    except ValueError:
+        return bad_log_dates()
+    
+    chunk_size = current_app.config.get('EXPORT_CHUNK_SIZE', 1000)
+    body = generate_logs_csv(query, chunk_size, search_archived_logs() or ())
+    filename = 'accommodation_logs.csv'
+    mimetype = 'text/csv'
+    
+    # ?gzip=1 downloads a compressed accommodation_logs.csv.gz
+    if request.args.get('gzip'):
+        body = gzip_stream(body)
+        filename += '.gz'
+        mimetype = 'application/gzip'
+    
+    response = Response(stream_with_context(body), mimetype=mimetype)
+    response.headers['Content-Disposition'] = f'attachment; filename={filename}'
     
     return response
 
+@admin_bp.route('/logs/archive', methods=['POST'])
+@admin_required
+def archive_logs():
+    retention_days = current_app.config.get('LOG_RETENTION_DAYS', 30)
+    try:
+        count = log_archive.archive_logs(session['user_id'])
+    except OSError as e:
+        db.session.rollback()
+        flash(f'Could not write the log archive: {e.strerror}', 'danger')
+        return redirect(url_for('admin.logs'))
+    
+    if count:
+        log_stats_cache.clear()
+        flash(f'Archived {count} log entries older than {retention_days} days.', 'success')
+    else:
+        flash(f'No log entries older than {retention_days} days to archive.', 'info')
+    return redirect(url_for('admin.logs'))
+
 @admin_bp.route('/logs/clear', methods=['POST'])
 @admin_required
 def clear_logs():
     try:
-        # Get count before deletion for flash message
-        log_count = Log.query.count()
-        
-        # Delete all logs
-        Log.query.delete()
-        db.session.commit()
-        
-        # Log the action (this will be the first log after clearing)
-        log = Log(
-            user_id=session['user_id'],
-            action='logs_cleared',
-            details=f'Admin {User.query.get(session["user_id"]).name} cleared all {log_count} logs'
-        )
-        db.session.add(log)
-        db.session.commit()
+        admin = current_user()
+        log_count = transitions.clear_logs(admin)
+        log_stats_cache.clear()
         
         flash(f'Successfully cleared {log_count} log entries.', 'success')
     except Exception as e:
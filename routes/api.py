@@ -0,0 +1,86 @@
+"""
+Read-only JSON availability API for the help-desk kiosks and the fest app.
+Every response carries a strong ETag made from the occupancy version (see
+models.OccupancyVersion), which each transition that changes a room or its
+occupancy bumps. A poll that sends the ETag back in If-None-Match is answered
+with 304 Not Modified after reading that one row; rooms and bookings are not
+queried at all. Availability comes from the room counters, never from the
+bookings table.
+"""
+
+from flask import Blueprint, Response, jsonify, request
+from sqlalchemy import func
+from models import db, Room, OccupancyVersion
+
+api_bp = Blueprint('api', __name__)
+
+ROOM_COLUMNS = (Room.id, Room.room_no, Room.description, Room.capacity,
+                Room.allocated_beds, Room.occupied_beds, Room.available_beds)
+
+def room_json(row):
+    return {
+        'id': row.id,
+        'room_no': row.room_no,
+        'description': row.description,
+        'capacity': row.capacity,
+        'allocated_beds': row.allocated_beds,
+        'occupied_beds': row.occupied_beds,
+        'available_beds': row.available_beds,
+        # Beds not yet promised to an approved booking, i.e. what a new request can still get
+        'free_beds': max(0, row.capacity - row.allocated_beds),
+    }
+
+def conditional_json(compute):
+    """
+    Answer with compute()'s JSON, or 304 if the client already has this version.
+    The version is read before the data, so a body is never older than its ETag.
+    """
+    etag = f'occupancy-{OccupancyVersion.current()}'
+    if request.if_none_match.contains(etag):
+        response = Response(status=304)
+    else:
+        body = compute()
+        if body is None:
+            return jsonify(error='Room not found'), 404
+        response = jsonify(body)
+    response.set_etag(etag)
+    # Clients may keep the response but must revalidate it on every poll
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
+
+@api_bp.route('/rooms')
+def rooms():
+    """Every room with its bed counts; ?available=1 lists only rooms a new request can get"""
+    only_available = request.args.get('available') == '1'
+
+    def compute():
+        query = db.session.query(*ROOM_COLUMNS)
+        if only_available:
+            query = query.filter(Room.allocated_beds < Room.capacity)
+        return {'rooms': [room_json(row) for row in query.order_by(Room.room_no)]}
+
+    return conditional_json(compute)
+
+@api_bp.route('/rooms/<int:room_id>')
+def room(room_id):
+    def compute():
+        row = db.session.query(*ROOM_COLUMNS).filter(Room.id == room_id).first()
+        return room_json(row) if row else None
+
+    return conditional_json(compute)
+
+@api_bp.route('/stats')
+def stats():
+    """Bed totals over all rooms, from one aggregate query"""
+    def compute():
+        totals = db.session.query(
+            func.count(Room.id).label('rooms'),
+            func.coalesce(func.sum(Room.capacity), 0).label('capacity'),
+            func.coalesce(func.sum(Room.allocated_beds), 0).label('allocated_beds'),
+            func.coalesce(func.sum(Room.occupied_beds), 0).label('occupied_beds'),
+            func.coalesce(func.sum(Room.available_beds), 0).label('available_beds'),
+            func.count(Room.id).filter(Room.allocated_beds >= Room.capacity).label('full_rooms'),
+        ).one()
+        return {**totals._asdict(), 'free_beds': totals.capacity - totals.allocated_beds}
+
+    return conditional_json(compute)
@@ -1,6 +1,11 @@
 from flask import Blueprint, render_template, redirect, url_for, flash, request, session
-from models import db, User, Room, Booking, Log, get_ist_now
+from models import db, Room, Booking
 from decorators import login_required
+from principal import current_user
+from transitions import TransitionError
+import transitions
+import booking_history
+import live_feed
 
 user_bp = Blueprint('user', __name__)
 
@@ -8,18 +13,13 @@ user_bp = Blueprint('user', __name__)
 @login_required
 def dashboard():
     user_id = session['user_id']
-    user = User.query.get(user_id)
+    user = current_user()
     
     # Get user's bookings
     bookings = Booking.query.filter_by(user_id=user_id).order_by(Booking.created_at.desc()).all()
     
-    # Get available rooms and update their availability
-    all_rooms = Room.query.all()
-    for room in all_rooms:
-        room.update_available_beds()
-    db.session.commit()
-    
-    available_rooms = [room for room in all_rooms if room.available_beds > 0]
+    # Get available rooms (occupancy is maintained by the booking transitions)
+    available_rooms = Room.query.filter(Room.available_beds > 0).all()
     
     # Check active booking
     active_booking = Booking.query.filter_by(user_id=user_id).filter(
@@ -32,21 +32,31 @@ def dashboard():
                          available_rooms=available_rooms,
                          active_booking=active_booking)
 
+@user_bp.route('/live')
+@login_required
+def live():
+    """Server-Sent Events stream of room availability and the user's own booking changes"""
+    return live_feed.event_stream(session['user_id'], is_admin=False)
+
 @user_bp.route('/profile')
 @login_required
 def profile():
     user_id = session['user_id']
-    user = User.query.get(user_id)
-    bookings = Booking.query.filter_by(user_id=user_id).order_by(Booking.created_at.desc()).all()
+    user = current_user()
+    include_history = request.args.get('history') == '1'
+    bookings = booking_history.user_bookings(user_id, include_history)
     
-    # Calculate statistics
-    total_bookings = len(bookings)
+    # Calculate statistics; moved bookings are counted from the history index without loading them
+    moved = {} if include_history else booking_history.history_counts(user_id)
+    total_bookings = len(bookings) + sum(moved.values())
     active_bookings = len([b for b in bookings if b.status in ['pending', 'approved', 'checked_in']])
-    completed_bookings = len([b for b in bookings if b.status == 'checked_out'])
+    completed_bookings = len([b for b in bookings if b.status == 'checked_out']) + moved.get('checked_out', 0)
     
     return render_template('user/profile.html', 
                          user=user, 
                          bookings=bookings,
+                         include_history=include_history,
+                         moved_bookings=sum(moved.values()),
                          total_bookings=total_bookings,
                          active_bookings=active_bookings,
                          completed_bookings=completed_bookings)
@@ -54,8 +64,7 @@ def profile():
 @user_bp.route('/profile/edit', methods=['GET', 'POST'])
 @login_required
 def edit_profile():
-    user_id = session['user_id']
-    user = User.query.get(user_id)
+    user = current_user()
     
     if request.method == 'POST':
         name = request.form.get('name')
@@ -68,9 +77,6 @@ def edit_profile():
             flash('Name and phone are required.', 'danger')
             return render_template('user/edit_profile.html', user=user)
         
-        user.name = name
-        user.phone = phone
-        
         # Handle password change
         if current_password and new_password and confirm_password:
             if not user.check_password(current_password):
@@ -84,21 +90,15 @@ def edit_profile():
             if len(new_password) < 6:
                 flash('Password must be at least 6 characters long.', 'danger')
                 return render_template('user/edit_profile.html', user=user)
-            
-            user.set_password(new_password)
+        else:
+            new_password = None
         
         try:
-            db.session.commit()
+            transitions.update_profile(user, name, phone, new_password)
             
             # Update session
             session['user_name'] = user.name
             
-            # Log action
-            log = Log(user_id=user_id, action='profile_updated', 
-                     details=f'User updated profile')
-            db.session.add(log)
-            db.session.commit()
-            
             flash('Profile updated successfully!', 'success')
             return redirect(url_for('user.profile'))
         except Exception as e:
@@ -117,41 +117,13 @@ def request_booking():
         flash('Please select a room.', 'danger')
         return redirect(url_for('user.dashboard'))
     
-    # Check if user already has an active booking
-    active_booking = Booking.query.filter_by(user_id=user_id).filter(
-        Booking.status.in_(['pending', 'approved', 'checked_in'])
-    ).first()
-    
-    if active_booking:
-        flash('You already have an active booking request.', 'warning')
-        return redirect(url_for('user.dashboard'))
-    
     room = Room.query.get_or_404(room_id)
     
-    # Check if room has available beds
-    room.update_available_beds()  # Update to get current availability
-    active_bookings = Booking.query.filter_by(room_id=room_id).filter(
-        Booking.status.in_(['approved', 'checked_in'])
-    ).count()
-    
-    if active_bookings >= room.capacity:
-        flash('Room is full. Please select another room.', 'danger')
-        return redirect(url_for('user.dashboard'))
-    
-    # Create booking
-    booking = Booking(user_id=user_id, room_id=room_id, status='pending')
-    
     try:
-        db.session.add(booking)
-        db.session.commit()
-        
-        # Log action
-        log = Log(user_id=user_id, action='booking_requested', 
-                 details=f'User requested booking for room {room.room_no}')
-        db.session.add(log)
-        db.session.commit()
-        
+        transitions.request_booking(user_id, room)
         flash('Booking request submitted successfully! Waiting for admin approval.', 'success')
+    except TransitionError as e:
+        flash(e.message, e.category)
     except Exception as e:
         db.session.rollback()
         flash('An error occurred. Please try again.', 'danger')
@@ -164,38 +136,11 @@ def checkin(booking_id):
     user_id = session['user_id']
     booking = Booking.query.get_or_404(booking_id)
     
-    # Verify booking belongs to user
-    if booking.user_id != user_id:
-        flash('Unauthorized access.', 'danger')
-        return redirect(url_for('user.dashboard'))
-    
-    if booking.status != 'approved':
-        flash('Only approved bookings can be checked in.', 'warning')
-        return redirect(url_for('user.dashboard'))
-    
-    # Check if room still has available beds
-    room = booking.room
-    if room.get_actual_available_beds() <= 0:
-        flash('Room is now full. Cannot check in.', 'danger')
-        return redirect(url_for('user.dashboard'))
-    
-    booking.status = 'checked_in'
-    booking.checkin_time = get_ist_now()
-    booking.updated_at = get_ist_now()
-    
-    # Update room available beds
-    room.update_available_beds()
-    
     try:
-        db.session.commit()
-        
-        # Log action
-        log = Log(user_id=user_id, action='check_in', 
-                 details=f'User checked in to room {room.room_no}')
-        db.session.add(log)
-        db.session.commit()
-        
+        transitions.check_in(booking, user_id)
         flash('Check-in successful!', 'success')
+    except TransitionError as e:
+        flash(e.message, e.category)
     except Exception as e:
         db.session.rollback()
         flash('An error occurred. Please try again.', 'danger')
@@ -208,36 +153,13 @@ def checkout(booking_id):
     user_id = session['user_id']
     booking = Booking.query.get_or_404(booking_id)
     
-    # Verify booking belongs to user
-    if booking.user_id != user_id:
-        flash('Unauthorized access.', 'danger')
-        return redirect(url_for('user.dashboard'))
-    
-    if booking.status != 'checked_in':
-        flash('Only checked-in bookings can be checked out.', 'warning')
-        return redirect(url_for('user.dashboard'))
-    
-    booking.status = 'checked_out'
-    booking.checkout_time = get_ist_now()
-    booking.updated_at = get_ist_now()
-    
-    # Update room available beds (increase available beds)
-    room = booking.room
-    room.update_available_beds()
-    
     try:
-        db.session.commit()
-        
-        # Log action
-        log = Log(user_id=user_id, action='check_out', 
-                 details=f'User checked out from room {room.room_no}')
-        db.session.add(log)
-        db.session.commit()
-        
+        transitions.check_out(booking, user_id)
         flash('Check-out successful!', 'success')
+    except TransitionError as e:
+        flash(e.message, e.category)
     except Exception as e:
         db.session.rollback()
         flash('An error occurred. Please try again.', 'danger')
     
     return redirect(url_for('user.dashboard'))
-
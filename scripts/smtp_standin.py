@@ -0,0 +1,129 @@
+"""
+Local SMTP stand-in for development and tests.
+Accepts mail on localhost without TLS, accepts any AUTH credentials and
+keeps the delivered messages in memory (or prints them when run directly),
+so the email outbox and transport can be exercised without Gmail.
+
+Point the app at it with:
+    MAIL_SERVER=localhost MAIL_PORT=1025 MAIL_USE_TLS=false
+Run with: python -m scripts.smtp_standin [port]
+"""
+
+import socketserver
+import sys
+import threading
+import time
+from email import message_from_bytes
+
+class SMTPHandler(socketserver.StreamRequestHandler):
+    """Speaks just enough SMTP for smtplib: EHLO/HELO, AUTH, MAIL, RCPT, DATA, RSET, NOOP, QUIT"""
+
+    def reply(self, line):
+        if self.server.latency:
+            time.sleep(self.server.latency)
+        self.wfile.write(f'{line}\r\n'.encode())
+
+    def handle(self):
+        server = self.server
+        server.connections += 1
+        self.reply('220 localhost SMTP stand-in ready')
+        sender, recipients = None, []
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return
+            command = line.decode(errors='replace').strip()
+            verb = command.split(' ', 1)[0].upper()
+
+            if verb in ('EHLO', 'HELO'):
+                if server.latency:
+                    time.sleep(server.latency)
+                self.wfile.write(b'250-localhost\r\n250-AUTH PLAIN LOGIN\r\n250 8BITMIME\r\n')
+            elif verb == 'AUTH':
+                server.logins += 1
+                if command.upper().startswith('AUTH LOGIN'):
+                    parts = command.split()
+                    if len(parts) < 3:
+                        self.reply('334 VXNlcm5hbWU6')
+                        self.rfile.readline()
+                    self.reply('334 UGFzc3dvcmQ6')
+                    self.rfile.readline()
+                self.reply('235 Authentication successful')
+            elif verb == 'MAIL':
+                if server.should_reject():
+                    self.reply('451 Temporary failure, try again later')
+                    continue
+                sender, recipients = command[10:].strip('<> '), []
+                self.reply('250 OK')
+            elif verb == 'RCPT':
+                recipients.append(command[8:].strip('<> '))
+                self.reply('250 OK')
+            elif verb == 'DATA':
+                self.reply('354 End data with <CR><LF>.<CR><LF>')
+                data = []
+                while True:
+                    chunk = self.rfile.readline()
+                    if chunk in (b'.\r\n', b'.\n', b''):
+                        break
+                    data.append(chunk[1:] if chunk.startswith(b'..') else chunk)
+                server.deliver(sender, recipients, b''.join(data))
+                sender, recipients = None, []
+                self.reply('250 OK: queued')
+            elif verb == 'RSET':
+                sender, recipients = None, []
+                self.reply('250 OK')
+            elif verb == 'NOOP':
+                self.reply('250 OK')
+            elif verb == 'QUIT':
+                self.reply('221 Bye')
+                return
+            else:
+                self.reply('502 Command not implemented')
+
+class SMTPStandIn(socketserver.ThreadingTCPServer):
+    """Threaded SMTP server that records every message it receives"""
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, host='localhost', port=0, fail_first=0, echo=False, latency=0):
+        super().__init__((host, port), SMTPHandler)
+        self.messages = []
+        self.connections = 0
+        self.logins = 0
+        self.fail_first = fail_first  # Reject this many MAIL commands with a 451 first
+        self.echo = echo
+        self.latency = latency  # Seconds added to every reply, to mimic a remote server's round trip
+        self._lock = threading.Lock()
+
+    @property
+    def port(self):
+        return self.server_address[1]
+
+    def should_reject(self):
+        with self._lock:
+            if self.fail_first > 0:
+                self.fail_first -= 1
+                return True
+            return False
+
+    def deliver(self, sender, recipients, data):
+        message = message_from_bytes(data)
+        with self._lock:
+            self.messages.append((sender, recipients, message))
+        if self.echo:
+            print(f'📨 {sender} -> {", ".join(recipients)}: {message["Subject"]}')
+
+    def start(self):
+        """Serve in a background thread and return self"""
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+if __name__ == '__main__':
+    port = int(sys.argv[1]) if len(sys.argv) > 1 else 1025
+    server = SMTPStandIn(port=port, echo=True)
+    print(f'SMTP stand-in listening on localhost:{server.port} (Ctrl+C to stop)')
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
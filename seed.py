@@ -0,0 +1,27 @@
+"""
+Data every deployment starts with, created by `flask seed` after `flask init-db`.
+Safe to run again, and from several processes at once: rows that already
+exist are left alone.
+"""
+
+from sqlalchemy.exc import IntegrityError
+from models import db, User, get_ist_now
+
+DEFAULT_ADMIN_EMAIL = 'admin@ignitron.com'
+DEFAULT_ADMIN_PASSWORD = 'admin123'
+
+def create_default_admin(email=DEFAULT_ADMIN_EMAIL, password=DEFAULT_ADMIN_PASSWORD):
+    """Create the admin account if it doesn't exist; True if it was created"""
+    if User.query.filter_by(email=email).first():
+        return False
+    admin = User(name='Admin', email=email, phone='0000000000', role='admin')
+    admin.set_password(password)
+    admin.created_at = get_ist_now()
+    db.session.add(admin)
+    try:
+        db.session.commit()
+    except IntegrityError:
+        # Another process created it first
+        db.session.rollback()
+        return False
+    return True
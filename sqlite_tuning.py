@@ -0,0 +1,82 @@
+"""
+SQLite connection tuning and periodic maintenance.
+Stock SQLite uses a rollback journal, so a writer blocks every reader and
+each commit waits for several fsyncs. Every new pooled connection is switched
+to WAL with synchronous=NORMAL instead: readers keep reading while one writer
+commits, and a commit only appends to the WAL. busy_timeout makes a writer
+wait for the lock rather than fail at once, and the page cache, memory-mapped
+reads and in-memory temp tables cut the I/O of the hot queries.
+
+WAL keeps growing while readers hold old snapshots, and the query planner
+only knows the table sizes it last analysed, so `flask db-maintenance`
+(run it from cron, e.g. hourly) refreshes the statistics and checkpoints the
+WAL back into the database file. Run it again after a large import:
+statistics gathered while the tables were nearly empty tell the planner that
+scanning them is cheaper than using their indexes.
+"""
+
+import time
+from flask import current_app
+from sqlalchemy import event, text
+from models import db
+
+def connection_pragmas(config):
+    """The (pragma, value) pairs set on every new connection, in order; none if SQLITE_TUNING is off"""
+    if not config.get('SQLITE_TUNING', True):
+        return []
+    return [
+        ('busy_timeout', int(config.get('SQLITE_BUSY_TIMEOUT_MS', 5000))),  # First, so switching to WAL waits too
+        ('journal_mode', config.get('SQLITE_JOURNAL_MODE', 'WAL')),
+        ('synchronous', config.get('SQLITE_SYNCHRONOUS', 'NORMAL')),
+        ('cache_size', -int(config.get('SQLITE_CACHE_SIZE_KB', 32768))),  # Negative means KiB rather than pages
+        ('mmap_size', int(config.get('SQLITE_MMAP_SIZE_MB', 256)) * 1024 * 1024),
+        ('temp_store', config.get('SQLITE_TEMP_STORE', 'MEMORY')),
+    ]
+
+def init_sqlite_tuning(app):
+    """Apply the configured pragmas to every connection the app's SQLite engines open"""
+    pragmas = connection_pragmas(app.config)
+    if not pragmas:
+        return
+    statements = [f'PRAGMA {name} = {value}' for name, value in pragmas]
+
+    def tune(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for statement in statements:
+                cursor.execute(statement)
+        finally:
+            cursor.close()
+
+    with app.app_context():
+        engines = list(db.engines.values())  # Built by db.init_app; nothing is connected yet
+    for engine in engines:
+        if engine.dialect.name == 'sqlite':
+            event.listen(engine, 'connect', tune)
+
+def current_pragmas(names=('journal_mode', 'synchronous', 'busy_timeout', 'cache_size', 'mmap_size', 'temp_store')):
+    """{pragma: value} as seen by a pooled connection"""
+    return {name: db.session.execute(text(f'PRAGMA {name}')).scalar() for name in names}
+
+def run_maintenance(full_analyze=False, checkpoint='TRUNCATE'):
+    """
+    Refresh the planner statistics and checkpoint the WAL, returning
+    [(step, seconds, result)]. ANALYZE samples SQLITE_ANALYSIS_LIMIT rows per
+    index unless full_analyze is set.
+    """
+    limit = 0 if full_analyze else int(current_app.config.get('SQLITE_ANALYSIS_LIMIT', 1000))
+    steps = [
+        ('analyze', [f'PRAGMA analysis_limit = {limit}', 'ANALYZE']),
+        ('optimize', ['PRAGMA optimize']),
+        ('checkpoint', [f'PRAGMA wal_checkpoint({checkpoint})']),
+    ]
+    done = []
+    # Outside a transaction: a checkpoint cannot run inside one
+    with db.engine.connect().execution_options(isolation_level='AUTOCOMMIT') as connection:
+        for step, statements in steps:
+            started = time.perf_counter()
+            for statement in statements:
+                result = connection.execute(text(statement))
+            row = result.first() if result.returns_rows else None
+            done.append((step, time.perf_counter() - started, tuple(row) if row else None))
+    return done
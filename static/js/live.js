@@ -0,0 +1,33 @@
+// Live dashboard updates from the Server-Sent Events feed (see live_feed.py)
+
+function bookingStatusClass(status) {
+    return { pending: 'warning', approved: 'success', checked_in: 'primary', rejected: 'danger' }[status] || 'secondary';
+}
+
+function bookingStatusLabel(status) {
+    return status.replace('_', ' ').replace(/\b\w/g, letter => letter.toUpperCase());
+}
+
+function addToCounter(id, delta) {
+    const counter = document.getElementById(id);
+    if (counter && delta) {
+        counter.textContent = parseInt(counter.textContent, 10) + delta;
+    }
+}
+
+// handlers maps event names ('bookings', 'rooms') to functions taking the parsed event data
+function openLiveFeed(url, handlers) {
+    if (!window.EventSource) {
+        return null;
+    }
+    const source = new EventSource(url);
+    Object.entries(handlers).forEach(([event, handle]) => {
+        source.addEventListener(event, message => handle(JSON.parse(message.data)));
+    });
+    // The server dropped events this screen could not keep up with
+    source.addEventListener('reload', () => {
+        source.close();
+        location.reload();
+    });
+    return source;
+}
@@ -0,0 +1,251 @@
+"""
+Synthetic fest-scale data for load and scale testing.
+`flask generate-data` fills a fresh database (after init-db and seed) with
+participants, rooms, bookings in every state and an audit log shaped like a
+real fest: most participants stay once and check out, some were rejected
+first, a few still wait for approval, approved and checked-in bookings never
+exceed a room's beds, and a minority of busy participants produce most of
+the logins, mostly in the daytime. The same seed, sizes and end time always
+produce the same rows, so every performance change is measured on the same
+data.
+
+Rows go in with executemany INSERTs, one chunk per transaction, in creation
+order so ids follow time as they would in production. The logs are generated
+one hour of the timeline at a time, so memory stays flat at millions of rows,
+and their indexes are rebuilt once at the end rather than updated per row.
+"""
+
+import bisect
+import random
+import time
+from datetime import timedelta
+from itertools import accumulate
+from models import db, User, Room, Booking, Log, get_ist_now
+from passwords import hash_password
+from migrations import create_missing_indexes, recount_room_occupancy
+
+INSERT_CHUNK = 20000  # Rows per INSERT and transaction
+
+HOUR = 3600
+DAY = 24 * HOUR
+
+FIRST_NAMES = ['Aarav', 'Aditi', 'Akash', 'Ananya', 'Arjun', 'Bhavana', 'Chetan', 'Deepa', 'Divya', 'Ganesh',
+               'Harsha', 'Ishaan', 'Kavya', 'Kiran', 'Lakshmi', 'Manoj', 'Meera', 'Naveen', 'Neha', 'Pooja',
+               'Pranav', 'Priya', 'Rahul', 'Rohan', 'Sahana', 'Sanjay', 'Shreya', 'Sneha', 'Varun', 'Vinay']
+LAST_NAMES = ['Acharya', 'Bhat', 'Desai', 'Gadgimath', 'Hegde', 'Iyer', 'Joshi', 'Kamath', 'Kulkarni', 'Menon',
+              'Nair', 'Patil', 'Rao', 'Reddy', 'Shetty', 'Sharma', 'Shenoy', 'Singh', 'Naik', 'Pai']
+BLOCKS = 'ABCDEFGH'
+ROOMS_PER_FLOOR = 20
+FLOORS_PER_BLOCK = 5
+CAPACITY_WEIGHTS = {2: 2, 3: 2, 4: 5, 6: 1}
+
+# Share of all bookings in each active state, capped by the participants and beds there are
+ACTIVE_SHARES = {'pending': 0.08, 'approved': 0.06, 'checked_in': 0.10}
+MAX_ALLOCATED_SHARE = {'approved': 0.30, 'checked_in': 0.55}  # Of all beds
+REJECTED_SHARE = 0.25  # Of the finished bookings; the others checked out
+
+# Everyday log traffic besides registrations and the booking lifecycle
+ACTIVITY = {'login': (55, 'User logged in'), 'logout': (40, 'User logged out'),
+            'profile_updated': (5, 'User updated profile')}
+# Relative activity per hour of the day (IST), midnight first
+HOURLY_WEIGHTS = [2, 1, 1, 1, 1, 2, 4, 7, 10, 10, 9, 8, 8, 9, 10, 10, 9, 8, 8, 7, 6, 5, 4, 3]
+
+def has_data():
+    """True if the database already has rooms, bookings or participants"""
+    return any(db.session.query(query.exists()).scalar() for query in (
+        db.session.query(Room.id), db.session.query(Booking.id),
+        db.session.query(User.id).filter(User.role == 'user'),
+    ))
+
+def insert_chunked(model, rows):
+    # A Core insert on the table skips the ORM's per-row bookkeeping of db.insert(model)
+    for start in range(0, len(rows), INSERT_CHUNK):
+        db.session.execute(model.__table__.insert(), rows[start:start + INSERT_CHUNK])
+        db.session.commit()
+
+def room_number(n):
+    block, rest = divmod(n, ROOMS_PER_FLOOR * FLOORS_PER_BLOCK)
+    floor, number = divmod(rest, ROOMS_PER_FLOOR)
+    name = BLOCKS[block % len(BLOCKS)] + (str(block // len(BLOCKS)) if block >= len(BLOCKS) else '')
+    return name, floor + 1, f'{name}-{floor + 1}{number + 1:02d}'
+
+def booking_counts(bookings, users, beds):
+    """How many bookings to put in each status"""
+    counts = {}
+    counts['checked_in'] = min(round(bookings * ACTIVE_SHARES['checked_in']),
+                               int(beds * MAX_ALLOCATED_SHARE['checked_in']), users)
+    counts['approved'] = min(round(bookings * ACTIVE_SHARES['approved']),
+                             int(beds * MAX_ALLOCATED_SHARE['approved']), users - counts['checked_in'])
+    counts['pending'] = min(round(bookings * ACTIVE_SHARES['pending']),
+                            users - counts['checked_in'] - counts['approved'])
+    finished = max(0, bookings - sum(counts.values()))
+    counts['rejected'] = round(finished * REJECTED_SHARE)
+    counts['checked_out'] = finished - counts['rejected']
+    return counts
+
+def generate(users, rooms, bookings, logs, seed=2025, days=14, end=None, password='password', echo=None):
+    """
+    Fill an empty database with synthetic data ending at end (default now) and
+    spanning days; returns {table: rows inserted} and the seconds per table.
+    Every participant can log in with password.
+    """
+    echo = echo or (lambda message: None)
+    rng = random.Random(seed)
+    end = end or get_ist_now()
+    span = days * DAY
+    start = end - timedelta(seconds=span)
+    admin = User.query.filter_by(role='admin').order_by(User.id).first()
+
+    def at(offset):
+        return start + timedelta(seconds=min(offset, span))
+
+    timings = {}
+    started = time.perf_counter()
+
+    # Participants register during the week before the fest; one shared hash keeps this fast
+    password_hash = hash_password(password)
+    people = []
+    for n in range(users):
+        first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+        people.append((-rng.uniform(0, 7 * DAY), f'{first} {last}', f'{first}.{last}{n}@example.com'.lower(),
+                       f'{rng.choice("6789")}{rng.randrange(10 ** 9):09d}'))
+    people.sort()
+    insert_chunked(User, [
+        {'name': name, 'email': email, 'phone': phone, 'password_hash': password_hash, 'role': 'user',
+         'created_at': at(offset)} for offset, name, email, phone in people
+    ])
+    user_ids = [user_id for user_id, in db.session.query(User.id).filter(User.role == 'user').order_by(User.id)]
+    names = [name for _, name, _, _ in people]
+    timings['users'] = time.perf_counter() - started
+    echo(f'✓ {users} participants in {timings["users"]:.1f}s')
+
+    # Rooms are set up before registration opens
+    started = time.perf_counter()
+    capacities = rng.choices(list(CAPACITY_WEIGHTS), weights=list(CAPACITY_WEIGHTS.values()), k=rooms)
+    room_rows = []
+    for n, capacity in enumerate(capacities):
+        block, floor, room_no = room_number(n)
+        room_rows.append({'room_no': room_no, 'capacity': capacity, 'available_beds': capacity,
+                          'occupied_beds': 0, 'allocated_beds': 0, 'description': f'Block {block}, floor {floor}',
+                          'created_at': at(-rng.uniform(7 * DAY, 10 * DAY))})
+    insert_chunked(Room, room_rows)
+    room_ids = [room_id for room_id, in db.session.query(Room.id).order_by(Room.id)]
+    room_nos = [row['room_no'] for row in room_rows]
+    timings['rooms'] = time.perf_counter() - started
+    echo(f'✓ {rooms} rooms with {sum(capacities)} beds in {timings["rooms"]:.1f}s')
+
+    # Bookings: every participant holds at most one active booking, and no room
+    # has more approved and checked-in bookings than beds
+    started = time.perf_counter()
+    counts = booking_counts(bookings, users, sum(capacities))
+    active = iter(rng.sample(range(users), counts['pending'] + counts['approved'] + counts['checked_in']))
+    beds = [n for n, capacity in enumerate(capacities) for _ in range(capacity)]
+    rng.shuffle(beds)
+    beds = iter(beds)
+    cum_capacity = list(accumulate(capacities))
+
+    def any_room():
+        return bisect.bisect_right(cum_capacity, rng.random() * cum_capacity[-1])
+
+    def later(offset, low, high):
+        return min(offset + rng.uniform(low, high), span)
+
+    planned = []  # (created, user, room, status, checkin, checkout, updated, decided)
+    for status, count in counts.items():
+        for _ in range(count):
+            if status == 'pending':
+                user, room = next(active), any_room()
+                created = rng.uniform(max(0, span - 2 * DAY), span)
+                planned.append((created, user, room, status, None, None, created, None))
+            elif status in ('approved', 'checked_in'):
+                user, room = next(active), next(beds)
+                created = rng.uniform(max(0, span - 4 * DAY), span)
+                decided = later(created, 600, 12 * HOUR)
+                checkin = later(decided, 1800, DAY) if status == 'checked_in' else None
+                planned.append((created, user, room, status, checkin, None, checkin or decided, decided))
+            elif status == 'rejected':
+                created = rng.uniform(0, span)
+                decided = later(created, 600, 12 * HOUR)
+                planned.append((created, rng.randrange(users), any_room(), status, None, None, decided, decided))
+            else:
+                created = rng.uniform(0, span * 0.8)
+                decided = later(created, 600, 12 * HOUR)
+                checkin = later(decided, 1800, DAY)
+                checkout = later(checkin, DAY, 3 * DAY)
+                planned.append((created, rng.randrange(users), any_room(), status, checkin, checkout, checkout, decided))
+    planned.sort(key=lambda booking: booking[0])
+    insert_chunked(Booking, [
+        {'user_id': user_ids[user], 'room_id': room_ids[room], 'status': status,
+         'checkin_time': at(checkin) if checkin is not None else None,
+         'checkout_time': at(checkout) if checkout is not None else None,
+         'created_at': at(created), 'updated_at': at(updated)}
+        for created, user, room, status, checkin, checkout, updated, decided in planned
+    ])
+    booking_ids = [booking_id for booking_id, in db.session.query(Booking.id).order_by(Booking.id)]
+    recount_room_occupancy()
+    db.session.commit()
+    timings['bookings'] = time.perf_counter() - started
+    echo(f'✓ {len(planned)} bookings ({", ".join(f"{n} {status}" for status, n in counts.items())}) '
+         f'in {timings["bookings"]:.1f}s')
+
+    # The log entries the registrations and booking transitions would have written
+    started = time.perf_counter()
+    lifecycle = [(offset, user_ids[n], 'registration', f'New user registered: {names[n]}')
+                 for n, (offset, _, _, _) in enumerate(people)]
+    for booking_id, (created, user, room, status, checkin, checkout, updated, decided) in zip(booking_ids, planned):
+        lifecycle.append((created, user_ids[user], 'booking_requested', f'User requested booking for room {room_nos[room]}'))
+        if status == 'rejected':
+            lifecycle.append((decided, admin.id, 'booking_rejected', f'Admin rejected booking #{booking_id} for user {names[user]}'))
+        elif decided is not None:
+            lifecycle.append((decided, admin.id, 'booking_approved', f'Admin approved booking #{booking_id} for user {names[user]}'))
+        if checkin is not None:
+            lifecycle.append((checkin, user_ids[user], 'check_in', f'User checked in to room {room_nos[room]}'))
+        if checkout is not None:
+            lifecycle.append((checkout, user_ids[user], 'check_out', f'User checked out from room {room_nos[room]}'))
+    lifecycle.sort()
+
+    # Building the logs indexes once at the end is much faster than updating them
+    # row by row; if this stops halfway, `flask init-db` rebuilds them
+    for index in Log.__table__.indexes:
+        index.drop(db.session.connection())
+    db.session.commit()
+
+    # Everyday traffic fills the rest, spread over the hours of the fest by time of day
+    activity = [rng.paretovariate(1.2) for _ in range(users)]
+    cum_activity = list(accumulate(activity))
+    actions = list(ACTIVITY)
+    cum_actions = list(accumulate(weight for weight, _ in ACTIVITY.values()))
+    hours = -(-span // HOUR)
+    hour_weights = [HOURLY_WEIGHTS[(start.hour + h) % 24] * (min(span, (h + 1) * HOUR) - h * HOUR) for h in range(hours)]
+    cum_hours = list(accumulate(hour_weights))
+    traffic = max(0, logs - len(lifecycle))
+
+    inserted = 0
+    pending_rows = []
+    next_lifecycle = 0
+    for h in range(hours):
+        hour_start, hour_end = h * HOUR, min(span, (h + 1) * HOUR)
+        count = round(traffic * cum_hours[h] / cum_hours[-1]) - (round(traffic * cum_hours[h - 1] / cum_hours[-1]) if h else 0)
+        entries = []
+        for _ in range(count):
+            action = actions[bisect.bisect_right(cum_actions, rng.random() * cum_actions[-1])]
+            user = bisect.bisect_right(cum_activity, rng.random() * cum_activity[-1])
+            entries.append((rng.uniform(hour_start, hour_end), user_ids[user], action, ACTIVITY[action][1]))
+        last_hour = h == hours - 1
+        while next_lifecycle < len(lifecycle) and (last_hour or lifecycle[next_lifecycle][0] < hour_end):
+            entries.append(lifecycle[next_lifecycle])
+            next_lifecycle += 1
+        entries.sort()
+        pending_rows.extend({'user_id': user_id, 'action': action, 'details': details, 'timestamp': at(offset)}
+                            for offset, user_id, action, details in entries)
+        if len(pending_rows) >= INSERT_CHUNK or last_hour:
+            insert_chunked(Log, pending_rows)
+            inserted += len(pending_rows)
+            pending_rows = []
+    create_missing_indexes()
+    db.session.commit()
+    timings['logs'] = time.perf_counter() - started
+    echo(f'✓ {inserted} log entries in {timings["logs"]:.1f}s')
+
+    return {'users': users, 'rooms': rooms, 'bookings': len(planned), 'logs': inserted,
+            'statuses': counts, 'seconds': timings}
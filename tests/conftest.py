@@ -0,0 +1,138 @@
+"""
+Shared fixtures for the test suite.
+Every test gets its own app on a scratch SQLite file with the schema and the
+default admin (the same init_database() the development server runs), and
+helpers to seed rows in bulk, to act as a logged-in user and to record the
+SQL a request runs.
+"""
+
+import pytest
+from sqlalchemy import event
+from app import create_app, init_database
+from models import db, User, Room, Booking, get_ist_now
+from principal import principal_cache
+from routes.admin import log_stats_cache
+from seed import DEFAULT_ADMIN_EMAIL, DEFAULT_ADMIN_PASSWORD
+import dashboard_stats
+
+# Module-level caches outlive an app; each test starts with them empty
+CACHES = (principal_cache, log_stats_cache, dashboard_stats.stats_cache)
+
+def clear_caches():
+    for cache in CACHES:
+        cache.clear()
+
+@pytest.fixture
+def app_config():
+    """Extra config for the app; override it in a test module to change settings before create_app()"""
+    return {}
+
+@pytest.fixture
+def app(tmp_path, app_config):
+    clear_caches()
+    app = create_app({
+        'SQLALCHEMY_DATABASE_URI': f'sqlite:///{tmp_path / "test.db"}',
+        'MAIL_PASSWORD': '',
+        'LOG_ARCHIVE_DIR': str(tmp_path / 'log_archive'),
+        **app_config,
+    })
+    init_database(app)
+    yield app
+    clear_caches()
+    password_pool = app.extensions.pop('password_pool', None)
+    if password_pool is not None:
+        password_pool.shutdown()
+    smtp_pool = app.extensions.pop('smtp_pool', None)
+    if smtp_pool is not None:
+        smtp_pool.close()
+    feed = app.extensions.pop('live_feed', None)
+    if feed is not None:
+        feed.close()
+    with app.app_context():
+        db.session.remove()
+        for engine in db.engines.values():
+            engine.dispose()
+
+@pytest.fixture
+def admin_id(app):
+    with app.app_context():
+        return User.query.filter_by(email=DEFAULT_ADMIN_EMAIL).first().id
+
+@pytest.fixture
+def admin_client(app):
+    """A test client logged in through /login as the default admin"""
+    client = app.test_client()
+    client.post('/login', data={'email': DEFAULT_ADMIN_EMAIL, 'password': DEFAULT_ADMIN_PASSWORD})
+    return client
+
+@pytest.fixture
+def login_as(app):
+    """login_as(user_id, role) -> a test client whose session is already logged in"""
+    def login_as(user_id, role='user'):
+        client = app.test_client()
+        with client.session_transaction() as session:
+            session['user_id'] = user_id
+            session['user_role'] = role
+            session['user_name'] = 'x'
+        return client
+    return login_as
+
+@pytest.fixture
+def make_rooms(app):
+    """make_rooms(count, capacity=4, prefix='R', **columns) -> room ids, in room_no order"""
+    def make_rooms(count, capacity=4, prefix='R', **columns):
+        now = get_ist_now()
+        with app.app_context():
+            db.session.execute(db.insert(Room), [
+                {'room_no': f'{prefix}{n:04d}', 'capacity': capacity, 'available_beds': capacity,
+                 'occupied_beds': 0, 'allocated_beds': 0, 'created_at': now, **columns} for n in range(count)
+            ])
+            db.session.commit()
+            return [room_id for room_id, in db.session.query(Room.id).filter(
+                Room.room_no.like(f'{prefix}%')).order_by(Room.room_no)]
+    return make_rooms
+
+@pytest.fixture
+def make_users(app):
+    """make_users(count, prefix='participant', password_hash='unused') -> user ids, in creation order"""
+    def make_users(count, prefix='participant', password_hash='unused'):
+        now = get_ist_now()
+        with app.app_context():
+            db.session.execute(db.insert(User), [
+                {'name': f'{prefix.title()} {n}', 'email': f'{prefix}{n}@example.com', 'phone': '0000000000',
+                 'password_hash': password_hash, 'role': 'user', 'created_at': now} for n in range(count)
+            ])
+            db.session.commit()
+            return [user_id for user_id, in db.session.query(User.id).filter(
+                User.email.like(f'{prefix}%@example.com')).order_by(User.id)]
+    return make_users
+
+@pytest.fixture
+def make_bookings(app):
+    """make_bookings([(user_id, room_id, status)]) -> booking ids; room counters are left to the caller"""
+    def make_bookings(rows):
+        now = get_ist_now()
+        with app.app_context():
+            first = (db.session.query(db.func.max(Booking.id)).scalar() or 0) + 1
+            db.session.execute(db.insert(Booking), [
+                {'user_id': user_id, 'room_id': room_id, 'status': status, 'created_at': now, 'updated_at': now}
+                for user_id, room_id, status in rows
+            ])
+            db.session.commit()
+            return [booking_id for booking_id, in db.session.query(Booking.id).filter(
+                Booking.id >= first).order_by(Booking.id)]
+    return make_bookings
+
+@pytest.fixture
+def statements(app):
+    """The SQL statements run while the test runs; clear() it before the part being measured"""
+    recorded = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        recorded.append(statement)
+
+    with app.app_context():
+        engine = db.engine
+    event.listen(engine, 'before_cursor_execute', record)
+    yield recorded
+    event.remove(engine, 'before_cursor_execute', record)
@@ -0,0 +1,58 @@
+"""
+Bed admission under concurrency: many pending bookings for one small room are
+approved, checked in and checked out from a thread pool through the real
+routes, every request sent several times, and the room is never overbooked
+and its counters match the bookings table after each phase.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+from models import db, Room, Booking
+
+BOOKINGS = 60
+CAPACITY = 4
+THREADS = 8
+DUPLICATES = 3  # Every request is sent this many times concurrently
+
+@pytest.fixture
+def room(make_rooms, make_users, make_bookings):
+    room_id, = make_rooms(1, capacity=CAPACITY, prefix='STRESS')
+    make_bookings([(user_id, room_id, 'pending') for user_id in make_users(BOOKINGS, prefix='stress')])
+    return room_id
+
+def fire(login_as, requests):
+    """Send (user_id, role, path) requests concurrently, each DUPLICATES times; returns the status codes"""
+    work = [request for request in requests for _ in range(DUPLICATES)]
+    with ThreadPoolExecutor(max_workers=THREADS) as pool:
+        return list(pool.map(lambda request: login_as(request[0], request[1]).post(request[2]).status_code, work))
+
+def assert_counters_match(room_id):
+    db.session.expire_all()
+    room = db.session.get(Room, room_id)
+    counts = {status: Booking.query.filter_by(room_id=room_id, status=status).count()
+              for status in ('approved', 'checked_in')}
+    allocated = counts['approved'] + counts['checked_in']
+    assert allocated <= CAPACITY
+    assert room.allocated_beds == allocated
+    assert room.occupied_beds == counts['checked_in']
+    assert room.available_beds == CAPACITY - room.occupied_beds
+
+def test_concurrent_admission(app, room, admin_id, login_as):
+    with app.app_context():
+        pending = [booking.id for booking in Booking.query.order_by(Booking.id)]
+    statuses = fire(login_as, [(admin_id, 'admin', f'/admin/bookings/approve/{booking_id}') for booking_id in pending])
+
+    with app.app_context():
+        assert_counters_match(room)
+        approved = [(booking.id, booking.user_id) for booking in Booking.query.filter_by(room_id=room, status='approved')]
+    assert len(approved) == CAPACITY
+
+    statuses += fire(login_as, [(user_id, 'user', f'/user/bookings/checkin/{booking_id}') for booking_id, user_id in approved])
+    with app.app_context():
+        assert_counters_match(room)
+
+    statuses += fire(login_as, [(user_id, 'user', f'/user/bookings/checkout/{booking_id}') for booking_id, user_id in approved])
+    with app.app_context():
+        assert_counters_match(room)
+        assert Booking.query.filter_by(room_id=room, status='checked_out').count() == CAPACITY
+    assert not [status for status in statuses if status >= 500]
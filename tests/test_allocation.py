@@ -0,0 +1,64 @@
+"""
+Allocating pending bookings from the admin page: the POST applies the plan
+the admin previewed, and a plan that changed since (a new request, a room
+filled or edited) is shown again instead of being applied.
+"""
+
+import re
+import pytest
+from models import db, Room, Booking
+import transitions
+
+@pytest.fixture
+def pending(make_rooms, make_users, make_bookings):
+    room_ids = make_rooms(3, capacity=2)
+    user_ids = make_users(5)
+    booking_ids = make_bookings([(user_id, room_ids[0], 'pending') for user_id in user_ids[:4]])
+    return room_ids, user_ids, booking_ids
+
+def preview(client):
+    html = client.get('/admin/bookings/allocate').get_data(as_text=True)
+    return re.search(r'name="plan" value="(\w+)"', html).group(1)
+
+def statuses(app):
+    with app.app_context():
+        return dict(db.session.query(Booking.id, Booking.status))
+
+def test_previewed_plan_is_applied(app, admin_client, pending):
+    _, _, booking_ids = pending
+    response = admin_client.post('/admin/bookings/allocate', data={'groups': '1', 'plan': preview(admin_client)})
+    assert response.status_code == 302 and '/admin/bookings' in response.location
+    assert set(statuses(app).values()) == {'approved'}
+    assert set(statuses(app)) == set(booking_ids)
+
+def test_new_request_makes_plan_stale(app, admin_client, pending):
+    room_ids, user_ids, booking_ids = pending
+    fingerprint = preview(admin_client)
+    with app.test_request_context():
+        transitions.request_booking(user_ids[4], db.session.get(Room, room_ids[1]))
+
+    response = admin_client.post('/admin/bookings/allocate', data={'groups': '1', 'plan': fingerprint})
+    assert 'allocate' in response.location
+    assert set(statuses(app).values()) == {'pending'}
+
+    # The refreshed preview includes the new booking and can be applied
+    admin_client.post('/admin/bookings/allocate', data={'groups': '1', 'plan': preview(admin_client)})
+    assert set(statuses(app).values()) == {'approved'}
+    assert len(statuses(app)) == len(booking_ids) + 1
+
+def test_room_change_makes_plan_stale(app, admin_client, admin_id, pending):
+    room_ids, _, _ = pending
+    fingerprint = preview(admin_client)
+    with app.test_request_context():
+        room = db.session.get(Room, room_ids[2])
+        transitions.edit_room(room, admin_id, room.room_no, 8, None)
+
+    admin_client.post('/admin/bookings/allocate', data={'groups': '1', 'plan': fingerprint})
+    assert set(statuses(app).values()) == {'pending'}
+
+def test_apply_loads_only_planned_bookings(app, admin_client, pending, statements):
+    fingerprint = preview(admin_client)
+    statements.clear()
+    admin_client.post('/admin/bookings/allocate', data={'groups': '1', 'plan': fingerprint})
+    lookups = [s for s in statements if 'JOIN users' in s and 'bookings.status = ?' in s]
+    assert lookups and all('bookings.id IN' in s for s in lookups)
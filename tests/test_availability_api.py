@@ -0,0 +1,74 @@
+"""
+The JSON availability API and its conditional GETs: the responses match the
+room counters, an unchanged poll is a 304 from one query on the version row,
+and only transitions that change availability change the ETag.
+"""
+
+import pytest
+from models import db, Room, Booking
+import transitions
+
+ROOMS = 20
+
+@pytest.fixture
+def seeded(app, make_rooms, make_users):
+    room_ids = make_rooms(ROOMS, description='Block A')
+    user_ids = make_users(2)
+    return room_ids[0], user_ids
+
+def test_responses_match_room_counters(app, seeded):
+    client = app.test_client()
+    rooms = client.get('/api/rooms')
+    etag = rooms.headers.get('ETag')
+    assert rooms.status_code == 200
+    assert len(rooms.json['rooms']) == ROOMS
+    assert etag and not etag.startswith('W/')
+
+    stats = client.get('/api/stats').json
+    assert (stats['rooms'], stats['capacity'], stats['free_beds']) == (ROOMS, ROOMS * 4, ROOMS * 4)
+    assert client.get('/api/rooms/999999').status_code == 404
+
+def test_unchanged_poll_is_one_query(app, seeded, statements):
+    room_id, _ = seeded
+    client = app.test_client()
+    for path in ('/api/rooms', f'/api/rooms/{room_id}', '/api/stats'):
+        etag = client.get(path).headers['ETag']
+        statements.clear()
+        response = client.get(path, headers={'If-None-Match': etag})
+        assert response.status_code == 304, path
+        assert not response.data
+        assert len(statements) == 1, statements
+        assert not [s for s in statements if 'FROM rooms' in s or 'FROM bookings' in s]
+
+def test_etag_follows_availability(app, seeded, admin_id):
+    room_id, user_ids = seeded
+    client = app.test_client()
+    etag = client.get('/api/rooms').headers['ETag']
+
+    def room():
+        return db.session.get(Room, room_id)
+
+    def booking(user_id):
+        return Booking.query.filter_by(user_id=user_id).order_by(Booking.id.desc()).first()
+
+    steps = [
+        ('request booking', lambda: transitions.request_booking(user_ids[0], room()), False),
+        ('approve booking', lambda: transitions.approve_booking(booking(user_ids[0]), admin_id), True),
+        ('check in', lambda: transitions.check_in(booking(user_ids[0]), user_ids[0]), True),
+        ('check out', lambda: transitions.check_out(booking(user_ids[0]), user_ids[0]), True),
+        ('request another', lambda: transitions.request_booking(user_ids[1], room()), False),
+        ('reject booking', lambda: transitions.reject_booking(booking(user_ids[1]), admin_id), False),
+        ('add room', lambda: transitions.add_room(admin_id, 'R9999', 2, 'New block'), True),
+        ('edit room', lambda: transitions.edit_room(room(), admin_id, 'R0000', 6, 'Renovated'), True),
+        ('delete room', lambda: transitions.delete_room(Room.query.filter_by(room_no='R9999').first(), admin_id), True),
+    ]
+    for label, change, expect_new in steps:
+        with app.test_request_context():
+            change()
+        response = client.get('/api/rooms', headers={'If-None-Match': etag})
+        assert (response.status_code == 200) == expect_new, label
+        if expect_new:
+            etag = response.headers['ETag']
+
+    detail = client.get(f'/api/rooms/{room_id}').json
+    assert (detail['capacity'], detail['description'], detail['free_beds']) == (6, 'Renovated', 6)
@@ -0,0 +1,54 @@
+"""
+Booking history ids: moved bookings keep their id, so the bookings table never
+hands one out again, even after the newest booking or its room is gone, and
+upgrading an older database rebuilds bookings with AUTOINCREMENT.
+"""
+
+from datetime import timedelta
+from sqlalchemy import inspect, text
+from models import db, Room, Booking, BookingHistory, get_ist_now
+from migrations import init_db
+import booking_history
+import transitions
+
+def book(user_id, room_id):
+    booking = Booking(user_id=user_id, room_id=room_id, status='pending')
+    db.session.add(booking)
+    db.session.commit()
+    return booking.id
+
+def test_moved_ids_are_never_reused(app, admin_id, make_rooms, make_users, make_bookings):
+    room_id, other_room_id = make_rooms(2)
+    user_ids = make_users(3)
+    booking_ids = make_bookings([(user_id, room_id, 'rejected') for user_id in user_ids])
+    with app.test_request_context():
+        moved = booking_history.move_finished_bookings(admin_id, before=get_ist_now() + timedelta(days=1))
+        assert moved == len(booking_ids)  # The newest booking moves too
+
+        transitions.delete_room(db.session.get(Room, room_id), admin_id)
+        assert BookingHistory.query.count() == len(booking_ids)  # History outlives its room
+
+        assert book(user_ids[0], other_room_id) > max(booking_ids)
+
+def test_upgrade_rebuilds_bookings_with_autoincrement(app, make_rooms, make_users, make_bookings):
+    room_id, = make_rooms(1)
+    user_id, = make_users(1)
+    with app.app_context():
+        # The bookings table as created before AUTOINCREMENT, with a moved booking past its last id
+        db.session.execute(text('DROP TABLE bookings'))
+        db.session.execute(text(
+            'CREATE TABLE bookings (id INTEGER NOT NULL PRIMARY KEY, user_id INTEGER NOT NULL, '
+            'room_id INTEGER NOT NULL, status VARCHAR(20) NOT NULL, checkin_time DATETIME, '
+            'checkout_time DATETIME, created_at DATETIME, updated_at DATETIME)'))
+        db.session.commit()
+    booking_ids = make_bookings([(user_id, room_id, 'pending'), (user_id, room_id, 'approved')])
+    with app.app_context():
+        db.session.add(BookingHistory(id=max(booking_ids) + 5, user_id=user_id, room_id=room_id, status='rejected'))
+        db.session.commit()
+
+        assert 'bookings.id AUTOINCREMENT' in init_db()
+        assert init_db() == []  # Only once
+        assert sorted(db.session.query(Booking.id)) == [(booking_id,) for booking_id in booking_ids]
+        indexes = {index['name'] for index in inspect(db.engine).get_indexes('bookings')}
+        assert indexes == {index.name for index in Booking.__table__.indexes}
+        assert book(user_id, room_id) == max(booking_ids) + 6
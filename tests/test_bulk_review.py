@@ -0,0 +1,49 @@
+"""
+Bulk booking review: one POST approves or rejects every selected pending
+booking, with a log per booking and an email queued only for approvals, and
+a batch that would overfill a room is refused as a whole.
+"""
+
+from models import db, Room, Booking, Log, EmailOutbox
+
+def statuses(app, booking_ids):
+    with app.app_context():
+        return [status for status, in db.session.query(Booking.status).filter(
+            Booking.id.in_(booking_ids)).order_by(Booking.id)]
+
+def test_bulk_approve(app, admin_client, make_rooms, make_users, make_bookings):
+    room_id, = make_rooms(1, capacity=4)
+    booking_ids = make_bookings([(user_id, room_id, 'pending') for user_id in make_users(3)])
+
+    response = admin_client.post('/admin/bookings/bulk', data={'action': 'approve', 'booking_ids': booking_ids},
+                                 follow_redirects=True)
+    assert b'3 bookings approved successfully! Email notifications queued.' in response.data
+    assert statuses(app, booking_ids) == ['approved'] * 3
+    with app.app_context():
+        assert db.session.get(Room, room_id).allocated_beds == 3
+        assert Log.query.filter_by(action='booking_approved').count() == 3
+        assert EmailOutbox.query.filter_by(kind='booking_approved').count() == 3
+
+def test_bulk_reject(app, admin_client, make_rooms, make_users, make_bookings):
+    room_id, = make_rooms(1)
+    booking_ids = make_bookings([(user_id, room_id, 'pending') for user_id in make_users(2)])
+
+    response = admin_client.post('/admin/bookings/bulk', data={'action': 'reject', 'scope': 'all'},
+                                 follow_redirects=True)
+    assert b'2 bookings rejected successfully!' in response.data
+    assert b'Email notifications queued' not in response.data
+    assert statuses(app, booking_ids) == ['rejected'] * 2
+    with app.app_context():
+        assert Log.query.filter_by(action='booking_rejected').count() == 2
+        assert EmailOutbox.query.count() == 0
+
+def test_bulk_approve_refuses_overfull_room(app, admin_client, make_rooms, make_users, make_bookings):
+    room_id, = make_rooms(1, capacity=1)
+    booking_ids = make_bookings([(user_id, room_id, 'pending') for user_id in make_users(2)])
+
+    response = admin_client.post('/admin/bookings/bulk', data={'action': 'approve', 'scope': 'room', 'room_id': room_id},
+                                 follow_redirects=True)
+    assert b'Not enough free beds' in response.data
+    assert statuses(app, booking_ids) == ['pending'] * 2
+    with app.app_context():
+        assert db.session.get(Room, room_id).allocated_beds == 0
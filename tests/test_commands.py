@@ -0,0 +1,33 @@
+"""
+Maintenance commands that log their changes as the admin stop with a hint to
+run `flask seed` when there is no admin account, instead of a traceback.
+"""
+
+import pytest
+from models import db, User
+
+@pytest.fixture
+def unseeded(app):
+    with app.app_context():
+        User.query.filter_by(role='admin').delete()
+        db.session.commit()
+    return app
+
+@pytest.mark.parametrize('args', [
+    ['allocate-rooms'],
+    ['import-rooms', 'ROOMS'],
+    ['import-participants', 'PARTICIPANTS'],
+    ['archive-logs'],
+    ['move-booking-history'],
+])
+def test_commands_ask_for_an_admin(unseeded, tmp_path, args):
+    rooms = tmp_path / 'rooms.csv'
+    rooms.write_text('room_no,capacity\nA1,4\n')
+    participants = tmp_path / 'participants.csv'
+    participants.write_text('name,email,phone,password\nAsha,asha@example.com,0000000000,secret123\n')
+    args = [{'ROOMS': str(rooms), 'PARTICIPANTS': str(participants)}.get(arg, arg) for arg in args]
+
+    result = unseeded.test_cli_runner().invoke(args=args)
+    assert result.exit_code == 1
+    assert 'Run flask seed first' in result.output
+    assert not isinstance(result.exception, AttributeError)
@@ -0,0 +1,60 @@
+"""
+The cached admin dashboard numbers: at most three queries cold and none
+warm, numbers and bookings filter counts that match the tables, and an
+approval that shows on the very next view rather than after the cache expires.
+"""
+
+import random
+import re
+import pytest
+from sqlalchemy import func
+from models import db, Booking
+import dashboard_stats
+
+STATUSES = ['pending', 'approved', 'rejected', 'checked_in', 'checked_out']
+COUNT = 300
+
+@pytest.fixture
+def expected(app, make_rooms, make_users, make_bookings):
+    rng = random.Random(2025)
+    room_ids = make_rooms(50, capacity=10 ** 6)
+    make_bookings([(user_id, rng.choice(room_ids), rng.choice(STATUSES)) for user_id in make_users(COUNT)])
+    with app.app_context():
+        return dict(db.session.query(Booking.status, func.count(Booking.id)).group_by(Booking.status).all())
+
+def stat(html, title):
+    found = re.search(rf'{title}</h6>\s*<h2 class="mb-0"[^>]*>(\d+)', html)
+    return int(found.group(1)) if found else None
+
+def selects(statements):
+    return [s for s in statements if s.lstrip().upper().startswith('SELECT')]
+
+def test_dashboard_queries_and_numbers(admin_client, expected, statements):
+    admin_client.get('/admin/rooms')  # Caches the admin's principal
+    dashboard_stats.forget()
+    statements.clear()
+    html = admin_client.get('/admin/dashboard').get_data(as_text=True)
+    assert len(selects(statements)) <= 3
+    statements.clear()
+    admin_client.get('/admin/dashboard')
+    assert selects(statements) == []
+
+    shown = (stat(html, 'Total Users'), stat(html, 'Total Rooms'), stat(html, 'Pending Bookings'), stat(html, 'Checked In'))
+    assert shown == (COUNT, 50, expected['pending'], expected['checked_in'])
+    assert len(re.findall(r'<tr data-booking-id=', html)) == 10
+
+def test_bookings_filter_reuses_the_aggregate(admin_client, expected, statements):
+    admin_client.get('/admin/dashboard')
+    statements.clear()
+    html = admin_client.get('/admin/bookings').get_data(as_text=True)
+    assert not [s for s in statements if 'GROUP BY' in s]
+    facets = dict(re.findall(r'<option value="(\w+)" (?:selected)?>[^<(]+\((\d+)\)</option>', html))
+    assert {status: int(n) for status, n in facets.items()} == {'all': COUNT, **{s: expected[s] for s in STATUSES}}
+
+def test_approval_shows_at_once(app, admin_client, expected):
+    with app.app_context():
+        pending_id = Booking.query.filter_by(status='pending').first().id
+    admin_client.get('/admin/dashboard')
+    admin_client.post(f'/admin/bookings/approve/{pending_id}')
+    html = admin_client.get('/admin/dashboard').get_data(as_text=True)
+    assert stat(html, 'Pending Bookings') == expected['pending'] - 1
@@ -0,0 +1,94 @@
+"""
+The email outbox against the local SMTP stand-in: approvals only queue their
+emails, the worker pool delivers each exactly once through rejected first
+attempts, an expired lease is reclaimed and permanent failures are
+dead-lettered, and nothing is sent without credentials.
+"""
+
+from datetime import timedelta
+import pytest
+from models import db, EmailOutbox, get_ist_now
+from outbox import OutboxWorker, enqueue
+from scripts.smtp_standin import SMTPStandIn
+
+COUNT = 10
+
+@pytest.fixture
+def standin():
+    server = SMTPStandIn(fail_first=3).start()  # Rejects its first 3 deliveries
+    yield server
+    server.shutdown()
+    server.server_close()
+
+@pytest.fixture
+def app_config(standin):
+    return {'MAIL_SERVER': 'localhost', 'MAIL_PORT': standin.port, 'MAIL_USE_TLS': False,
+            'MAIL_PASSWORD': 'stand-in', 'EMAIL_RETRY_BASE_SECONDS': 0}
+
+def statuses():
+    db.session.expire_all()
+    return {status: EmailOutbox.query.filter_by(status=status).count()
+            for status in ('pending', 'sending', 'sent', 'dead')}
+
+def test_approvals_are_delivered_once(app, standin, admin_id, login_as, make_rooms, make_users, make_bookings):
+    room_id, = make_rooms(1, capacity=COUNT)
+    booking_ids = make_bookings([(user_id, room_id, 'pending') for user_id in make_users(COUNT, prefix='mail')])
+    admin = login_as(admin_id, 'admin')
+    for booking_id in booking_ids:
+        admin.post(f'/admin/bookings/approve/{booking_id}')
+
+    with app.app_context():
+        assert statuses()['pending'] == COUNT
+        assert standin.messages == []
+        OutboxWorker(app, threads=4).drain()
+        assert statuses() == {'pending': 0, 'sending': 0, 'sent': COUNT, 'dead': 0}
+    recipients = sorted(recipients[0] for _, recipients, _ in standin.messages)
+    assert recipients == sorted(f'mail{n}@example.com' for n in range(COUNT))
+
+def test_expired_lease_is_reclaimed(app, standin):
+    standin.fail_first = 0
+    with app.app_context():
+        entry = enqueue('booking_approved', 'crashed@example.com', user_name='Crash', room_no='MAIL')
+        entry.status = 'sending'  # Its worker died mid-send
+        entry.locked_until = get_ist_now() - timedelta(seconds=1)
+        db.session.commit()
+        OutboxWorker(app, threads=1).drain()
+        assert db.session.get(EmailOutbox, entry.id).status == 'sent'
+
+def test_permanent_failure_is_dead_lettered(app):
+    app.config['MAIL_PORT'] = 1  # Nothing listens here
+    app.config['EMAIL_MAX_ATTEMPTS'] = 3
+    with app.app_context():
+        entry = enqueue('booking_approved', 'unreachable@example.com', user_name='Dead', room_no='MAIL')
+        db.session.commit()
+        OutboxWorker(app, threads=1).drain()
+        entry = db.session.get(EmailOutbox, entry.id)
+        assert (entry.status, entry.attempts) == ('dead', 3)
+
+def test_no_credentials_skips_without_retrying(app, standin):
+    app.config['MAIL_PASSWORD'] = ''
+    with app.app_context():
+        entry = enqueue('booking_approved', 'nobody@example.com', user_name='Nobody', room_no='MAIL')
+        db.session.commit()
+        OutboxWorker(app, threads=1).drain()
+        entry = db.session.get(EmailOutbox, entry.id)
+        assert (entry.status, entry.attempts) == ('skipped', 0)
+        assert standin.connections == 0
+
+        # Requeued once the credentials are configured
+        app.config['MAIL_PASSWORD'] = 'stand-in'
+        standin.fail_first = 0
+        assert app.test_cli_runner().invoke(args=['outbox-requeue']).exit_code == 0
+        OutboxWorker(app, threads=1).drain()
+        assert db.session.get(EmailOutbox, entry.id).status == 'sent'
+
+def test_only_approvals_queue_emails(app, admin_id, login_as, make_rooms, make_users, make_bookings):
+    room_id, = make_rooms(1)
+    first, second = make_users(2)
+    approved, rejected = make_bookings([(first, room_id, 'pending'), (second, room_id, 'pending')])
+    admin = login_as(admin_id, 'admin')
+    admin.post(f'/admin/bookings/approve/{approved}')
+    admin.post(f'/admin/bookings/reject/{rejected}')
+    login_as(first).post(f'/user/bookings/checkin/{approved}')
+    with app.app_context():
+        assert [kind for kind, in db.session.query(EmailOutbox.kind)] == ['booking_approved']
@@ -0,0 +1,20 @@
+"""
+Email templates: every kind in EMAIL_SUBJECTS is compiled once with the app
+and renders both bodies with its subject for a recipient.
+"""
+
+import pytest
+from email.header import decode_header, make_header
+from email_templates import EMAIL_SUBJECTS, render_email
+
+@pytest.mark.parametrize('kind', EMAIL_SUBJECTS)
+def test_every_kind_renders(app, kind):
+    with app.app_context():
+        assert set(app.extensions['email_templates']) == set(EMAIL_SUBJECTS)
+        message = render_email(kind, 'participant0@example.com', user_name='Participant 0', room_no='R0001',
+                               room_description='Block A').as_message()
+    assert message['To'] == 'participant0@example.com'
+    assert str(make_header(decode_header(message['Subject']))) == EMAIL_SUBJECTS[kind]
+    text, html = (part.get_payload(decode=True).decode() for part in message.get_payload())
+    assert 'Participant 0' in text and 'R0001' in text
+    assert 'Participant 0' in html and 'R0001' in html
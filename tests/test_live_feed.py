@@ -0,0 +1,163 @@
+"""
+The live dashboard feed: changes reach the admin stream with the right
+pending and checked-in deltas, participants only see room changes and their
+own bookings, nothing is queried for the feed while no screen is open, a
+change made in another worker process reaches the screens of this one, a
+screen that stops reading is told to reload, closed streams are dropped,
+streams past LIVE_FEED_MAX_STREAMS get a 503 and a stream ends after
+LIVE_FEED_MAX_STREAM_SECONDS.
+"""
+
+import json
+import pytest
+from app import create_app
+from models import db, Room, Booking
+import live_feed
+import transitions
+
+@pytest.fixture
+def app_config():
+    return {'LIVE_FEED_HEARTBEAT_SECONDS': 0.05, 'LIVE_FEED_POLL_SECONDS': 0.05}
+
+@pytest.fixture
+def people(app, make_rooms, make_users):
+    room_ids = make_rooms(3, capacity=40)
+    return room_ids, make_users(30)
+
+def run(app, transition):
+    with app.test_request_context():
+        return transition()
+
+def open_stream(client, path):
+    response = client.get(path, buffered=False)
+    return response, iter(response.response)
+
+def read_events(chunks):
+    """The events queued on a stream so far, read up to its next keepalive"""
+    events = []
+    for chunk in chunks:
+        chunk = chunk.decode() if isinstance(chunk, bytes) else chunk
+        if chunk.startswith(': keepalive'):
+            return events
+        if chunk.startswith('event: '):
+            name, data = chunk.split('\n')[:2]
+            events.append((name[len('event: '):], json.loads(data[len('data: '):])))
+            if events[-1][0] == 'reload':
+                return events
+    return events
+
+def wait_for_events(chunks, keepalives=100):
+    """The events that reach a stream within a number of keepalives"""
+    for _ in range(keepalives):
+        events = read_events(chunks)
+        if events:
+            return events
+    return []
+
+def summary(chunks):
+    return [(name, data.get('counts'), len(data.get('bookings', data.get('rooms', []))))
+            for name, data in read_events(chunks)]
+
+def room(room_id):
+    return db.session.get(Room, room_id)
+
+def booking_of(user_id):
+    return Booking.query.filter_by(user_id=user_id).first()
+
+def test_no_feed_queries_without_screens(app, people, statements):
+    room_ids, user_ids = people
+    statements.clear()
+    run(app, lambda: transitions.request_booking(user_ids[0], room(room_ids[0])))
+    assert not [s for s in statements if 'count(rooms.id)' in s or 'JOIN users' in s]
+
+def test_changes_reach_each_screen(app, people, admin_id, login_as):
+    room_ids, (alice, bob, *others) = people
+    streams = [open_stream(login_as(admin_id, 'admin'), '/admin/live'),
+               open_stream(login_as(alice), '/user/live'),
+               open_stream(login_as(bob), '/user/live')]
+    for response, chunks in streams:
+        assert (response.status_code, response.mimetype) == (200, 'text/event-stream')
+        read_events(chunks)
+    (_, admin), (_, alice_stream), (_, bob_stream) = streams
+
+    run(app, lambda: transitions.request_booking(alice, room(room_ids[1])))
+    seen = read_events(admin)
+    assert [(name, data['counts'], len(data['bookings'])) for name, data in seen] == \
+        [('bookings', {'pending': 1, 'checked_in': 0}, 1)]
+    assert seen[0][1]['bookings'][0]['user_name'] == 'Participant 0'
+    assert summary(alice_stream) == [('bookings', None, 1)]
+    assert summary(bob_stream) == []
+
+    run(app, lambda: transitions.approve_booking(booking_of(alice), admin_id))
+    assert summary(admin) == [('bookings', {'pending': -1, 'checked_in': 0}, 1), ('rooms', None, 1)]
+    assert summary(alice_stream) == [('bookings', None, 1), ('rooms', None, 1)]
+    seen = read_events(bob_stream)
+    assert [name for name, _ in seen] == ['rooms']
+    assert seen[0][1]['rooms'][0]['allocated_beds'] == 1
+
+    run(app, lambda: transitions.check_in(booking_of(alice), alice))
+    assert summary(admin) == [('bookings', {'pending': 0, 'checked_in': 1}, 1), ('rooms', None, 1)]
+    assert summary(bob_stream) == [('rooms', None, 1)]
+
+    # A bulk approval is one event, not one per booking
+    for user_id in others[1:21]:
+        run(app, lambda: transitions.request_booking(user_id, room(room_ids[2])))
+    read_events(admin)
+    run(app, lambda: transitions.bulk_approve_bookings(Booking.room_id == room_ids[2], admin_id))
+    assert summary(admin) == [('bookings', {'pending': -20, 'checked_in': 0}, 20), ('rooms', None, 1)]
+    assert summary(bob_stream) == [('rooms', None, 1)]
+
+def test_changes_in_another_worker_reach_each_screen(app, people, admin_id, login_as):
+    room_ids, (alice, bob, *_) = people
+    _, admin = open_stream(login_as(admin_id, 'admin'), '/admin/live')
+    _, bob_stream = open_stream(login_as(bob), '/user/live')
+    read_events(admin)
+    read_events(bob_stream)
+
+    # A second worker process: the same database, its own feed and no screens
+    worker = create_app({'SQLALCHEMY_DATABASE_URI': app.config['SQLALCHEMY_DATABASE_URI'],
+                         'MAIL_PASSWORD': '', 'LIVE_FEED_POLL_SECONDS': 0.05})
+    try:
+        run(worker, lambda: transitions.request_booking(alice, room(room_ids[1])))
+        seen = wait_for_events(admin)
+        assert [(name, data['counts']) for name, data in seen] == [('bookings', {'pending': 1, 'checked_in': 0})]
+        run(worker, lambda: transitions.approve_booking(booking_of(alice), admin_id))
+        assert [name for name, _ in wait_for_events(bob_stream)] == ['rooms']
+    finally:
+        with worker.app_context():
+            db.session.remove()
+            db.engine.dispose()
+
+def test_slow_and_closed_screens_are_dropped(app, people, admin_id, login_as):
+    room_ids, (alice, bob, *_) = people
+    admin_response, admin = open_stream(login_as(admin_id, 'admin'), '/admin/live')
+    _, alice_stream = open_stream(login_as(alice), '/user/live')
+    bob_response, bob_stream = open_stream(login_as(bob), '/user/live')
+    for chunks in (admin, alice_stream, bob_stream):
+        read_events(chunks)
+    with app.app_context():
+        feed = live_feed.get_feed()
+
+    bob_response.close()
+    assert len(feed) == 2
+
+    # A screen that stops reading is told to reload once its queue is full
+    for _ in range(feed.max_queued + 1):
+        run(app, lambda: live_feed.rooms_changed(room_ids))
+        read_events(admin)
+    assert read_events(alice_stream)[-1:] == [('reload', {})]
+    assert len(feed) == 1
+
+    # Past the limit new screens are turned away
+    feed.max_subscribers = 1
+    assert login_as(alice).get('/user/live', buffered=False).status_code == 503
+    admin_response.close()
+
+def test_streams_end_after_their_lifetime(app, people, login_as):
+    _, (alice, *_) = people
+    app.config['LIVE_FEED_MAX_STREAM_SECONDS'] = 0.2
+    _, chunks = open_stream(login_as(alice), '/user/live')
+    chunks = [chunk.decode() if isinstance(chunk, bytes) else chunk for chunk in chunks]
+    assert chunks[0] == 'retry: 5000\n\n' and chunks[-1] == 'retry: 500\n\n'  # The browser reconnects at once
+    with app.app_context():
+        assert len(live_feed.get_feed()) == 0
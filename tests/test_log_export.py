@@ -0,0 +1,85 @@
+"""
+The logs page and its CSV export: the export streams only the filtered
+entries, newest first, ?gzip=1 compresses the same CSV, a malformed date
+sends the admin back to the logs page instead of failing, and keyset paging
+walks every entry once in both directions.
+"""
+
+import csv
+import gzip
+import html
+import re
+from datetime import timedelta
+from io import StringIO
+import pytest
+from models import db, Log, get_ist_now
+
+COUNT = 12
+
+@pytest.fixture
+def entries(app, make_users):
+    """COUNT entries a minute apart, alternating login/check_in between two users; returns their ids"""
+    first, second = make_users(2)
+    now = get_ist_now()
+    with app.app_context():
+        Log.query.delete()  # Only the entries below, not the admin's login
+        rows = [Log(user_id=(first, second)[n % 2], action=('login', 'check_in')[n % 2], details=f'entry {n}',
+                    timestamp=now - timedelta(minutes=n)) for n in range(COUNT)]
+        db.session.add_all(rows)
+        db.session.commit()
+        return [row.id for row in rows]
+
+def exported(data):
+    rows = list(csv.reader(StringIO(data)))
+    assert rows[0] == ['ID', 'User', 'Email', 'Action', 'Details', 'Timestamp']
+    return rows[1:]
+
+def test_filtered_export_streams_newest_first(app, admin_client, entries):
+    app.config['EXPORT_CHUNK_SIZE'] = 2
+    response = admin_client.get('/admin/logs/export?action=login&user_email=participant0@')
+    assert response.is_streamed
+    assert response.headers['Content-Disposition'] == 'attachment; filename=accommodation_logs.csv'
+    rows = exported(response.get_data(as_text=True))
+    assert [int(row[0]) for row in rows] == entries[::2]
+    assert {(row[2], row[3]) for row in rows} == {('participant0@example.com', 'login')}
+
+def test_gzip_export(admin_client, entries):
+    plain = admin_client.get('/admin/logs/export').get_data()
+    response = admin_client.get('/admin/logs/export?gzip=1')
+    assert response.mimetype == 'application/gzip'
+    assert response.headers['Content-Disposition'] == 'attachment; filename=accommodation_logs.csv.gz'
+    data = gzip.decompress(response.get_data())
+    assert data == plain
+    assert len(exported(data.decode())) == COUNT
+
+@pytest.mark.parametrize('path', ['/admin/logs', '/admin/logs/export'])
+@pytest.mark.parametrize('dates', ['date_to=2025-13-01', 'date_from=yesterday', 'date_from=2025-02-30'])
+def test_bad_dates_redirect_to_the_logs_page(admin_client, entries, path, dates):
+    response = admin_client.get(f'{path}?action=login&{dates}')
+    assert response.status_code == 302
+    assert response.headers['Location'] == '/admin/logs?action=login'
+    assert b'Dates must be valid and in YYYY-MM-DD format.' in admin_client.get(response.headers['Location']).data
+
+def page_links(response):
+    """(ids listed, newer page url, older page url) of a logs page"""
+    text = response.get_data(as_text=True)
+    ids = [int(log_id) for log_id in re.findall(r'<strong>#(\d+)</strong>', text)]
+    links = [html.unescape(url) for url in re.findall(r'href="(/admin/logs\?[^"]*(?:after|before)=[^"]*)"', text)]
+    newer = next((url for url in links if 'before=' in url), None)
+    older = next((url for url in links if 'after=' in url), None)
+    return ids, newer, older
+
+def test_paging_walks_every_entry_once(admin_client, entries):
+    pages, url = [], '/admin/logs?per_page=5'
+    while url:
+        ids, newer, url = page_links(admin_client.get(url))
+        pages.append(ids)
+    assert [len(ids) for ids in pages] == [5, 5, 2]
+    assert sum(pages, []) == entries  # Newest first, each once
+
+    # Back from the last page to the first
+    back = []
+    while newer:
+        ids, newer, _ = page_links(admin_client.get(newer))
+        back.append(ids)
+    assert back == pages[-2::-1]
@@ -0,0 +1,36 @@
+"""
+The statistics cards on the logs page: total, today's, distinct-user and
+distinct-action counts follow the action, email and date filters.
+"""
+
+import re
+from datetime import timedelta
+from models import db, Log, get_ist_now
+
+CARDS = ("Total Logs", "Today's Logs", "Unique Users", "Action Types")
+
+def cards(client, query=''):
+    html = client.get(f'/admin/logs?{query}').get_data(as_text=True)
+    return tuple(int(re.search(rf'{card}</h6>\s*<h2 class="mb-0">(\d+)', html).group(1)) for card in CARDS)
+
+def test_stats_follow_the_filters(app, admin_client, make_users):
+    first, second = make_users(2)
+    now = get_ist_now()
+    week_ago = now - timedelta(days=7)
+    with app.app_context():
+        Log.query.delete()  # Only the entries below, not the admin's login
+        db.session.add_all([
+            Log(user_id=first, action='login', timestamp=now),
+            Log(user_id=first, action='login', timestamp=week_ago),
+            Log(user_id=first, action='check_in', timestamp=week_ago),
+            Log(user_id=second, action='login', timestamp=week_ago),
+        ])
+        db.session.commit()
+    app.config['LOG_STATS_CACHE_TTL'] = 0
+
+    assert cards(admin_client) == (4, 1, 2, 2)
+    assert cards(admin_client, 'action=login') == (3, 1, 2, 1)
+    assert cards(admin_client, 'user_email=participant1@') == (1, 0, 1, 1)
+    assert cards(admin_client, 'action=check_in&user_email=participant0@') == (1, 0, 1, 1)
+    day = week_ago.date().isoformat()
+    assert cards(admin_client, f'date_from={day}&date_to={day}') == (3, 0, 2, 2)
@@ -0,0 +1,82 @@
+"""
+Bulk participant pre-registration: every bad row is reported and nothing is
+imported, emails already registered or repeated in the sheet are refused,
+rows without a password get a generated one, and `flask import-participants`
+registers accounts that can log in with the passwords it wrote out.
+"""
+
+import csv
+import io
+import pytest
+from models import User
+import participant_import
+
+HEADER = 'name,email,phone,password'
+
+@pytest.fixture
+def app_config():
+    return {'PASSWORD_HASH_METHOD': 'pbkdf2:sha256:1000'}  # Fast enough to hash in a test
+
+def load(app, lines):
+    with app.app_context():
+        return participant_import.load_participant_import(io.StringIO('\n'.join([HEADER] + lines)))
+
+def test_bad_rows_are_reported(app):
+    result = load(app, [
+        'Asha,asha@example.com,0000000000,secret123',
+        'Ravi,,0000000000,',
+        'Meera,meera-at-example.com,0000000000,',
+        f'{"x" * 200},long@example.com,0000000000,',
+        'Kiran,kiran@example.com,0000000000,abc',
+    ])
+    assert not result.ok
+    assert result.errors == [
+        ('line 3', 'Name, email and phone are required.'),
+        ('line 4', 'meera-at-example.com is not a valid email address.'),
+        ('line 5', 'long@example.com: name, email or phone is longer than allowed (100/120/20 characters).'),
+        ('line 6', 'kiran@example.com: password must be at least 6 characters long.'),
+    ]
+
+def test_missing_columns_are_one_error(app):
+    with app.app_context():
+        result = participant_import.load_participant_import(io.StringIO('name,email\nAsha,asha@example.com\n'))
+    assert result.errors == [('file', 'CSV header is missing phone.')]
+
+def test_duplicate_emails_are_refused(app, make_users):
+    make_users(1)  # participant0@example.com
+    result = load(app, [
+        'Asha,asha@example.com,0000000000,',
+        'Participant,participant0@example.com,0000000000,',
+        'Asha Again,asha@example.com,0000000000,',
+    ])
+    assert result.errors == [
+        ('line 4', 'asha@example.com also appears on line 2.'),
+        ('line 3', 'participant0@example.com is already registered.'),
+    ]
+    assert [p['email'] for p in result.participants] == ['asha@example.com']
+
+def test_passwords_are_generated_when_missing(app):
+    result = load(app, ['Asha,asha@example.com,0000000000,secret123'] +
+                       [f'P{n},p{n}@example.com,0000000000,' for n in range(20)])
+    assert result.ok
+    given, *generated = result.participants
+    assert (given['password'], given['generated']) == ('secret123', False)
+    assert all(p['generated'] and len(p['password']) >= participant_import.MIN_PASSWORD_LENGTH for p in generated)
+    assert len({p['password'] for p in generated}) == len(generated)
+
+def test_command_registers_participants_who_can_log_in(app, tmp_path):
+    sheet = tmp_path / 'participants.csv'
+    sheet.write_text('\n'.join([HEADER, 'Asha,asha@example.com,0000000000,secret123', 'Ravi,ravi@example.com,0000000000,']))
+    credentials = tmp_path / 'credentials.csv'
+
+    result = app.test_cli_runner().invoke(args=['import-participants', str(sheet), '--processes', '2',
+                                                '--credentials-out', str(credentials)])
+    assert result.exit_code == 0, result.output
+    with app.app_context():
+        assert User.query.filter(User.email.in_(['asha@example.com', 'ravi@example.com'])).count() == 2
+    (row,) = list(csv.DictReader(credentials.open()))
+    assert row['email'] == 'ravi@example.com'
+
+    for email, password in (('asha@example.com', 'secret123'), (row['email'], row['password'])):
+        response = app.test_client().post('/login', data={'email': email, 'password': password})
+        assert response.status_code == 302 and '/login' not in response.headers['Location']
@@ -0,0 +1,58 @@
+"""
+Configurable password hashing: a login rehashes a stored hash made with
+another method (cheaper or costlier) with PASSWORD_HASH_METHOD, a failed
+login leaves it alone, and a burst of logins never runs more than
+PASSWORD_VERIFY_WORKERS verification threads.
+"""
+
+import threading
+import time
+import pytest
+from models import db, User
+import passwords
+
+EMAIL = 'hash@example.com'
+WORKERS = 2
+
+@pytest.fixture
+def user(app):
+    with app.app_context():
+        db.session.add(User(name='Hash Check', email=EMAIL, phone='0000000000', role='user',
+                            password_hash=passwords.hash_password('secret123', 'pbkdf2:sha256:1000')))
+        db.session.commit()
+
+def stored_method(app):
+    with app.app_context():
+        return User.query.filter_by(email=EMAIL).first().password_hash.split('$', 1)[0]
+
+def login(app, password):
+    response = app.test_client().post('/login', data={'email': EMAIL, 'password': password})
+    return response.status_code == 302
+
+@pytest.mark.parametrize('method', ['scrypt:32768:8:1', 'pbkdf2:sha256:50000'])
+def test_login_rehashes_with_configured_method(app, user, method):
+    app.config['PASSWORD_HASH_METHOD'] = method
+    assert login(app, 'secret123')
+    assert stored_method(app) == passwords.normalize_method(method)
+
+def test_failed_login_keeps_hash(app, user):
+    app.config['PASSWORD_HASH_METHOD'] = 'scrypt:16384:8:1'
+    assert not login(app, 'wrong-password')
+    assert stored_method(app) == 'pbkdf2:sha256:1000'
+
+def test_burst_stays_within_worker_pool(app, user):
+    app.config['PASSWORD_HASH_METHOD'] = 'pbkdf2:sha256:1000'
+    app.config['PASSWORD_VERIFY_WORKERS'] = WORKERS
+    app.extensions.pop('password_pool', None)
+
+    results, peak = [], 0
+    threads = [threading.Thread(target=lambda: results.append(login(app, 'secret123'))) for _ in range(6)]
+    for thread in threads:
+        thread.start()
+    while any(thread.is_alive() for thread in threads):
+        peak = max(peak, sum(1 for t in threading.enumerate() if t.name.startswith('password-verify')))
+        time.sleep(0.005)
+    for thread in threads:
+        thread.join()
+    assert results == [True] * 6
+    assert peak <= WORKERS
@@ -0,0 +1,60 @@
+"""
+The request-scoped principal: authorising an admin page costs at most one
+users query cold and none once cached, user pages load their user once, and
+profile edits and role changes apply on the next request.
+"""
+
+import pytest
+from models import db, User
+from principal import principal_cache, forget_principal
+
+@pytest.fixture
+def user_id(app):
+    with app.app_context():
+        user = User(name='Principal Check', email='principal@example.com', phone='0000000000', role='user')
+        user.set_password('secret123')
+        db.session.add(user)
+        db.session.commit()
+        return user.id
+
+def user_queries(statements):
+    return [s for s in statements if s.lstrip().upper().startswith('SELECT') and 'FROM users' in s]
+
+def test_admin_authorisation_is_cached(admin_id, login_as, statements):
+    admin = login_as(admin_id, 'admin')
+    principal_cache.clear()
+    statements.clear()
+    admin.get('/admin/rooms')
+    assert len(user_queries(statements)) <= 1
+    statements.clear()
+    admin.get('/admin/rooms')
+    assert user_queries(statements) == []
+
+@pytest.mark.parametrize('path', ['/user/dashboard', '/user/profile', '/user/profile/edit', '/'])
+def test_user_pages_load_their_user_once(user_id, login_as, statements, path):
+    participant = login_as(user_id)
+    statements.clear()
+    participant.get(path)
+    assert len(user_queries(statements)) <= 1
+
+def test_participant_stays_out_of_admin_pages(user_id, login_as):
+    participant = login_as(user_id)
+    for _ in range(2):  # Cold, then cached
+        response = participant.get('/admin/rooms')
+        assert response.status_code == 302
+        assert '/user/dashboard' in response.headers['Location']
+
+def test_profile_edit_forgets_principal(user_id, login_as):
+    participant = login_as(user_id)
+    participant.get('/user/profile')
+    participant.post('/user/profile/edit', data={'name': 'Renamed Participant', 'phone': '1111111111'})
+    assert principal_cache.get(user_id) is None
+
+def test_demoted_admin_loses_access(app, admin_id, login_as):
+    admin = login_as(admin_id, 'admin')
+    assert admin.get('/admin/rooms').status_code == 200
+    with app.test_request_context():
+        db.session.execute(db.update(User).where(User.id == admin_id).values(role='user'))
+        db.session.commit()
+        forget_principal(admin_id)
+    assert admin.get('/admin/rooms').status_code == 302
@@ -0,0 +1,70 @@
+"""
+The bulk room import page: a file with any bad row imports nothing and
+reports every bad row, upsert mode updates capacities but never below the
+beds already allocated, JSON files work like CSV, and available beds always
+follow from capacity.
+"""
+
+import io
+import json
+from models import db, Room
+
+def csv_file(rows, header='room_no,capacity,description'):
+    lines = [header] + [','.join(str(value) for value in row) for row in rows]
+    return io.BytesIO('\n'.join(lines).encode())
+
+def upload(client, data, filename='rooms.csv', mode='insert', action='import'):
+    return client.post('/admin/rooms/import', data={
+        'rooms_file': (data, filename), 'mode': mode, 'action': action
+    }, content_type='multipart/form-data', follow_redirects=True)
+
+def rooms(app):
+    with app.app_context():
+        return {room.room_no: (room.capacity, room.available_beds, room.description)
+                for room in Room.query.filter(Room.room_no.like('H%') | Room.room_no.like('J%'))}
+
+def test_import_adds_every_room(app, admin_client):
+    response = upload(admin_client, csv_file([('H001', 4, 'Block A'), ('H002', 2, '')]))
+    assert b'Imported 2 new rooms and updated 0 existing rooms!' in response.data
+    assert rooms(app) == {'H001': (4, 4, 'Block A'), 'H002': (2, 2, None)}
+
+def test_bad_rows_import_nothing(app, admin_client, make_rooms):
+    make_rooms(1, prefix='H')  # H0000
+    bad = [('H001', 4, 'ok'), ('H002', 'four', ''), ('', 3, ''), ('H001', 2, 'again'), ('H0000', 4, 'exists'),
+           ('H003', 0, '')]
+    response = upload(admin_client, csv_file(bad))
+    assert response.data.count(b'<td>line ') == 5
+    for message in (b'capacity must be a valid number', b'Room number is required', b'also appears on line 2',
+                    b'Room H0000 already exists', b'capacity must be at least 1'):
+        assert message in response.data
+    assert set(rooms(app)) == {'H0000'}
+
+def test_validate_only_writes_nothing(app, admin_client):
+    upload(admin_client, csv_file([('H001', 4, '')]), action='validate')
+    assert rooms(app) == {}
+
+def test_available_beds_column_is_ignored(app, admin_client):
+    upload(admin_client, csv_file([('H001', 4, '', 9), ('H002', 2, '', 'none')],
+                                  header='room_no,capacity,description,available_beds'))
+    assert rooms(app) == {'H001': (4, 4, None), 'H002': (2, 2, None)}
+
+def test_upsert_keeps_allocated_beds(app, admin_client, make_rooms):
+    make_rooms(2, capacity=4, prefix='H', description='Block A')  # H0000, H0001
+    with app.app_context():
+        Room.query.filter_by(room_no='H0000').update({'allocated_beds': 3, 'occupied_beds': 1, 'available_beds': 3})
+        db.session.commit()
+
+    response = upload(admin_client, csv_file([('H0000', 2, '')]), mode='upsert')
+    assert b'capacity cannot be lower than the 3 beds already allocated' in response.data
+
+    response = upload(admin_client, csv_file([('H0000', 6, ''), ('H0001', 2, 'Block B'), ('H0002', 3, '')]), mode='upsert')
+    assert b'Imported 1 new rooms and updated 2 existing rooms!' in response.data
+    assert rooms(app) == {'H0000': (6, 5, 'Block A'), 'H0001': (2, 2, 'Block B'), 'H0002': (3, 3, None)}
+
+def test_json_import(app, admin_client):
+    data = {'rooms': [{'room_no': 'J001', 'capacity': 3}, {'room_no': 'J002', 'capacity': '2', 'description': 'Annex'}]}
+    upload(admin_client, io.BytesIO(json.dumps(data).encode()), 'rooms.json')
+    assert rooms(app) == {'J001': (3, 3, None), 'J002': (2, 2, 'Annex')}
+
+    response = upload(admin_client, io.BytesIO(b'{"rooms": 3}'), 'rooms.json')
+    assert b'JSON must be a list of rooms' in response.data
@@ -0,0 +1,31 @@
+"""
+Adding and editing rooms from the admin pages: the form asks for the room
+number, capacity and description only, and available beds follow from the
+capacity and the beds checked in.
+"""
+
+from models import db, Room
+
+def test_add_room_derives_available_beds(app, admin_client):
+    assert b'available_beds' not in admin_client.get('/admin/rooms/add').data
+    response = admin_client.post('/admin/rooms/add', data={'room_no': 'A1', 'capacity': '3', 'description': 'East'})
+    assert response.status_code == 302
+    with app.app_context():
+        room = Room.query.filter_by(room_no='A1').one()
+        assert (room.capacity, room.available_beds, room.description) == (3, 3, 'East')
+
+def test_edit_room_derives_available_beds(app, admin_client, make_rooms):
+    room_id, = make_rooms(1, capacity=4)
+    with app.app_context():
+        db.session.execute(db.update(Room).where(Room.id == room_id).values(
+            occupied_beds=1, allocated_beds=1, available_beds=3))
+        db.session.commit()
+    assert b'available_beds' not in admin_client.get(f'/admin/rooms/edit/{room_id}').data
+    response = admin_client.post(f'/admin/rooms/edit/{room_id}', data={'room_no': 'R0000', 'capacity': '6'})
+    assert response.status_code == 302
+    with app.app_context():
+        assert db.session.get(Room, room_id).available_beds == 5
+
+def test_capacity_is_required(admin_client):
+    response = admin_client.post('/admin/rooms/add', data={'room_no': 'A1', 'capacity': ''})
+    assert b'Room number and capacity are required.' in response.data
@@ -0,0 +1,484 @@
+"""
+Booking, room and account state transitions.
+Each function applies a state change, the matching room occupancy update and
+its audit log entry, and commits them together as one transaction, so a change
+never exists without its log row and every request costs a single commit.
+Routes validate form input, call one transition and flash the outcome.
+
+Capacity and status changes are conditional UPDATEs (see Room.allocate_bed
+and Booking.transition), so they stay correct with many workers writing at
+once; a transition that loses a write-lock race is retried from scratch.
+"""
+
+import random
+import time
+from functools import wraps
+from flask import current_app
+from sqlalchemy import func
+from sqlalchemy.exc import IntegrityError, OperationalError
+from models import db, User, Room, Booking, BookingHistory, Log, OccupancyVersion, get_ist_now
+import outbox
+import live_feed
+import dashboard_stats
+from principal import forget_principal
+
+ACTIVE_STATUSES = ['pending', 'approved', 'checked_in']
+FINISHED_STATUSES = ['rejected', 'checked_out']
+BOOKING_ID_CHUNK = 500  # Booking ids per IN (...) lookup, well under SQLite's parameter limit
+
+class TransitionError(Exception):
+    """A transition that is not allowed in the current state; the message is shown to the user"""
+
+    def __init__(self, message, category='danger'):
+        super().__init__(message)
+        self.message = message
+        self.category = category
+
+def transactional(f):
+    """
+    Run a transition as one transaction: roll back whatever it did if it fails,
+    and retry it with jittered backoff when SQLite reports the database is locked
+    """
+    @wraps(f)
+    def decorated_function(*args, **kwargs):
+        attempts = current_app.config.get('TRANSITION_RETRIES', 5)
+        for attempt in range(attempts):
+            try:
+                return f(*args, **kwargs)
+            except TransitionError:
+                db.session.rollback()
+                raise
+            except OperationalError as e:
+                db.session.rollback()
+                if 'locked' not in str(e) or attempt == attempts - 1:
+                    raise
+                time.sleep(random.uniform(0, 0.01 * 2 ** attempt))
+    return decorated_function
+
+def log_action(user_id, action, details):
+    """Add an audit log entry to the current transaction"""
+    db.session.add(Log(user_id=user_id, action=action, details=details))
+
+def log_actions(entries):
+    """Add many (user_id, action, details) audit log entries with a single multi-row INSERT"""
+    if entries:
+        now = get_ist_now()
+        db.session.execute(db.insert(Log), [
+            {'user_id': user_id, 'action': action, 'details': details, 'timestamp': now}
+            for user_id, action, details in entries
+        ])
+
+def commit():
+    """Commit the current transaction, rolling it back if the commit fails"""
+    try:
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+    dashboard_stats.forget()
+
+# Accounts
+
+@transactional
+def register_user(name, email, phone, password):
+    """Create a participant account and log the registration"""
+    if User.query.filter_by(email=email).first():
+        raise TransitionError('Email already registered. Please login.')
+
+    user = User(name=name, email=email, phone=phone, role='user')
+    user.set_password(password)
+    db.session.add(user)
+    db.session.flush()  # Assigns user.id for the log entry
+
+    log_action(user.id, 'registration', f'New user registered: {user.name}')
+    commit()
+    return user
+
+@transactional
+def import_participants(participant_import, password_hashes, admin_id):
+    """Create the accounts of a validated participant_import.ParticipantImport in one transaction"""
+    if not participant_import.ok:
+        raise TransitionError('Fix the errors in the file before importing.')
+    if not participant_import.participants:
+        raise TransitionError('The file has no participants to import.', 'warning')
+
+    now = get_ist_now()
+    try:
+        db.session.execute(db.insert(User), [
+            {'name': participant['name'], 'email': participant['email'], 'phone': participant['phone'],
+             'password_hash': password_hash, 'role': 'user', 'created_at': now}
+            for participant, password_hash in zip(participant_import.participants, password_hashes, strict=True)
+        ])
+    except IntegrityError:
+        raise TransitionError('A participant in the file registered meanwhile. Nothing was imported.')
+
+    log_action(admin_id, 'participants_imported',
+               f'Admin pre-registered {len(participant_import.participants)} participants')
+    commit()
+    return len(participant_import.participants)
+
+@transactional
+def record_login(user, password=None):
+    """Log a successful login; the just-verified password is rehashed if PASSWORD_HASH_METHOD changed"""
+    if password and user.password_needs_rehash():
+        user.set_password(password)
+    log_action(user.id, 'login', 'User logged in')
+    commit()
+    forget_principal(user.id)
+
+@transactional
+def record_logout(user_id):
+    log_action(user_id, 'logout', 'User logged out')
+    commit()
+
+@transactional
+def update_profile(user, name, phone, new_password=None):
+    user.name = name
+    user.phone = phone
+    if new_password:
+        user.set_password(new_password)
+
+    log_action(user.id, 'profile_updated', 'User updated profile')
+    commit()
+    forget_principal(user.id)
+
+# Rooms
+
+@transactional
+def add_room(admin_id, room_no, capacity, description):
+    if Room.query.filter_by(room_no=room_no).first():
+        raise TransitionError('Room number already exists.')
+
+    # A new room has no bookings yet, so every bed is available
+    room = Room(room_no=room_no, capacity=capacity,
+                available_beds=capacity, description=description,
+                occupied_beds=0, allocated_beds=0)
+    db.session.add(room)
+    OccupancyVersion.bump()
+
+    log_action(admin_id, 'room_added', f'Admin added room: {room_no}')
+    commit()
+    live_feed.rooms_changed([room.id])
+    return room
+
+@transactional
+def edit_room(room, admin_id, room_no, capacity, description):
+    # Check if room number already exists (excluding current room)
+    existing_room = Room.query.filter_by(room_no=room_no).first()
+    if existing_room and existing_room.id != room.id:
+        raise TransitionError('Room number already exists.')
+
+    # Available beds follow from the new capacity and the current occupancy
+    if not room.set_capacity(capacity):
+        raise TransitionError(f'Capacity cannot be lower than the {room.allocated_beds} beds already allocated.')
+
+    old_room_no = room.room_no
+    room.room_no = room_no
+    room.description = description
+
+    log_action(admin_id, 'room_edited', f'Admin edited room: {old_room_no} -> {room_no}')
+    commit()
+    live_feed.rooms_changed([room.id])
+
+@transactional
+def import_rooms(room_import, admin_id):
+    """Insert and update the rooms of a validated room_import.RoomImport in one transaction"""
+    if not room_import.ok:
+        raise TransitionError('Fix the errors in the file before importing.')
+    if not room_import.new_rooms and not room_import.updates:
+        raise TransitionError('The file has no rooms to import.', 'warning')
+
+    # New rooms have no bookings yet, so every bed is available
+    now = get_ist_now()
+    if room_import.new_rooms:
+        try:
+            db.session.execute(db.insert(Room), [
+                {'room_no': room['room_no'], 'capacity': room['capacity'], 'available_beds': room['capacity'],
+                 'occupied_beds': 0, 'allocated_beds': 0, 'description': room['description'], 'created_at': now}
+                for room in room_import.new_rooms
+            ])
+        except IntegrityError:
+            raise TransitionError('A room in the file was added by someone else meanwhile. Nothing was imported.')
+
+    # Existing rooms take the new capacity unless more beds are allocated by now
+    if room_import.updates:
+        capacity = db.bindparam('new_capacity')
+        result = db.session.execute(
+            db.update(Room.__table__).where(
+                Room.id == db.bindparam('room_id'), Room.allocated_beds <= capacity
+            ).values(
+                capacity=capacity,
+                available_beds=db.case((Room.occupied_beds < capacity, capacity - Room.occupied_beds), else_=0),
+                description=func.coalesce(db.bindparam('new_description'), Room.description)
+            ),
+            [{'room_id': room['room_id'], 'new_capacity': room['capacity'], 'new_description': room['description']}
+             for room in room_import.updates]
+        )
+        if result.rowcount != len(room_import.updates):
+            raise TransitionError('Some rooms got new bookings meanwhile. Nothing was imported.', 'warning')
+    OccupancyVersion.bump()
+
+    log_action(admin_id, 'rooms_imported',
+               f'Admin imported {len(room_import.new_rooms)} new rooms and updated {len(room_import.updates)}')
+    commit()
+    if live_feed.listening():
+        new_room_nos = [room['room_no'] for room in room_import.new_rooms]
+        live_feed.rooms_changed([room['room_id'] for room in room_import.updates] + [
+            room_id for room_id, in db.session.query(Room.id).filter(Room.room_no.in_(new_room_nos))
+        ])
+    return len(room_import.new_rooms), len(room_import.updates)
+
+@transactional
+def delete_room(room, admin_id):
+    # Check if room has active bookings
+    active_bookings = Booking.query.filter_by(room_id=room.id).filter(
+        Booking.status.in_(ACTIVE_STATUSES)
+    ).count()
+    if active_bookings > 0:
+        raise TransitionError('Cannot delete room with active bookings.')
+
+    room_id, room_no = room.id, room.room_no
+    db.session.delete(room)
+    OccupancyVersion.bump()
+
+    log_action(admin_id, 'room_deleted', f'Admin deleted room: {room_no}')
+    commit()
+    live_feed.rooms_changed([room_id])
+
+# Bookings
+
+@transactional
+def request_booking(user_id, room):
+    # Check if user already has an active booking
+    active_booking = Booking.query.filter_by(user_id=user_id).filter(
+        Booking.status.in_(ACTIVE_STATUSES)
+    ).first()
+    if active_booking:
+        raise TransitionError('You already have an active booking request.', 'warning')
+
+    # Check if room has available beds
+    if room.is_full():
+        raise TransitionError('Room is full. Please select another room.')
+
+    booking = Booking(user_id=user_id, room_id=room.id, status='pending')
+    db.session.add(booking)
+
+    log_action(user_id, 'booking_requested', f'User requested booking for room {room.room_no}')
+    commit()
+    live_feed.bookings_changed([booking.id])
+    return booking
+
+@transactional
+def approve_booking(booking, admin_id):
+    if booking.status != 'pending':
+        raise TransitionError('Only pending bookings can be approved.', 'warning')
+
+    # Reserve a bed for this booking if the room still has one
+    room = booking.room
+    if not room.allocate_bed():
+        raise TransitionError('Room is full. Cannot approve more bookings.')
+
+    if not booking.transition('pending', 'approved'):
+        raise TransitionError('Only pending bookings can be approved.', 'warning')
+
+    log_action(admin_id, 'booking_approved',
+               f'Admin approved booking #{booking.id} for user {booking.user.name}')
+    # The approval email is sent by the outbox worker once this commits
+    outbox.enqueue('booking_approved', booking.user.email,
+                   user_name=booking.user.name, room_no=room.room_no,
+                   room_description=room.description)
+    commit()
+    live_feed.bookings_changed([booking.id], 'pending')
+    live_feed.rooms_changed([room.id])
+
+@transactional
+def reject_booking(booking, admin_id):
+    if booking.status != 'pending':
+        raise TransitionError('Only pending bookings can be rejected.', 'warning')
+
+    # Pending bookings hold no bed, so the room's occupancy is unchanged
+    if not booking.transition('pending', 'rejected'):
+        raise TransitionError('Only pending bookings can be rejected.', 'warning')
+
+    log_action(admin_id, 'booking_rejected',
+               f'Admin rejected booking #{booking.id} for user {booking.user.name}')
+    commit()
+    live_feed.bookings_changed([booking.id], 'pending')
+
+def pending_bookings(condition):
+    """Id, user and room details of the pending bookings matching condition"""
+    return db.session.query(
+        Booking.id, User.name, User.email, Room.room_no, Room.description
+    ).join(User, Booking.user_id == User.id).join(Room, Booking.room_id == Room.id).filter(
+        condition, Booking.status == 'pending'
+    ).order_by(Booking.created_at, Booking.id).all()
+
+@transactional
+def bulk_approve_bookings(condition, admin_id):
+    """
+    Approve every pending booking matching condition, or none of them if any
+    room lacks the beds for its share. Returns the number approved.
+    """
+    bookings = pending_bookings(condition)
+    if not bookings:
+        raise TransitionError('No pending bookings selected.', 'warning')
+
+    # Beds requested per room, checked against each room in one aggregate query
+    demand = db.session.query(Room, func.count(Booking.id)).join(
+        Booking, Booking.room_id == Room.id
+    ).filter(condition, Booking.status == 'pending').group_by(Room.id).all()
+    short = [f'{room.room_no} ({room.capacity - room.allocated_beds} free, {count} selected)'
+             for room, count in demand if room.allocated_beds + count > room.capacity]
+    if short:
+        raise TransitionError(f'Not enough free beds in room {", ".join(short)}. No bookings were approved.')
+
+    # Reserve the beds; a room filled by a concurrent approval fails the whole batch
+    for room, count in demand:
+        if not room.allocate_bed(count):
+            raise TransitionError(f'Room {room.room_no} filled up meanwhile. No bookings were approved.')
+
+    if Booking.transition_many(condition, 'pending', 'approved') != len(bookings):
+        raise TransitionError('Some bookings changed meanwhile. No bookings were approved.', 'warning')
+
+    log_actions([(admin_id, 'booking_approved', f'Admin approved booking #{booking.id} for user {booking.name}')
+                 for booking in bookings])
+    outbox.enqueue_many('booking_approved', [
+        (booking.email, {'user_name': booking.name, 'room_no': booking.room_no,
+                         'room_description': booking.description})
+        for booking in bookings
+    ])
+    commit()
+    live_feed.bookings_changed([booking.id for booking in bookings], 'pending')
+    live_feed.rooms_changed([room.id for room, _ in demand])
+    return len(bookings)
+
+@transactional
+def bulk_reject_bookings(condition, admin_id):
+    """Reject every pending booking matching condition; returns the number rejected"""
+    bookings = pending_bookings(condition)
+    if not bookings:
+        raise TransitionError('No pending bookings selected.', 'warning')
+
+    if Booking.transition_many(condition, 'pending', 'rejected') != len(bookings):
+        raise TransitionError('Some bookings changed meanwhile. No bookings were rejected.', 'warning')
+
+    log_actions([(admin_id, 'booking_rejected', f'Admin rejected booking #{booking.id} for user {booking.name}')
+                 for booking in bookings])
+    commit()
+    live_feed.bookings_changed([booking.id for booking in bookings], 'pending')
+    return len(bookings)
+
+@transactional
+def apply_allocation(plan, admin_id):
+    """
+    Approve every booking the allocation plan places, in the room it was
+    placed in, as one batch. Returns the number of bookings approved.
+    """
+    if not plan.assignments:
+        raise TransitionError('No pending bookings could be allocated.', 'warning')
+
+    # Reserve the beds; a room that filled up since the plan was made fails the batch
+    beds = plan.beds_by_room()
+    rooms = {room.id: room for room in Room.query.filter(Room.id.in_(beds))}
+    for room_id, count in beds.items():
+        if not rooms[room_id].allocate_bed(count):
+            raise TransitionError(f'Room {rooms[room_id].room_no} filled up meanwhile. Nothing was allocated.')
+
+    # Names and emails of the planned bookings only, for their log entries and emails
+    planned = list(plan.assignments)
+    bookings = {}
+    for start in range(0, len(planned), BOOKING_ID_CHUNK):
+        chunk = planned[start:start + BOOKING_ID_CHUNK]
+        bookings.update((booking.id, booking) for booking in pending_bookings(Booking.id.in_(chunk)))
+    result = db.session.execute(
+        db.update(Booking.__table__).where(
+            Booking.id == db.bindparam('booking_id'), Booking.status == 'pending'
+        ).values(room_id=db.bindparam('new_room_id'), status='approved', updated_at=get_ist_now()),
+        [{'booking_id': booking_id, 'new_room_id': room_id} for booking_id, room_id in plan.assignments.items()]
+    )
+    if result.rowcount != len(plan.assignments):
+        raise TransitionError('Some bookings changed meanwhile. Nothing was allocated.', 'warning')
+
+    log_actions([
+        (admin_id, 'booking_approved', f'Allocation approved booking #{booking_id} for user '
+                                       f'{bookings[booking_id].name} in room {rooms[room_id].room_no}')
+        for booking_id, room_id in plan.assignments.items()
+    ])
+    outbox.enqueue_many('booking_approved', [
+        (bookings[booking_id].email, {'user_name': bookings[booking_id].name, 'room_no': rooms[room_id].room_no,
+                                      'room_description': rooms[room_id].description})
+        for booking_id, room_id in plan.assignments.items()
+    ])
+    commit()
+    live_feed.bookings_changed(plan.assignments, 'pending')
+    live_feed.rooms_changed(beds)
+    return len(plan.assignments)
+
+@transactional
+def check_in(booking, user_id):
+    # Verify booking belongs to user
+    if booking.user_id != user_id:
+        raise TransitionError('Unauthorized access.')
+
+    if booking.status != 'approved':
+        raise TransitionError('Only approved bookings can be checked in.', 'warning')
+
+    if not booking.transition('approved', 'checked_in', checkin_time=get_ist_now()):
+        raise TransitionError('Only approved bookings can be checked in.', 'warning')
+
+    # Occupy the bed allocated on approval, if the room still has one
+    room = booking.room
+    if not room.occupy_bed():
+        raise TransitionError('Room is now full. Cannot check in.')
+
+    log_action(user_id, 'check_in', f'User checked in to room {room.room_no}')
+    commit()
+    live_feed.bookings_changed([booking.id], 'approved')
+    live_feed.rooms_changed([room.id])
+
+@transactional
+def check_out(booking, user_id):
+    # Verify booking belongs to user
+    if booking.user_id != user_id:
+        raise TransitionError('Unauthorized access.')
+
+    if booking.status != 'checked_in':
+        raise TransitionError('Only checked-in bookings can be checked out.', 'warning')
+
+    if not booking.transition('checked_in', 'checked_out', checkout_time=get_ist_now()):
+        raise TransitionError('Only checked-in bookings can be checked out.', 'warning')
+
+    # Release the bed (increase available beds)
+    room = booking.room
+    room.release_bed()
+
+    log_action(user_id, 'check_out', f'User checked out from room {room.room_no}')
+    commit()
+    live_feed.bookings_changed([booking.id], 'checked_in')
+    live_feed.rooms_changed([room.id])
+
+@transactional
+def move_to_history(booking_ids):
+    """Move finished bookings into booking_history with one INSERT ... SELECT and one DELETE"""
+    columns = ['id', 'user_id', 'room_id', 'status', 'checkin_time', 'checkout_time', 'created_at', 'updated_at']
+    finished = db.and_(Booking.id.in_(booking_ids), Booking.status.in_(FINISHED_STATUSES))
+    now = get_ist_now()
+    db.session.execute(db.insert(BookingHistory).from_select(
+        columns + ['moved_at'],
+        db.select(*[getattr(Booking, column) for column in columns], db.literal(now, db.DateTime)).where(finished)
+    ))
+    # Finished states are final, so the DELETE matches exactly the rows just copied
+    result = db.session.execute(db.delete(Booking).where(finished).execution_options(synchronize_session=False))
+    commit()
+    return result.rowcount
+
+@transactional
+def clear_logs(admin):
+    """Delete every log entry, leaving one entry that records the clearing"""
+    log_count = Log.query.count()
+    Log.query.delete()
+
+    # Log the action (this will be the first log after clearing)
+    log_action(admin.id, 'logs_cleared', f'Admin {admin.name} cleared all {log_count} logs')
+    commit()
+    return log_count